@@ -14,7 +14,7 @@
 
 import warnings
 
-from .aqt_provider import AQTProvider
+from .aqt_provider import AQTProvider, AQTPoolProvider
 from .aqt_account import AQTAccount
 
 from . import version
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Adaptive execution: run shots in rounds until a precision is reached."""
+
+import math
+import time
+
+from qiskit.providers import JobV1
+from qiskit.providers import JobError
+from qiskit.providers.jobstatus import JobStatus
+from qiskit.result import Result
+from scipy.stats import norm
+
+
+def _observable_values(counts, observable):
+    if callable(observable):
+        return [observable(bitstring) for bitstring in counts]
+    return [observable.get(bitstring, 0.0) for bitstring in counts]
+
+
+def confidence_half_width(counts, observable=None, confidence=0.95):
+    """Return the running estimate and its confidence interval half width.
+
+    Parameters:
+        counts (dict): Accumulated counts, keyed by bitstring.
+        observable (callable or dict): Diagonal observable, mapping a
+            bitstring to its eigenvalue. If ``None``, the half width is the
+            largest one over all outcome probabilities.
+        confidence (float): Confidence level of the (normal) interval.
+
+    Returns:
+        tuple: ``(estimate, half_width)``. Without observable, ``estimate``
+        is ``None``.
+    """
+    shots = sum(counts.values())
+    if not shots:
+        return None, math.inf
+    z = norm.ppf(0.5 + confidence / 2)
+    if observable is None:
+        # add-half smoothing keeps the width positive when one outcome
+        # took every shot so far
+        variance = max(((count + 0.5) / (shots + 1)) *
+                       (1 - (count + 0.5) / (shots + 1))
+                       for count in counts.values())
+        return None, z * math.sqrt(variance / shots)
+    values = _observable_values(counts, observable)
+    weights = list(counts.values())
+    mean = sum(value * weight for value, weight in zip(values, weights)) / shots
+    if shots < 2:
+        return mean, math.inf
+    variance = sum(weight * (value - mean) ** 2
+                   for value, weight in zip(values, weights)) / (shots - 1)
+    return mean, z * math.sqrt(variance / shots)
+
+
+class AQTAdaptiveJob(JobV1):
+    """Runs a circuit in rounds until a precision target is met.
+
+    Every round is a regular job of ``round_shots`` shots. After each round
+    the accumulated counts are used to update the confidence interval of
+    the estimate; no further round is submitted once its half width is at
+    most ``precision`` or the shot budget is used up. Rounds are only
+    submitted while ``result()`` is waiting.
+
+    Attributes:
+        counts (dict): Counts accumulated over all finished rounds.
+        rounds (list[AQTJob]): The jobs submitted so far.
+        estimate (float): Running expectation value of the observable.
+        half_width (float): Current confidence interval half width.
+    """
+
+    def __init__(self, backend, circuit, precision, observable=None,
+                 confidence=0.95, round_shots=None, max_shots=None,
+                 **run_options):
+        """Submit the first round.
+
+        Parameters:
+            backend (BaseBackend): Backend to run the rounds on.
+            circuit (QuantumCircuit): The circuit to sample.
+            precision (float): Target confidence interval half width.
+            observable (callable or dict): See ``confidence_half_width``.
+            confidence (float): Confidence level of the interval.
+            round_shots (int): Shots per round, defaults to ``max_shots``
+                of the backend configuration.
+            max_shots (int): Total shot budget, unlimited if ``None``.
+            **run_options: Further options passed on to ``backend.run``.
+        """
+        self.rounds = []
+        self.counts = {}
+        self.estimate = None
+        self.half_width = math.inf
+        self._circuit = circuit
+        self._precision = precision
+        self._observable = observable
+        self._confidence = confidence
+        self._round_shots = round_shots or backend.configuration().max_shots
+        self._max_shots = max_shots
+        self._run_options = run_options
+        self._cancelled = False
+        self._done = False
+        first = self._submit_round(backend)
+        super().__init__(backend, first.job_id())
+
+    @property
+    def shots(self):
+        """Number of shots accumulated over all finished rounds."""
+        return sum(self.counts.values())
+
+    def _submit_round(self, backend):
+        shots = self._round_shots
+        if self._max_shots is not None:
+            shots = min(shots, self._max_shots - self.shots)
+        job = backend.run(self._circuit, shots=shots, **self._run_options)
+        self.rounds.append(job)
+        return job
+
+    def submit(self):
+        raise JobError('Adaptive jobs are submitted on creation')
+
+    def result(self, timeout=None, wait=5):
+        """Run rounds until the precision target or shot budget is reached.
+
+        Parameters:
+            timeout (float): Timeout for the complete run.
+            wait (float): Wait time between result polls.
+
+        Returns:
+            Result: Result with the counts of all rounds.
+        """
+        start = time.time()
+        while not self._done:
+            if self._cancelled:
+                raise JobError('Job %s was cancelled' % self._job_id)
+            remaining = None
+            if timeout is not None:
+                remaining = max(timeout - (time.time() - start), 1e-3)
+            counts = self.rounds[-1].result(timeout=remaining,
+                                            wait=wait).get_counts()
+            for bitstring, count in counts.items():
+                self.counts[bitstring] = self.counts.get(bitstring, 0) + count
+            self.estimate, self.half_width = confidence_half_width(
+                self.counts, self._observable, self._confidence)
+            budget_left = self._max_shots is None or self.shots < self._max_shots
+            if self.half_width <= self._precision or not budget_left:
+                self._done = True
+                break
+            if self._cancelled:
+                raise JobError('Job %s was cancelled' % self._job_id)
+            job = self._submit_round(self._backend)
+            # cancel() may have missed a round submitted meanwhile
+            if self._cancelled:
+                job.cancel()
+                raise JobError('Job %s was cancelled' % self._job_id)
+        return Result.from_dict({
+            'results': [{
+                'success': True,
+                'shots': self.shots,
+                'data': {'counts': {hex(int(bitstring, 2)): count
+                                    for bitstring, count in self.counts.items()}},
+                'header': {'memory_slots': len(next(iter(self.counts), '')),
+                           'name': self._circuit.name},
+            }],
+            'backend_name': self._backend.configuration().backend_name,
+            'backend_version': self._backend.configuration().backend_version,
+            'qobj_id': id(self._circuit),
+            'success': True,
+            'job_id': self._job_id,
+        })
+
+    def cancel(self):
+        """Stop the run, cancelling the round in progress."""
+        self._cancelled = True
+        if not self._done:
+            self.rounds[-1].cancel()
+
+    def status(self):
+        """Return the job status."""
+        if self._cancelled:
+            return JobStatus.CANCELLED
+        if self._done:
+            return JobStatus.DONE
+        return JobStatus.RUNNING
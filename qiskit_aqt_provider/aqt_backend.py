@@ -12,10 +12,17 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
+# pylint: disable=protected-access
+
+import copy
+import threading
 import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
+import numpy as np
 
+from qiskit import QuantumCircuit, transpile
 from qiskit import qobj as qobj_mod
 from qiskit.providers import BackendV1 as Backend
 from qiskit.providers import Options
@@ -23,12 +30,563 @@ from qiskit.providers.models import BackendConfiguration
 from qiskit.exceptions import QiskitError
 from qiskit.util import deprecate_arguments
 
+from . import aqt_adaptive
+from . import aqt_cutting
+from . import aqt_mps
 from . import aqt_job
+from . import aqt_ops
+from . import aqt_runtime
+from . import aqt_transport
+from . import qasm_to_aqt
 from . import qobj_to_aqt
 from . import circuit_to_aqt
+from .aqt_instrumentation import get_instrumentation
+
+
+class _AQTBackend(Backend):
+    """Common submission logic of the AQT gateway backends.
+
+    Backends can be shared by threads: ``run()`` and its variants read the
+    options once per call, and ``set_options`` replaces the options object
+    instead of changing it, so a call never sees a half-applied update.
+
+    If the provider has a ``scheduler`` (see ``aqt_scheduler``), every
+    submission first waits for a slot of the ``priority`` class given to
+    ``run()`` and its variants.
+
+    Every backend estimates the runtime of its payloads with a
+    ``runtime_model`` (see ``aqt_runtime``), which it calibrates from the
+    durations of its finished jobs. Jobs of ``run()`` only take part if the
+    provider has a scheduler, since their operations would otherwise have
+    to be built only for the estimate.
+
+    Options:
+        shots (int): Number of repetitions, at most ``max_shots``.
+        compress (bool): Send the payload as a gzip compressed body. Only
+            enable this for gateways that accept ``Content-Encoding: gzip``.
+    """
+
+    # a backend that is not served by a gateway sets its own transport
+    transport = None
+
+    def __init__(self, configuration, provider=None):
+        super().__init__(configuration=configuration, provider=provider)
+        self._options_lock = threading.Lock()
+        self.runtime_model = aqt_runtime.RuntimeModel()
+        instrumentation = getattr(provider, 'instrumentation', None)
+        if instrumentation is not None:
+            instrumentation.add_callback(self.runtime_model)
+
+    def set_options(self, **fields):
+        """Set options of the backend, see ``BackendV1.set_options``.
+
+        Raises:
+            AttributeError: If a field is not an option of this backend.
+        """
+        with self._options_lock:
+            for field in fields:
+                if not hasattr(self._options, field):
+                    raise AttributeError(
+                        "Options field %s is not valid for this "
+                        "backend" % field)
+            options = copy.copy(self._options)
+            options.update_options(**fields)
+            self._options = options
+
+    def _get_transport(self):
+        return self.transport or aqt_transport.get_transport(self._provider)
+
+    @classmethod
+    def _default_options(cls):
+        return Options(shots=100, compress=False)
+
+    @deprecate_arguments({'qobj': 'circuit'})
+    def run(self, circuit, **kwargs):
+        instrumentation = get_instrumentation(self._provider)
+        options = self.options
+        timings = {}
+        if isinstance(circuit, qobj_mod.QasmQobj):
+            warnings.warn("Passing in a QASMQobj object to run() is "
+                          "deprecated and will be removed in a future "
+                          "release", DeprecationWarning)
+            if circuit.config.shots > self.configuration().max_shots:
+                raise ValueError('Number of shots is larger than maximum '
+                                 'number of shots')
+            with instrumentation.span('circuit_to_aqt', timings,
+                                      backend=self.name()):
+                aqt_json = qobj_to_aqt.qobj_to_aqt(
+                    circuit, self._provider.access_token)[0]
+            experiment = circuit.experiments[0]
+            to_ops = qobj_to_aqt._experiment_to_ops
+        elif isinstance(circuit, qobj_mod.PulseQobj):
+            raise QiskitError("Pulse jobs are not accepted")
+        else:
+            for kwarg in kwargs:
+                if kwarg not in ('shots', 'compress', 'priority', 'user'):
+                    warnings.warn(
+                        "Option %s is not used by this backend" % kwarg,
+                        UserWarning, stacklevel=2)
+            out_shots = kwargs.get('shots', options.shots)
+            if out_shots > self.configuration().max_shots:
+                raise ValueError('Number of shots is larger than maximum '
+                                 'number of shots')
+            with instrumentation.span('circuit_to_aqt', timings,
+                                      backend=self.name()):
+                aqt_json = circuit_to_aqt.circuit_to_aqt(
+                    circuit, self._provider.access_token, shots=out_shots)[0]
+            experiment = circuit
+            to_ops = circuit_to_aqt._experiment_to_ops
+        # the payload only has its operations as JSON, they are only built
+        # again if the scheduler needs the estimated runtime
+        ops = None
+        if getattr(self._provider, 'scheduler', None) is not None:
+            ops = to_ops(experiment)
+        compress = kwargs.get('compress', options.compress)
+        job_id, token, ticket = self._submit(
+            aqt_json, compress, timings, kwargs.get('priority'),
+            kwargs.get('user'), ops)
+        return self._new_job(job_id, token, ticket, qobj=circuit,
+                             timings=timings)
+
+    def _new_job(self, job_id, token, ticket, **kwargs):
+        """Create the handle of a new remote job running one experiment.
+
+        If the provider limits its jobs, the job is handed to its watcher,
+        with a ``_SharedResult`` to keep what the watcher fetches.
+        """
+        watched = self._provider._limits_jobs()
+        shared = aqt_job._SharedResult(ticket) if watched else None
+        job = aqt_job.AQTJob(self, job_id, access_token=token, shared=shared,
+                             ticket=ticket, **kwargs)
+        if watched:
+            self._provider.watcher.add(job)
+        return job
+
+    def estimate_runtime(self, circuit, shots=None):
+        """Estimate how long a circuit occupies the backend.
+
+        Parameters:
+            circuit (QuantumCircuit or numpy.ndarray): The circuit, in the
+                AQT basis, or an operation array.
+            shots (int): Number of repetitions, the ``shots`` option by
+                default.
+
+        Returns:
+            float: Seconds, see ``aqt_runtime``.
+        """
+        if shots is None:
+            shots = self.options.shots
+        if isinstance(circuit, np.ndarray):
+            used = circuit['qubits'][circuit['num_qubits'] > 0]
+            return self.runtime_model.estimate(
+                circuit, int(used.max(initial=-1)) + 1, shots)
+        return self.runtime_model.estimate(
+            circuit_to_aqt._experiment_to_ops(circuit), circuit.num_qubits,
+            shots)
+
+    def _submit(self, aqt_json, compress, timings, priority=None, user=None,
+                ops=None):
+        """Send a payload to the gateway.
+
+        The submission first waits for a slot of the provider's scheduler,
+        if any, taking up the estimated runtime of the payload. The access
+        token is taken from the provider, which may hand out a different one
+        for every submission.
+
+        Parameters:
+            ops (numpy.ndarray): The operations of the payload. Without them
+                the job is not tracked by the ``runtime_model`` and takes up
+                a cost of one in the scheduler.
+
+        Returns:
+            tuple: The new job id, the token it was submitted with and the
+            scheduler ``Ticket`` of the job, or ``None``.
+        """
+        features = None
+        if ops is not None:
+            features = aqt_runtime.runtime_features(
+                ops, int(aqt_json['no_qubits']), int(aqt_json['repetitions']))
+        ticket = None
+        scheduler = getattr(self._provider, 'scheduler', None)
+        if scheduler is not None:
+            cost = 1.0
+            if features is not None:
+                cost = self.runtime_model.estimate_features(features)
+            with get_instrumentation(self._provider).span(
+                    'schedule', timings, backend=self.name(),
+                    priority=priority or scheduler.default_priority,
+                    user=user):
+                ticket = scheduler.acquire(priority, user, cost=cost)
+        try:
+            token = self._provider.acquire_token()
+        except Exception:
+            if ticket is not None:
+                ticket.release()
+            raise
+        data, header = aqt_transport.encode_payload(
+            dict(aqt_json, access_token=token), compress)
+        header.update({
+            "Ocp-Apim-Subscription-Key": token,
+            "SDK": "qiskit"
+        })
+        try:
+            with get_instrumentation(self._provider).span(
+                    'submit', timings, backend=self.name()) as span:
+                res = self._get_transport().put(self.url, data=data,
+                                                headers=header)
+                res.raise_for_status()
+                response = res.json()
+                if 'id' not in response:
+                    raise Exception
+                span['job_id'] = response['id']
+        except Exception:
+            self._provider.release_token(token, failed=True)
+            if ticket is not None:
+                ticket.release()
+            raise
+        if features is not None:
+            self.runtime_model.submitted(response['id'], features)
+        return response['id'], token, ticket
+
+    def run_native(self, ops, shots=None, num_qubits=None, measure_map=None,
+                   compress=None, name='native', num_clbits=None,
+                   priority=None, user=None):
+        """Run a native AQT operation sequence without building a circuit.
 
+        The sequence is validated and submitted as it is; the returned job
+        works like one returned by ``run()``.
 
-class AQTSimulator(Backend):
+        Typical usage is:
+
+        .. code-block:: python
+
+            job = backend.run_native([['X', 0.5, [0]], ['MS', 0.5, [0, 1]]],
+                                     shots=100, num_qubits=2,
+                                     measure_map={0: 0, 1: 1})
+            counts = job.get_counts()
+
+        Parameters:
+            ops (list or numpy.ndarray): ``[op_string, gate_exponent,
+                qubits]`` entries, or an array of ``aqt_ops.OP_DTYPE``.
+            shots (int): Number of repetitions, the ``shots`` option by
+                default.
+            num_qubits (int): Number of ions, by default one more than the
+                highest qubit used by ``ops`` or ``measure_map``.
+            measure_map (dict or list): Classical bit of every measured
+                qubit, as a dict or a list indexed by qubit with ``None``
+                for unmeasured qubits. By default qubit ``i`` is measured
+                into classical bit ``i``.
+            compress (bool): Compress the payload, see ``run``.
+            name (str): Experiment name used in the result.
+            num_clbits (int): Width of the outcomes, by default up to the
+                highest measured classical bit.
+            priority (str): Priority class of the job, see ``aqt_scheduler``.
+            user (str): User the job is scheduled for.
+
+        Returns:
+            AQTJob: The job.
+
+        Raises:
+            ValueError: If the sequence, the measurements or the number of
+                shots or qubits are invalid for this backend.
+        """
+        options = self.options
+        timings = {}
+        with get_instrumentation(self._provider).span(
+                'circuit_to_aqt', timings, backend=self.name()):
+            if not isinstance(ops, np.ndarray):
+                ops = aqt_ops.ops_from_list(ops)
+            if isinstance(measure_map, (list, tuple)):
+                measure_map = {qubit: clbit
+                               for qubit, clbit in enumerate(measure_map)
+                               if clbit is not None}
+            if num_qubits is None:
+                used = ops['qubits'][ops['num_qubits'] > 0]
+                num_qubits = int(max(used.max(initial=-1),
+                                     max(measure_map or [-1]))) + 1
+            if measure_map is None:
+                measure_map = {qubit: qubit for qubit in range(num_qubits)}
+            if shots is None:
+                shots = options.shots
+            if shots > self.configuration().max_shots:
+                raise ValueError('Number of shots is larger than maximum '
+                                 'number of shots')
+            if not 0 < num_qubits <= self.configuration().n_qubits:
+                raise ValueError('%s has %d qubits' %
+                                 (self.name(), self.configuration().n_qubits))
+            if not measure_map:
+                raise ValueError('At least one qubit must be measured')
+            if min(measure_map) < 0 or max(measure_map) >= num_qubits:
+                raise ValueError('Measured qubit out of range')
+            if len(set(measure_map.values())) != len(measure_map) or \
+                    min(measure_map.values()) < 0:
+                raise ValueError('Every measured qubit needs its own '
+                                 'non-negative classical bit')
+            aqt_ops.ops_validate(ops, num_qubits)
+            aqt_json = circuit_to_aqt.ops_to_aqt(
+                ops, num_qubits, self._provider.access_token, shots)
+        if compress is None:
+            compress = options.compress
+        job_id, token, ticket = self._submit(aqt_json, compress, timings,
+                                             priority, user, ops)
+        return self._new_job(job_id, token, ticket, timings=timings,
+                             measure_map=measure_map, name=name,
+                             num_clbits=num_clbits)
+
+    def run_qasm(self, qasm, shots=None, compress=None, name='qasm',
+                 priority=None, user=None):
+        """Run an OpenQASM 2 program.
+
+        Programs in the AQT basis are translated directly, see
+        ``qasm_to_aqt``. Other programs go through
+        ``QuantumCircuit.from_qasm_str`` and ``transpile``.
+
+        Parameters:
+            qasm (str or iterable): The program, or its lines.
+            shots (int): Number of repetitions, the ``shots`` option by
+                default.
+            compress (bool): Compress the payload, see ``run``.
+            name (str): Experiment name used in the result.
+            priority (str): Priority class of the job, see ``aqt_scheduler``.
+            user (str): User the job is scheduled for.
+
+        Returns:
+            AQTJob: The job.
+        """
+        if not isinstance(qasm, str):
+            qasm = ''.join(qasm)
+        try:
+            program = qasm_to_aqt.parse_qasm(qasm)
+        except qasm_to_aqt.UnsupportedQasm:
+            circuit = transpile(QuantumCircuit.from_qasm_str(qasm), self)
+            circuit.name = name
+            kwargs = {'priority': priority, 'user': user}
+            if compress is not None:
+                kwargs['compress'] = compress
+            if shots is not None:
+                kwargs['shots'] = shots
+            return self.run(circuit, **kwargs)
+        return self.run_native(program.ops, shots, program.num_qubits,
+                               program.measure_map, compress, name,
+                               program.num_clbits, priority, user)
+
+    def run_batch(self, circuits, shots=None, compress=None, pack=False,
+                  priority=None, user=None, max_runtime=None, max_workers=1):
+        """Run many circuits, executing identical ones together.
+
+        Every circuit is converted and fingerprinted (see
+        ``aqt_ops.ops_digest``). Circuits with the same gate sequence, which
+        may still differ in their measurements, are run as one remote job
+        with their shots added up, as long as the sum stays within
+        ``max_shots``. The samples are then split back out, so each circuit
+        gets its own job handle and result.
+
+        With ``pack``, narrow circuits are also placed side by side on
+        disjoint qubit ranges of one payload, as many as fit into the
+        backend's qubits. Such a job runs as many shots as its most demanding
+        circuit, and every circuit reads its own bit range of the samples.
+        Circuits with a global ``ms`` gate act on all ions and are never
+        packed. Packing assumes the circuits do not disturb each other.
+
+        Parameters:
+            circuits (list[QuantumCircuit]): The circuits.
+            shots (int or list[int]): Shots per circuit, the ``shots``
+                option by default.
+            compress (bool): Compress the payloads, see ``run``.
+            pack (bool): Pack circuits onto disjoint qubit ranges.
+            priority (str): Priority class of the jobs, see
+                ``aqt_scheduler``.
+            user (str): User the jobs are scheduled for.
+            max_runtime (float): Seconds a payload may take by the
+                ``runtime_model``. Circuits are only run together while
+                their payload stays within this estimate.
+            max_workers (int): Number of payloads submitted concurrently.
+
+        Returns:
+            list[AQTJob]: One job per circuit, in order.
+
+        Raises:
+            ValueError: If a circuit asks for more than ``max_shots`` shots.
+        """
+        options = self.options
+        max_shots = self.configuration().max_shots
+        if shots is None:
+            shots = options.shots
+        if isinstance(shots, int):
+            shots = [shots] * len(circuits)
+        if compress is None:
+            compress = options.compress
+        if any(circuit_shots > max_shots for circuit_shots in shots):
+            raise ValueError('Number of shots is larger than maximum '
+                             'number of shots')
+        instrumentation = get_instrumentation(self._provider)
+        # fingerprint -> ((ops, num_qubits), [[circuit index, ...], ...])
+        batches = OrderedDict()
+        conversions = []
+        for index, circuit in enumerate(circuits):
+            conversions.append({})
+            with instrumentation.span('circuit_to_aqt', conversions[-1],
+                                      backend=self.name()):
+                ops = circuit_to_aqt._experiment_to_ops(circuit)
+                key = aqt_ops.ops_digest(ops, circuit.num_qubits)
+            groups = batches.setdefault(key, ((ops, circuit.num_qubits),
+                                              []))[1]
+            total = shots[index] + sum(shots[member]
+                                       for member in groups[-1]) \
+                if groups else None
+            if total is None or total > max_shots or \
+                    max_runtime is not None and self.runtime_model.estimate(
+                        ops, circuit.num_qubits, total) > max_runtime:
+                groups.append([])
+            groups[-1].append(index)
+
+        def runtime(units):
+            """Estimated runtime of units packed into one payload."""
+            parts = []
+            offset = 0
+            for ops, width, _ in units:
+                parts.append(aqt_ops.ops_shift(ops, offset))
+                offset += width
+            return self.runtime_model.estimate(
+                np.concatenate(parts), offset,
+                max(sum(shots[member] for member in members)
+                    for _, _, members in units))
+
+        # every unit runs one gate sequence, several units share a payload
+        payloads = []
+        for (ops, num_qubits), groups in batches.values():
+            packable = pack and not aqt_ops.ops_have_global_gates(ops)
+            for members in groups:
+                unit = (ops, num_qubits, members)
+                for payload in payloads if packable else ():
+                    if payload[0] and payload[1] + num_qubits <= \
+                            self.configuration().n_qubits and \
+                            (max_runtime is None or
+                             runtime(payload[2] + [unit]) <= max_runtime):
+                        payload[2].append(unit)
+                        payload[1] += num_qubits
+                        break
+                else:
+                    payloads.append([packable, num_qubits, [unit]])
+
+        jobs = [None] * len(circuits)
+
+        def submit(payload):
+            _, num_qubits, units = payload
+            parts = []
+            offset = 0
+            for ops, width, members in units:
+                parts.append(aqt_ops.ops_shift(ops, offset))
+                offset += width
+            total = max(sum(shots[member] for member in members)
+                        for _, _, members in units)
+            payload_ops = np.concatenate(parts)
+            aqt_json = circuit_to_aqt.ops_to_aqt(
+                payload_ops, num_qubits, self._provider.access_token, total)
+            submitted = {}
+            job_id, token, ticket = self._submit(aqt_json, compress,
+                                                 submitted, priority, user,
+                                                 payload_ops)
+            watched = self._provider._limits_jobs()
+            shared = None
+            if len(units) > 1 or len(units[0][2]) > 1 or watched:
+                shared = aqt_job._SharedResult(ticket)
+            offset = 0
+            for _, width, members in units:
+                start = 0
+                for member in members:
+                    shot_range = None
+                    if shared is not None:
+                        shot_range = (start, start + shots[member])
+                    jobs[member] = aqt_job.AQTJob(
+                        self, job_id, access_token=token,
+                        qobj=circuits[member],
+                        timings=dict(conversions[member], **submitted),
+                        shot_range=shot_range, shared=shared,
+                        qubit_offset=offset, ticket=ticket)
+                    start += shots[member]
+                offset += width
+            if watched:
+                self._provider.watcher.add(jobs[units[0][2][0]])
+
+        if max_workers > 1 and len(payloads) > 1:
+            with ThreadPoolExecutor(max_workers) as pool:
+                list(pool.map(submit, payloads))
+        else:
+            for payload in payloads:
+                submit(payload)
+        return jobs
+
+    def run_adaptive(self, circuit, precision, observable=None,
+                     confidence=0.95, round_shots=None, max_shots=None,
+                     **kwargs):
+        """Run a circuit in rounds until a precision target is met.
+
+        Rounds of ``round_shots`` (by default ``max_shots``) shots are
+        submitted one after the other. After every round the confidence
+        interval of the estimate is updated from the accumulated counts, and
+        no further round is submitted once its half width is at most
+        ``precision``.
+
+        Parameters:
+            circuit (QuantumCircuit): The circuit to sample.
+            precision (float): Target confidence interval half width.
+            observable (callable or dict): Diagonal observable mapping a
+                bitstring of the counts to its eigenvalue. If ``None``, the
+                precision applies to every outcome probability.
+            confidence (float): Confidence level of the interval.
+            round_shots (int): Shots per round.
+            max_shots (int): Total shot budget, unlimited if ``None``.
+            **kwargs: Further run options, e.g. ``compress``.
+
+        Returns:
+            AQTAdaptiveJob: The job; its ``result()`` runs the rounds.
+        """
+        return aqt_adaptive.AQTAdaptiveJob(
+            self, circuit, precision, observable=observable,
+            confidence=confidence, round_shots=round_shots,
+            max_shots=max_shots, **kwargs)
+
+    def run_cut(self, circuit, shots=None, max_cuts=4, max_width=None,
+                **kwargs):
+        """Run a circuit wider than the backend by cutting its wires.
+
+        The circuit is split into fragments that fit the backend, and every
+        variant of every fragment is submitted as its own job right away,
+        see ``aqt_cutting``. Each cut multiplies the number of jobs by up
+        to four and adds statistical error to the reconstruction.
+
+        Typical usage is:
+
+        .. code-block:: python
+
+            job = backend.run_cut(circuit, shots=1000)
+            result = job.result()
+            probabilities = result.probabilities()
+            parity = result.expectation([0, 1])
+
+        Parameters:
+            circuit (QuantumCircuit): The circuit, in the AQT basis and
+                without global ``ms`` gates.
+            shots (int): Shots per fragment variant, the ``shots`` option
+                by default.
+            max_cuts (int): Largest number of cuts.
+            max_width (int): Largest fragment width, the number of qubits
+                of the backend by default.
+            **kwargs: Further options of ``run_native``, e.g. ``priority``.
+
+        Returns:
+            AQTCutJob: The job; its ``result()`` returns a ``CutResult``.
+
+        Raises:
+            ValueError: If the circuit cannot be cut to fit.
+        """
+        return aqt_cutting.AQTCutJob(self, circuit, shots=shots,
+                                     max_cuts=max_cuts, max_width=max_width,
+                                     **kwargs)
+
+
+class AQTSimulator(_AQTBackend):
 
     def __init__(self, provider):
         self.url = "https://gateway.aqt.eu/marmot/sim/"
@@ -59,49 +617,8 @@ class AQTSimulator(Backend):
             configuration=BackendConfiguration.from_dict(configuration),
             provider=provider)
 
-    @classmethod
-    def _default_options(cls):
-        return Options(shots=100)
-
-    @deprecate_arguments({'qobj': 'circuit'})
-    def run(self, circuit, **kwargs):
-        if isinstance(circuit, qobj_mod.QasmQobj):
-            warnings.warn("Passing in a QASMQobj object to run() is "
-                          "deprecated and will be removed in a future "
-                          "release", DeprecationWarning)
-            if circuit.config.shots > self.configuration().max_shots:
-                raise ValueError('Number of shots is larger than maximum '
-                                 'number of shots')
-            aqt_json = qobj_to_aqt.qobj_to_aqt(
-                circuit, self._provider.access_token)[0]
-        elif isinstance(circuit, qobj_mod.PulseQobj):
-            raise QiskitError("Pulse jobs are not accepted")
-        else:
-            for kwarg in kwargs:
-                if kwarg != 'shots':
-                    warnings.warn(
-                        "Option %s is not used by this backend" % kwarg,
-                        UserWarning, stacklevel=2)
-            out_shots = kwargs.get('shots', self.options.shots)
-            if out_shots > self.configuration().max_shots:
-                raise ValueError('Number of shots is larger than maximum '
-                                 'number of shots')
-            aqt_json = circuit_to_aqt.circuit_to_aqt(
-                circuit, self._provider.access_token, shots=out_shots)[0]
-        header = {
-            "Ocp-Apim-Subscription-Key": self._provider.access_token,
-            "SDK": "qiskit"
-        }
-        res = requests.put(self.url, data=aqt_json, headers=header)
-        res.raise_for_status()
-        response = res.json()
-        if 'id' not in response:
-            raise Exception
-        job = aqt_job.AQTJob(self, response['id'], qobj=circuit)
-        return job
-
 
-class AQTSimulatorNoise1(Backend):
+class AQTSimulatorNoise1(_AQTBackend):
 
     def __init__(self, provider):
         self.url = "https://gateway.aqt.eu/marmot/sim/noise-model-1"
@@ -133,49 +650,8 @@ class AQTSimulatorNoise1(Backend):
             configuration=BackendConfiguration.from_dict(configuration),
             provider=provider)
 
-    @classmethod
-    def _default_options(cls):
-        return Options(shots=100)
-
-    @deprecate_arguments({'qobj': 'circuit'})
-    def run(self, circuit, **kwargs):
-        if isinstance(circuit, qobj_mod.QasmQobj):
-            warnings.warn("Passing in a QASMQobj object to run() is "
-                          "deprecated and will be removed in a future "
-                          "release", DeprecationWarning)
-            if circuit.config.shots > self.configuration().max_shots:
-                raise ValueError('Number of shots is larger than maximum '
-                                 'number of shots')
-            aqt_json = qobj_to_aqt.qobj_to_aqt(
-                circuit, self._provider.access_token)[0]
-        elif isinstance(circuit, qobj_mod.PulseQobj):
-            raise QiskitError("Pulse jobs are not accepted")
-        else:
-            for kwarg in kwargs:
-                if kwarg != 'shots':
-                    warnings.warn(
-                        "Option %s is not used by this backend" % kwarg,
-                        UserWarning, stacklevel=2)
-            out_shots = kwargs.get('shots', self.options.shots)
-            if out_shots > self.configuration().max_shots:
-                raise ValueError('Number of shots is larger than maximum '
-                                 'number of shots')
-            aqt_json = circuit_to_aqt.circuit_to_aqt(
-                circuit, self._provider.access_token, shots=out_shots)[0]
-        header = {
-            "Ocp-Apim-Subscription-Key": self._provider.access_token,
-            "SDK": "qiskit"
-        }
-        res = requests.put(self.url, data=aqt_json, headers=header)
-        res.raise_for_status()
-        response = res.json()
-        if 'id' not in response:
-            raise Exception
-        job = aqt_job.AQTJob(self, response['id'], qobj=circuit)
-        return job
 
-
-class AQTDevice(Backend):
+class AQTDevice(_AQTBackend):
 
     def __init__(self, provider):
         self.url = 'https://gateway.aqt.eu/marmot/lint'
@@ -206,43 +682,53 @@ class AQTDevice(Backend):
             configuration=BackendConfiguration.from_dict(configuration),
             provider=provider)
 
-    @classmethod
-    def _default_options(cls):
-        return Options(shots=100)
 
-    @deprecate_arguments({'qobj': 'circuit'})
-    def run(self, circuit, **kwargs):
-        if isinstance(circuit, qobj_mod.QasmQobj):
-            warnings.warn("Passing in a QASMQobj object to run() is "
-                          "deprecated and will be removed in a future "
-                          "release", DeprecationWarning)
-            if circuit.config.shots > self.configuration().max_shots:
-                raise ValueError('Number of shots is larger than maximum '
-                                 'number of shots')
-            aqt_json = qobj_to_aqt.qobj_to_aqt(
-                circuit, self._provider.access_token)[0]
-        elif isinstance(circuit, qobj_mod.PulseQobj):
-            raise QiskitError("Pulse jobs are not accepted")
-        else:
-            for kwarg in kwargs:
-                if kwarg != 'shots':
-                    warnings.warn(
-                        "Option %s is not used by this backend" % kwarg,
-                        UserWarning, stacklevel=2)
-            out_shots = kwargs.get('shots', self.options.shots)
-            if out_shots > self.configuration().max_shots:
-                raise ValueError('Number of shots is larger than maximum '
-                                 'number of shots')
-            aqt_json = circuit_to_aqt.circuit_to_aqt(
-                circuit, self._provider.access_token, shots=out_shots)[0]
-        header = {
-            "Ocp-Apim-Subscription-Key": self._provider.access_token,
-            "SDK": "qiskit"
+class AQTMPSSimulator(_AQTBackend):
+    """Local matrix product state simulator, see ``aqt_mps``.
+
+    Jobs run in the submitting process, so results are ready as soon as
+    ``run()`` returns. The result of a job has the ``truncation_error`` and
+    final ``bond_dimensions`` of the simulation.
+
+    Options:
+        max_bond (int): Largest bond dimension.
+        cutoff (float): Relative weight below which singular values are
+            dropped.
+        seed (int): Seed of the sampling, random if ``None``.
+    """
+
+    def __init__(self, provider):
+        self.url = 'local://aqt_mps_simulator'
+        configuration = {
+            'backend_name': 'aqt_mps_simulator',
+            'backend_version': '0.0.1',
+            'url': self.url,
+            'simulator': True,
+            'local': True,
+            'coupling_map': None,
+            'description': 'Local matrix product state simulator of AQT '
+                           'trapped-ion devices',
+            'basis_gates': ['rx', 'ry', 'rxx', 'ms'],
+            'memory': False,
+            'n_qubits': 60,
+            'conditional': False,
+            'max_shots': 10000,
+            'max_experiments': 1,
+            'open_pulse': False,
+            'gates': [
+                {
+                    'name': 'TODO',
+                    'parameters': [],
+                    'qasm_def': 'TODO'
+                }
+            ]
         }
-        res = requests.put(self.url, data=aqt_json, headers=header)
-        res.raise_for_status()
-        response = res.json()
-        if 'id' not in response:
-            raise Exception
-        job = aqt_job.AQTJob(self, response['id'], qobj=circuit)
-        return job
+        super().__init__(
+            configuration=BackendConfiguration.from_dict(configuration),
+            provider=provider)
+        self.transport = aqt_mps.MPSTransport(self)
+
+    @classmethod
+    def _default_options(cls):
+        return Options(shots=100, compress=False, max_bond=64, cutoff=1e-12,
+                       seed=None)
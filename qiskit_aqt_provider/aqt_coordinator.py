@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Central submission and polling for many worker processes.
+
+Worker processes share an SQLite database. Their providers use a
+``CoordinatedTransport``: submissions are written to the database instead
+of being sent to the gateway, and polls read the state of the job from
+the database. A single ``Coordinator`` daemon submits the queued
+payloads, keeping at most ``max_in_flight`` jobs on the gateway, polls
+every remote job once per cycle and stores the results for the waiting
+workers.
+
+The database uses SQLite's rollback journal, which relies on the file
+locks of the file system. Keep it on a local file system, shared by the
+workers of one host. SQLite cannot be used safely from several hosts
+over most network file systems, whose locking is unreliable.
+
+Access tokens are never written to the database. Payloads are stored
+without their token, along with a fingerprint of it (see ``token_id``),
+and the coordinator adds the token it holds for that fingerprint when it
+submits and polls the job.
+
+Worker side:
+
+.. code-block:: python
+
+    aqt = AQTProvider('MY_TOKEN',
+                      transport=CoordinatedTransport('/var/lib/aqt.db'))
+    job = aqt.get_backend('aqt_qasm_simulator').run(circuit)
+    job.result()
+
+Daemon side, with one access token per line in ``tokens.txt``::
+
+    python -m qiskit_aqt_provider.aqt_coordinator /var/lib/aqt.db \\
+        --token-file tokens.txt
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.parse import parse_qs, urlencode
+
+from .aqt_transport import ReplayedResponse, Transport, get_transport
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    data BLOB NOT NULL,
+    encoded INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    token_id TEXT,
+    state TEXT NOT NULL,
+    remote_id TEXT,
+    response BLOB,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+)
+"""
+
+# states of a job in the database
+QUEUED = 'queued'
+SUBMITTED = 'submitted'
+FINISHED = 'finished'
+ERROR = 'error'
+
+_TOKEN_HEADER = 'Ocp-Apim-Subscription-Key'
+
+
+def token_id(token):
+    """Return the fingerprint under which jobs of a token are stored.
+
+    Parameters:
+        token (str): An access token.
+
+    Returns:
+        str: A hex digest of the token.
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:32]
+
+
+def _decode_form(data):
+    fields = parse_qs(gzip.decompress(data).decode('utf-8'))
+    return {key: values[0] for key, values in fields.items()}
+
+
+def _encode_form(fields):
+    return gzip.compress(urlencode(fields).encode('utf-8'))
+
+
+class _Database:
+    """One SQLite connection per thread on a shared database file."""
+
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self._timeout = timeout
+        self._local = threading.local()
+        with self.connection() as connection:
+            connection.execute('PRAGMA journal_mode=DELETE')
+            connection.execute(_SCHEMA)
+            connection.execute('CREATE INDEX IF NOT EXISTS jobs_state '
+                               'ON jobs (state, created)')
+
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self._timeout)
+            self._local.connection = connection
+        return connection
+
+
+def _json_response(body, url, status_code=200):
+    return ReplayedResponse(status_code, {'Content-Type': 'application/json'},
+                            json.dumps(body).encode('utf-8'), url)
+
+
+class CoordinatedTransport(Transport):
+    """Transport of a worker, exchanging jobs through the database."""
+
+    def __init__(self, path, timeout=30.0):
+        """Open the shared database.
+
+        Parameters:
+            path (str): The SQLite database file.
+            timeout (float): Seconds to wait for a locked database.
+        """
+        self._db = _Database(path, timeout)
+
+    def put(self, url, data=None, headers=None, stream=False):
+        if isinstance(data, dict) and 'id' in data:
+            return self._poll(url, data['id'])
+        return self._enqueue(url, data, headers)
+
+    def _enqueue(self, url, data, headers):
+        job_id = uuid.uuid4().hex
+        encoded = isinstance(data, bytes)
+        headers = dict(headers or {})
+        token = headers.pop(_TOKEN_HEADER, None)
+        fields = _decode_form(data) if encoded else dict(data)
+        token = fields.pop('access_token', None) or token
+        data = _encode_form(fields) if encoded else json.dumps(fields)
+        now = time.time()
+        with self._db.connection() as connection:
+            connection.execute(
+                'INSERT INTO jobs (id, url, data, encoded, headers, token_id, '
+                'state, created, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, url, data, encoded, json.dumps(headers),
+                 token and token_id(token), QUEUED, now, now))
+        return _json_response({'id': job_id}, url)
+
+    def _poll(self, url, job_id):
+        row = self._db.connection().execute(
+            'SELECT state, response FROM jobs WHERE id = ?',
+            (job_id,)).fetchone()
+        if row is None:
+            return _json_response({'id': job_id, 'status': 'error',
+                                   'error': 'Unknown job'}, url, 404)
+        state, response = row
+        if state in (FINISHED, ERROR):
+            return ReplayedResponse(200, {'Content-Type': 'application/json'},
+                                    bytes(response), url)
+        return _json_response({'id': job_id, 'status': 'queued'}, url, 202)
+
+
+class Coordinator:
+    """Submits and polls the jobs of all workers sharing a database.
+
+    Only one coordinator should serve a database at a time. It submits
+    and polls every job with the access token whose ``token_id`` the job
+    was stored with; jobs of other tokens fail.
+
+    Attributes:
+        max_in_flight (int): Largest number of jobs on the gateway.
+        interval (float): Seconds between cycles.
+        max_age (float): Seconds after which finished jobs are deleted.
+    """
+
+    def __init__(self, path, transport=None, max_in_flight=8, interval=1.0,
+                 max_age=86400.0, access_tokens=()):
+        """Create a coordinator.
+
+        Parameters:
+            path (str): The SQLite database file.
+            transport (Transport): Transport to the gateway.
+            max_in_flight (int): Largest number of jobs on the gateway.
+            interval (float): Seconds between cycles.
+            max_age (float): Seconds after which finished jobs are deleted.
+            access_tokens (list[str]): The access tokens of the workers.
+        """
+        self._db = _Database(path)
+        self._tokens = {token_id(token): token for token in access_tokens}
+        self.transport = transport or get_transport(None)
+        self.max_in_flight = max_in_flight
+        self.interval = interval
+        self.max_age = max_age
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _update(self, job_id, **columns):
+        columns['updated'] = time.time()
+        names = ', '.join('%s = ?' % name for name in columns)
+        with self._db.connection() as connection:
+            connection.execute('UPDATE jobs SET %s WHERE id = ?' % names,
+                               list(columns.values()) + [job_id])
+
+    def _fail(self, job_id, error):
+        logger.warning('AQT job %s failed: %s', job_id, error)
+        self._update(job_id, state=ERROR, response=json.dumps(
+            {'id': job_id, 'status': 'error', 'error': str(error)}).encode())
+
+    def _submit_queued(self):
+        connection = self._db.connection()
+        in_flight, = connection.execute(
+            'SELECT COUNT(*) FROM jobs WHERE state = ?',
+            (SUBMITTED,)).fetchone()
+        free = self.max_in_flight - in_flight
+        if free <= 0:
+            return 0
+        rows = connection.execute(
+            'SELECT id, url, data, encoded, headers, token_id FROM jobs '
+            'WHERE state = ? ORDER BY created LIMIT ?',
+            (QUEUED, free)).fetchall()
+        for job_id, url, data, encoded, headers, key in rows:
+            token = self._tokens.get(key)
+            if token is None:
+                self._fail(job_id, 'No access token for the job')
+                continue
+            headers = dict(json.loads(headers), **{_TOKEN_HEADER: token})
+            if encoded:
+                data = _encode_form(dict(_decode_form(bytes(data)),
+                                         access_token=token))
+            else:
+                data = dict(json.loads(data), access_token=token)
+            try:
+                response = self.transport.put(url, data=data, headers=headers)
+                response.raise_for_status()
+                remote_id = response.json()['id']
+            except Exception as ex:  # pylint: disable=broad-except
+                self._fail(job_id, ex)
+                continue
+            self._update(job_id, state=SUBMITTED, remote_id=remote_id)
+        return len(rows)
+
+    def _poll_submitted(self):
+        rows = self._db.connection().execute(
+            'SELECT id, url, headers, token_id, remote_id FROM jobs '
+            'WHERE state = ?', (SUBMITTED,)).fetchall()
+        for job_id, url, headers, key, remote_id in rows:
+            token = self._tokens.get(key)
+            if token is None:
+                self._fail(job_id, 'No access token for the job')
+                continue
+            headers = dict(json.loads(headers), **{_TOKEN_HEADER: token})
+            headers.pop('Content-Encoding', None)
+            headers.pop('Content-Type', None)
+            try:
+                response = self.transport.put(
+                    url, data={'id': remote_id, 'access_token': token},
+                    headers=headers)
+                body = response.content
+                status = json.loads(body.decode('utf-8'))['status']
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.warning('Polling AQT job %s failed: %s', remote_id, ex)
+                continue
+            if status in (FINISHED, ERROR):
+                self._update(job_id, state=status, response=body)
+
+    def run_once(self):
+        """Run one cycle: poll the jobs on the gateway, submit queued jobs
+        and delete old finished jobs.
+
+        Returns:
+            dict: Number of jobs in each state afterwards.
+        """
+        self._poll_submitted()
+        self._submit_queued()
+        with self._db.connection() as connection:
+            connection.execute(
+                'DELETE FROM jobs WHERE state IN (?, ?) AND updated < ?',
+                (FINISHED, ERROR, time.time() - self.max_age))
+        return self.counts()
+
+    def counts(self):
+        """Return the number of jobs in each state."""
+        return dict(self._db.connection().execute(
+            'SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall())
+
+    def serve_forever(self):
+        """Run cycles until ``stop()`` is called."""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except sqlite3.Error as ex:
+                logger.warning('Coordinator cycle failed: %s', ex)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Run ``serve_forever`` in a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        name='aqt-coordinator', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the cycles and wait for the current one to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main(argv=None):
+    """Run a coordinator from the command line."""
+    parser = argparse.ArgumentParser(
+        description='Submit and poll the AQT jobs of all workers sharing '
+                    'a database.')
+    parser.add_argument('path', help='SQLite database file')
+    parser.add_argument('--max-in-flight', type=int, default=8)
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--token-file',
+                        help='file with one access token per line')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    tokens = []
+    if args.token_file:
+        with open(args.token_file) as token_file:
+            tokens = [line.strip() for line in token_file if line.strip()]
+    coordinator = Coordinator(args.path, max_in_flight=args.max_in_flight,
+                              interval=args.interval, access_tokens=tokens)
+    try:
+        coordinator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
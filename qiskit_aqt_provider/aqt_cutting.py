@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Wire cutting: running circuits wider than a backend as smaller jobs.
+
+Cutting the wire of a qubit between two gates splits its state into a
+sum over the Pauli operators ``I``, ``X``, ``Y`` and ``Z``: the fragment
+before the cut measures the qubit in the ``Z``, ``X`` or ``Y`` basis, and
+the fragment after the cut starts it in ``|0>``, ``|1>``, ``|+>`` or
+``|+i>``. Every fragment is run once per combination of these variants,
+and the outcome distribution of the whole circuit is rebuilt as
+
+    p(x) = 2 ** -K * sum over M of prod over fragments of T_f(x_f, M)
+
+where ``K`` is the number of cuts and ``T_f`` holds the estimates of each
+fragment for every Pauli operator on its cuts. The sum is one
+``numpy.einsum`` over the fragment tensors.
+
+Cuts are chosen greedily among the positions between the two-qubit gates
+of every qubit, each time taking the cut that leaves the narrowest
+fragments, until all fragments fit. A fragment has ``3 ** out * 4 ** in``
+variants for ``out`` cuts it measures and ``in`` cuts it prepares, and the
+statistical error of the reconstruction grows by a similar factor, so
+only circuits that separate with few cuts are worth cutting.
+
+Circuits must be written in the AQT basis and must not contain global
+``ms`` gates, which act on every ion and cannot be cut.
+"""
+
+import bisect
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from qiskit.providers import JobV1
+from qiskit.providers import JobError
+from qiskit.providers.jobstatus import JobStatus
+
+from . import aqt_job
+from . import aqt_ops
+from . import circuit_to_aqt
+from .aqt_estimator import parity
+
+# measurement bases of a cut's upstream end, and the operations rotating
+# each basis onto Z
+BASES = ('Z', 'X', 'Y')
+_BASIS_OPS = {'Z': [], 'X': [('Y', -0.5)], 'Y': [('X', 0.5)]}
+# initial states of a cut's downstream end, and the operations preparing
+# them from |0>
+STATES = ('0', '1', '+', '+i')
+_STATE_OPS = {'0': [], '1': [('X', 0.5), ('X', 0.5)], '+': [('Y', 0.5)],
+              '+i': [('X', -0.5)]}
+# PAULIS = ('I', 'X', 'Y', 'Z') in terms of the prepared states
+_STATE_COEFFICIENTS = np.array([[1, 1, 0, 0],
+                                [-1, -1, 2, 0],
+                                [-1, -1, 0, 2],
+                                [1, -1, 0, 0]], dtype=float)
+# bases estimating I (any of them) and X, Y, Z
+_PAULI_BASES = (BASES, ('X',), ('Y',), ('Z',))
+_LETTERS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+class _UnionFind:
+
+    def __init__(self):
+        self._parent = {}
+
+    def find(self, item):
+        parent = self._parent.setdefault(item, item)
+        if parent != item:
+            parent = self._parent[item] = self.find(parent)
+        return parent
+
+    def union(self, first, second):
+        self._parent[self.find(first)] = self.find(second)
+
+
+def _segment(cuts, qubit, position):
+    return qubit, bisect.bisect_right(cuts[qubit], position)
+
+
+def _fragments(ops, num_qubits, cuts):
+    """Group the wire segments left by ``cuts`` into fragments.
+
+    Parameters:
+        ops (numpy.ndarray): The operations.
+        num_qubits (int): Number of qubits.
+        cuts (dict): Sorted cut positions per qubit. A cut at ``p`` lies
+            before operation ``p``.
+
+    Returns:
+        list[list[tuple]]: The ``(qubit, segment)`` of every fragment.
+    """
+    components = _UnionFind()
+    for qubit in range(num_qubits):
+        for segment in range(len(cuts[qubit]) + 1):
+            components.find((qubit, segment))
+    two_qubit = np.nonzero(ops['num_qubits'] == 2)[0]
+    for position, (first, second) in zip(
+            two_qubit.tolist(), ops['qubits'][two_qubit, :2].tolist()):
+        components.union(_segment(cuts, first, position),
+                         _segment(cuts, second, position))
+    groups = {}
+    for qubit in range(num_qubits):
+        for segment in range(len(cuts[qubit]) + 1):
+            groups.setdefault(components.find((qubit, segment)),
+                              []).append((qubit, segment))
+    return list(groups.values())
+
+
+def find_cuts(ops, num_qubits, max_width, max_cuts=4):
+    """Choose wire cuts leaving fragments of at most ``max_width`` qubits.
+
+    Parameters:
+        ops (numpy.ndarray): The operations, see ``aqt_ops``.
+        num_qubits (int): Number of qubits.
+        max_width (int): Largest fragment width.
+        max_cuts (int): Largest number of cuts.
+
+    Returns:
+        list[tuple]: ``(qubit, position)`` of every cut, the cut lying
+        before operation ``position`` on ``qubit``.
+
+    Raises:
+        ValueError: If no such cuts were found.
+    """
+    if aqt_ops.ops_have_global_gates(ops):
+        raise ValueError('Circuits with global ms gates cannot be cut')
+    two_qubit = np.nonzero(ops['num_qubits'] == 2)[0].tolist()
+    candidates = []
+    for qubit in range(num_qubits):
+        positions = [position for position in two_qubit
+                     if qubit in ops['qubits'][position, :2]]
+        candidates.extend((qubit, position) for position in positions[1:])
+    cuts = {qubit: [] for qubit in range(num_qubits)}
+
+    def cost(trial):
+        widths = [len(fragment)
+                  for fragment in _fragments(ops, num_qubits, trial)]
+        return max(widths), sum(width ** 2 for width in widths)
+
+    chosen = []
+    while cost(cuts)[0] > max_width:
+        if len(chosen) == max_cuts or len(chosen) == len(candidates):
+            raise ValueError('Circuit cannot be cut into fragments of %d '
+                             'qubits with %d cuts' % (max_width, max_cuts))
+        best = None
+        for qubit, position in candidates:
+            if (qubit, position) in chosen:
+                continue
+            trial = dict(cuts)
+            trial[qubit] = sorted(cuts[qubit] + [position])
+            trial_cost = cost(trial)
+            if best is None or trial_cost < best[0]:
+                best = (trial_cost, qubit, position, trial)
+        _, qubit, position, cuts = best
+        chosen.append((qubit, position))
+    return sorted(chosen)
+
+
+def _single_qubit_ops(gates_per_ion):
+    names, exponents, qubit_lists = [], [], []
+    for ion, gates in gates_per_ion:
+        for name, exponent in gates:
+            names.append(name)
+            exponents.append(exponent)
+            qubit_lists.append([ion])
+    return aqt_ops.ops_from_columns(names, exponents, qubit_lists)
+
+
+class Fragment:
+    """A part of a cut circuit, run as ``variants`` separate jobs.
+
+    Attributes:
+        segments (list[tuple]): ``(qubit, segment)`` of every ion.
+        clbits (list[int]): Classical bit of the original circuit of every
+            output bit; output bit ``i`` is bit ``i`` of the samples.
+        in_cuts (list[int]): The cuts whose downstream end starts here.
+        out_cuts (list[int]): The cuts whose upstream end is measured here,
+            in bits ``len(clbits)`` and up of the samples.
+    """
+
+    def __init__(self, segments, clbits, in_cuts, out_cuts, body,
+                 output_ions, in_ions, out_ions):
+        self.segments = segments
+        self.clbits = clbits
+        self.in_cuts = in_cuts
+        self.out_cuts = out_cuts
+        self._body = body
+        self._output_ions = output_ions
+        self._in_ions = in_ions
+        self._out_ions = out_ions
+
+    @property
+    def width(self):
+        """int: Number of ions."""
+        return len(self.segments)
+
+    def variants(self):
+        """Return every combination of cut states and bases.
+
+        Returns:
+            list[tuple]: ``(states, bases)``, one entry of ``STATES`` per
+            in cut and of ``BASES`` per out cut.
+        """
+        return list(itertools.product(
+            itertools.product(STATES, repeat=len(self.in_cuts)),
+            itertools.product(BASES, repeat=len(self.out_cuts))))
+
+    def variant_ops(self, states, bases):
+        """Return the operations of one variant.
+
+        Returns:
+            numpy.ndarray: The operations, see ``aqt_ops``.
+        """
+        head = _single_qubit_ops(
+            (ion, _STATE_OPS[state])
+            for ion, state in zip(self._in_ions, states))
+        tail = _single_qubit_ops(
+            (ion, _BASIS_OPS[basis])
+            for ion, basis in zip(self._out_ions, bases))
+        return np.concatenate([head, self._body, tail])
+
+    def measure_map(self):
+        """dict: The sample bit of every measured ion."""
+        ions = self._output_ions + self._out_ions
+        return dict(zip(ions, range(len(ions))))
+
+    def tensor(self, samples):
+        """Estimate the fragment tensor from the samples of every variant.
+
+        Parameters:
+            samples (dict): Samples per ``(states, bases)`` variant.
+
+        Returns:
+            numpy.ndarray: ``T[m_in..., m_out..., x]`` with one axis of
+            size four per cut, indexing ``I``, ``X``, ``Y``, ``Z``, and
+            the output bits ``x`` last.
+        """
+        num_out = len(self.out_cuts)
+        size = 1 << len(self.clbits)
+        # per variant: axis per out cut of size two, for I and for the
+        # measured Pauli, then x
+        estimates = {}
+        pair = np.array([[1, 1], [1, -1]], dtype=float)
+        for variant, variant_samples in samples.items():
+            histogram = np.bincount(np.asarray(variant_samples),
+                                    minlength=size << num_out)
+            histogram = histogram.reshape((2,) * num_out + (size,)) / \
+                len(variant_samples)
+            # reshape puts the highest cut bit first, put cut 0 first
+            histogram = histogram.transpose(
+                list(range(num_out - 1, -1, -1)) + [num_out])
+            for axis in range(num_out):
+                histogram = np.moveaxis(np.tensordot(
+                    pair, histogram, axes=([1], [axis])), 0, axis)
+            estimates[variant] = histogram
+        tensor = np.zeros((4,) * len(self.in_cuts) + (4,) * num_out +
+                          (size,))
+        for states in itertools.product(range(4), repeat=len(self.in_cuts)):
+            for paulis in itertools.product(range(4), repeat=num_out):
+                index = tuple(int(pauli > 0) for pauli in paulis)
+                options = [estimates[(tuple(STATES[s] for s in states),
+                                      bases)][index]
+                           for bases in itertools.product(
+                               *[_PAULI_BASES[pauli] for pauli in paulis])]
+                tensor[states + paulis] = np.mean(options, axis=0)
+        for axis in range(len(self.in_cuts)):
+            tensor = np.moveaxis(np.tensordot(
+                _STATE_COEFFICIENTS, tensor, axes=([1], [axis])), 0, axis)
+        return tensor
+
+
+def cut_circuit(ops, num_qubits, clbits, max_width, max_cuts=4):
+    """Cut an operation sequence into fragments.
+
+    Parameters:
+        ops (numpy.ndarray): The operations, see ``aqt_ops``.
+        num_qubits (int): Number of qubits.
+        clbits (numpy.ndarray): Classical bit of every qubit, ``-1`` if it
+            is not measured.
+        max_width (int): Largest fragment width.
+        max_cuts (int): Largest number of cuts.
+
+    Returns:
+        tuple: The list of ``(qubit, position)`` cuts and the list of
+        ``Fragment``.
+    """
+    cut_list = find_cuts(ops, num_qubits, max_width, max_cuts)
+    cuts = {qubit: [] for qubit in range(num_qubits)}
+    for qubit, position in cut_list:
+        cuts[qubit].append(position)
+    cut_index = {cut: index for index, cut in enumerate(cut_list)}
+    clbits = list(clbits) + [-1] * (num_qubits - len(clbits))
+    fragments = []
+    for segments in _fragments(ops, num_qubits, cuts):
+        segments.sort()
+        ions = {segment: ion for ion, segment in enumerate(segments)}
+        # the cut before a segment, and the cut after it
+        in_cuts, out_cuts, outputs = [], [], []
+        for qubit, segment in segments:
+            if segment > 0:
+                in_cuts.append(cut_index[(qubit, cuts[qubit][segment - 1])])
+            if segment < len(cuts[qubit]):
+                out_cuts.append(cut_index[(qubit, cuts[qubit][segment])])
+            elif clbits[qubit] >= 0:
+                outputs.append((qubit, segment))
+        if not outputs and not in_cuts and not out_cuts:
+            continue
+        names, exponents, qubit_lists = [], [], []
+        for position, (op, exponent, count, qubits) in enumerate(zip(
+                ops['op'].tolist(), ops['exponent'].tolist(),
+                ops['num_qubits'].tolist(), ops['qubits'].tolist())):
+            mapped = [ions.get(_segment(cuts, qubit, position))
+                      for qubit in qubits[:count]]
+            if mapped[0] is None:
+                continue
+            names.append(aqt_ops.OP_NAMES[op])
+            exponents.append(exponent)
+            qubit_lists.append(mapped)
+        fragments.append(Fragment(
+            segments, [clbits[qubit] for qubit, _ in outputs], in_cuts,
+            out_cuts, aqt_ops.ops_from_columns(names, exponents, qubit_lists),
+            [ions[segment] for segment in outputs],
+            [ions[(qubit, segment)] for qubit, segment in segments
+             if segment > 0],
+            [ions[(qubit, segment)] for qubit, segment in segments
+             if segment < len(cuts[qubit])]))
+    return cut_list, fragments
+
+
+class CutResult:
+    """Reconstructed outcomes of a cut circuit.
+
+    The reconstruction is a quasi-probability distribution: finite
+    sampling can make some of its entries slightly negative.
+
+    Attributes:
+        num_cuts (int): Number of cuts.
+        num_clbits (int): Number of classical bits of the circuit.
+        tensors (list[numpy.ndarray]): The fragment tensors, see
+            ``Fragment.tensor``.
+    """
+
+    def __init__(self, fragments, tensors, num_cuts, num_clbits):
+        self._fragments = fragments
+        self.tensors = tensors
+        self.num_cuts = num_cuts
+        self.num_clbits = num_clbits
+
+    def _contract(self, tensors, extras, outputs=''):
+        """Sum the product of the tensors over all cut indices."""
+        subscripts = [''.join(_LETTERS[cut] for cut in
+                              fragment.in_cuts + fragment.out_cuts) + extra
+                      for fragment, extra in zip(self._fragments, extras)]
+        return np.einsum('%s->%s' % (','.join(subscripts), outputs),
+                         *tensors, optimize=True) / 2 ** self.num_cuts
+
+    def probabilities(self):
+        """Return the distribution of the measured classical bits.
+
+        Returns:
+            dict: Quasi-probabilities keyed by integer outcome, with bit
+            ``i`` holding classical bit ``i``.
+
+        Raises:
+            ValueError: If too many bits are measured for a dense
+                distribution.
+        """
+        measured = sorted(clbit for fragment in self._fragments
+                          for clbit in fragment.clbits)
+        if self.num_cuts + len(measured) > len(_LETTERS) or \
+                len(measured) > 24:
+            raise ValueError('Too many measured bits for a distribution, '
+                             'use expectation()')
+        letter = {clbit: _LETTERS[self.num_cuts + rank]
+                  for rank, clbit in enumerate(measured)}
+        tensors, extras = [], []
+        for fragment, tensor in zip(self._fragments, self.tensors):
+            tensors.append(tensor.reshape(tensor.shape[:-1] +
+                                          (2,) * len(fragment.clbits)))
+            extras.append(''.join(letter[clbit]
+                                  for clbit in reversed(fragment.clbits)))
+        values = self._contract(
+            tensors, extras,
+            ''.join(letter[clbit] for clbit in reversed(measured))
+        ).reshape(-1)
+        outcomes = np.zeros(len(values), dtype=np.int64)
+        for rank, clbit in enumerate(measured):
+            outcomes |= ((np.arange(len(values)) >> rank) & 1) << clbit
+        keep = np.nonzero(values)[0]
+        return dict(zip(outcomes[keep].tolist(), values[keep].tolist()))
+
+    def expectation(self, clbits):
+        """Return the expectation value of the parity of some bits, i.e. of
+        the product of ``Z`` on the qubits measured into them.
+
+        Parameters:
+            clbits (list[int]): The classical bits.
+
+        Returns:
+            float: The expectation value.
+        """
+        clbits = set(clbits)
+        reduced = []
+        for fragment, tensor in zip(self._fragments, self.tensors):
+            mask = sum(1 << bit for bit, clbit in enumerate(fragment.clbits)
+                       if clbit in clbits)
+            outcomes = np.arange(tensor.shape[-1])
+            reduced.append(tensor @ (1 - 2 * parity(outcomes & mask)))
+        return float(self._contract(reduced, [''] * len(reduced)))
+
+
+class AQTCutJob(JobV1):
+    """Runs a circuit wider than its backend as cut fragments.
+
+    All variants of all fragments are submitted as separate jobs on
+    creation; ``result()`` waits for them and reconstructs the outcomes,
+    see ``aqt_cutting``.
+
+    Attributes:
+        cuts (list[tuple]): ``(qubit, position)`` of every cut.
+        fragments (list[Fragment]): The fragments.
+        jobs (list[AQTJob]): One job per fragment variant.
+    """
+
+    def __init__(self, backend, circuit, shots=None, max_cuts=4,
+                 max_width=None, max_workers=8, **run_options):
+        """Cut the circuit and submit its fragments.
+
+        Parameters:
+            backend (BaseBackend): Backend to run the fragments on.
+            circuit (QuantumCircuit): The circuit, in the AQT basis.
+            shots (int): Shots per fragment variant.
+            max_cuts (int): Largest number of cuts.
+            max_width (int): Largest fragment width, the number of qubits
+                of the backend by default.
+            max_workers (int): Number of concurrent submissions and polls.
+            **run_options: Further options passed on to
+                ``backend.run_native``, e.g. ``priority``.
+
+        Raises:
+            ValueError: If the circuit cannot be cut to fit the backend.
+        """
+        ops = circuit_to_aqt._experiment_to_ops(circuit)
+        self.cuts, self.fragments = cut_circuit(
+            ops, circuit.num_qubits, aqt_job._clbit_map(circuit),
+            max_width or backend.configuration().n_qubits, max_cuts)
+        self._num_clbits = circuit.num_clbits
+        self._max_workers = max_workers
+        self._cancelled = False
+        self._result = None
+        submissions = []
+        for index, fragment in enumerate(self.fragments):
+            for number, (states, bases) in enumerate(fragment.variants()):
+                submissions.append((index, (states, bases), dict(
+                    ops=fragment.variant_ops(states, bases), shots=shots,
+                    num_qubits=fragment.width,
+                    measure_map=fragment.measure_map(),
+                    num_clbits=len(fragment.clbits) + len(fragment.out_cuts),
+                    name='%s_fragment%d_%d' % (circuit.name, index, number),
+                    **run_options)))
+        with ThreadPoolExecutor(max_workers) as pool:
+            self.jobs = list(pool.map(
+                lambda submission: backend.run_native(**submission[2]),
+                submissions))
+        self._variants = [submission[:2] for submission in submissions]
+        super().__init__(backend, self.jobs[0].job_id())
+
+    def submit(self):
+        raise JobError('Cut jobs are submitted on creation')
+
+    def result(self, timeout=None, wait=5):
+        """Wait for all fragment jobs and reconstruct the outcomes.
+
+        Parameters:
+            timeout (float): Timeout waiting for each fragment job.
+            wait (float): Wait time between result polls.
+
+        Returns:
+            CutResult: The reconstruction.
+
+        Raises:
+            JobError: If the job was cancelled.
+        """
+        if self._cancelled:
+            raise JobError('Job %s was cancelled' % self._job_id)
+        if self._result is not None:
+            return self._result
+        with ThreadPoolExecutor(self._max_workers) as pool:
+            samples = list(pool.map(
+                lambda job: job.samples(timeout=timeout, wait=wait),
+                self.jobs))
+        per_fragment = [{} for _ in self.fragments]
+        for (index, variant), variant_samples in zip(self._variants, samples):
+            per_fragment[index][variant] = variant_samples
+        self._result = CutResult(
+            self.fragments,
+            [fragment.tensor(fragment_samples) for fragment, fragment_samples
+             in zip(self.fragments, per_fragment)],
+            len(self.cuts), self._num_clbits)
+        return self._result
+
+    def cancel(self):
+        """Cancel all fragment jobs."""
+        self._cancelled = True
+        aqt_job.cancel_jobs(self.jobs)
+
+    def status(self):
+        """Return the job status."""
+        if self._cancelled:
+            return JobStatus.CANCELLED
+        if self._result is not None:
+            return JobStatus.DONE
+        return JobStatus.RUNNING
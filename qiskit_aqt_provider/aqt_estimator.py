@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Expectation values of Pauli observables on AQT backends."""
+
+from collections import namedtuple
+
+import numpy as np
+from numpy import pi
+
+from qiskit import QuantumCircuit, transpile
+
+from .aqt_job import run_and_collect, split_shots
+
+EstimatorResult = namedtuple('EstimatorResult',
+                             ['values', 'std_errors', 'metadata'])
+EstimatorResult.__doc__ = """Expectation values of an estimator run.
+
+Attributes:
+    values (numpy.ndarray): One expectation value per (circuit, observable)
+        pair.
+    std_errors (numpy.ndarray): Standard errors of the values.
+    metadata (list[dict]): Per pair, the number of ``shots`` spent on each
+        measurement group and the ``job_ids`` of the jobs used.
+"""
+
+
+def parity(values):
+    """Return the parity of the set bits of every integer.
+
+    Parameters:
+        values (numpy.ndarray): Non-negative integers, at most 64 bits wide.
+
+    Returns:
+        numpy.ndarray: ``0`` for an even and ``1`` for an odd number of set
+        bits.
+    """
+    values = np.array(values, dtype=np.uint64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        values ^= values >> np.uint64(shift)
+    return (values & np.uint64(1)).astype(np.int8)
+
+
+def _pauli_terms(observable):
+    """Return the ``(label, coefficient)`` pairs of an observable."""
+    if isinstance(observable, str):
+        return [(observable, 1.0)]
+    if isinstance(observable, dict):
+        observable = observable.items()
+    elif hasattr(observable, 'to_list'):
+        observable = observable.to_list()
+    elif hasattr(observable, 'to_label'):
+        observable = [(observable.to_label(), 1.0)]
+    return [(label, complex(coeff).real) for label, coeff in observable]
+
+
+def group_commuting(labels):
+    """Group Pauli labels into qubit-wise commuting sets.
+
+    Labels are assigned greedily, heaviest first, to the first group they
+    are compatible with: on every qubit either the label or the group
+    measures the identity, or both measure the same Pauli.
+
+    Parameters:
+        labels (list[str]): Pauli labels in Qiskit order, i.e. the last
+            character acts on qubit 0.
+
+    Returns:
+        list[tuple]: ``(basis, members)`` per group, with ``basis`` the
+        merged label of the group and ``members`` the labels measured by it.
+    """
+    groups = []
+    for label in sorted(set(labels),
+                        key=lambda lab: (-sum(c != 'I' for c in lab), lab)):
+        for group in groups:
+            basis = group[0]
+            if all(p == 'I' or b in ('I', p) for p, b in zip(label, basis)):
+                group[0] = ''.join(b if p == 'I' else p
+                                   for p, b in zip(label, basis))
+                group[1].append(label)
+                break
+        else:
+            groups.append([label, [label]])
+    return [(basis, members) for basis, members in groups]
+
+
+def _label_mask(label):
+    mask = 0
+    for qubit, pauli in enumerate(reversed(label)):
+        if pauli != 'I':
+            mask |= 1 << qubit
+    return mask
+
+
+def _measurement_circuit(circuit, basis):
+    """Append rotations into the ``basis`` eigenbasis and measurements."""
+    num_qubits = circuit.num_qubits
+    meas = QuantumCircuit(num_qubits, num_qubits, name=circuit.name)
+    meas.compose(circuit, qubits=range(num_qubits), inplace=True)
+    for qubit, pauli in enumerate(reversed(basis)):
+        if pauli == 'X':
+            meas.ry(-pi / 2, qubit)
+        elif pauli == 'Y':
+            meas.rx(pi / 2, qubit)
+    for qubit, pauli in enumerate(reversed(basis)):
+        if pauli != 'I':
+            meas.measure(qubit, qubit)
+    return meas
+
+
+class AQTEstimator:
+    """Estimates expectation values of Pauli sum observables.
+
+    The Pauli terms of all observables of a circuit are grouped into
+    qubit-wise commuting sets, so that each set needs a single measurement
+    circuit. All measurement circuits are submitted at once and evaluated
+    from the integer samples of their jobs: the eigenvalue of a term for a
+    shot is the parity of the sample bits selected by the term.
+
+    Typical usage is:
+
+    .. code-block:: python
+
+        estimator = AQTEstimator(backend, shots=200)
+        result = estimator.run([circuit], [SparsePauliOp.from_list(
+            [('ZZ', 1.0), ('XX', 0.5)])])
+        print(result.values)
+
+    Attributes:
+        backend (BaseBackend): Backend the circuits run on.
+        shots (int): Default number of shots per measurement group.
+    """
+
+    def __init__(self, backend, shots=None, max_workers=8):
+        """Create an estimator.
+
+        Parameters:
+            backend (BaseBackend): Backend the circuits run on.
+            shots (int): Default number of shots per measurement group,
+                the backend's ``shots`` option if ``None``.
+            max_workers (int): Number of jobs submitted and waited for
+                concurrently.
+        """
+        self.backend = backend
+        self.shots = shots
+        self._max_workers = max_workers
+
+    def run(self, circuits, observables, shots=None, timeout=None, wait=5):
+        """Estimate the expectation value of each (circuit, observable) pair.
+
+        Groups that need more than ``max_shots`` shots are split over
+        several jobs.
+
+        Parameters:
+            circuits (list[QuantumCircuit]): Circuits without measurements.
+                A circuit repeated in several pairs is only run once per
+                measurement group.
+            observables (list): Observables, one per circuit, each a
+                ``SparsePauliOp``, a ``Pauli``, a label, a dict mapping
+                labels to coefficients, or a list of ``(label, coeff)``.
+            shots (int): Shots per measurement group.
+            timeout (float): Timeout waiting for each job.
+            wait (float): Wait time between result polls.
+
+        Returns:
+            EstimatorResult: The expectation values and their errors.
+
+        Raises:
+            ValueError: If the inputs do not match.
+        """
+        if isinstance(circuits, QuantumCircuit):
+            circuits = [circuits]
+            observables = [observables]
+        if len(circuits) != len(observables):
+            raise ValueError('Expected one observable per circuit, got %d '
+                             'circuits and %d observables' %
+                             (len(circuits), len(observables)))
+        shots = shots or self.shots or self.backend.options.shots
+        max_shots = self.backend.configuration().max_shots
+        pair_terms = []
+        labels = {}
+        for circuit, observable in zip(circuits, observables):
+            if circuit.num_clbits:
+                raise ValueError("Circuit '%s' must not have classical bits" %
+                                 circuit.name)
+            terms = _pauli_terms(observable)
+            for label, _ in terms:
+                if len(label) != circuit.num_qubits:
+                    raise ValueError("Observable '%s' does not match the %d "
+                                     "qubits of circuit '%s'" %
+                                     (label, circuit.num_qubits, circuit.name))
+            pair_terms.append(terms)
+            labels.setdefault(id(circuit), (circuit, set()))[1].update(
+                label for label, _ in terms if label.strip('I'))
+
+        groups = {}
+        keys = []
+        runs = []
+        for key, (circuit, circuit_labels) in labels.items():
+            for basis, members in group_commuting(circuit_labels):
+                groups[key, basis] = members
+                meas = transpile(_measurement_circuit(circuit, basis),
+                                 self.backend)
+                for run_shots in split_shots(shots, max_shots):
+                    keys.append((key, basis))
+                    runs.append((meas, run_shots))
+        group_samples = {}
+        job_ids = {}
+        for key, (job, samples) in zip(keys, run_and_collect(
+                self.backend, runs, self._max_workers, timeout, wait)):
+            group_samples.setdefault(key, []).append(samples)
+            job_ids.setdefault(key, []).append(job.job_id())
+
+        # eigenvalues of every label for every shot of its group
+        eigenvalues = {}
+        for (key, basis), members in groups.items():
+            samples = np.concatenate(group_samples[key, basis]).astype(np.uint64)
+            masks = np.array([_label_mask(label) for label in members],
+                             dtype=np.uint64)
+            signs = 1 - 2 * parity(samples[None, :] & masks[:, None])
+            for label, row in zip(members, signs):
+                eigenvalues[key, label] = (basis, row)
+
+        values = np.zeros(len(circuits))
+        std_errors = np.zeros(len(circuits))
+        metadata = []
+        for index, (circuit, terms) in enumerate(zip(circuits, pair_terms)):
+            per_group = {}
+            for label, coeff in terms:
+                if not label.strip('I'):
+                    values[index] += coeff
+                    continue
+                basis, row = eigenvalues[id(circuit), label]
+                if basis in per_group:
+                    per_group[basis] = per_group[basis] + coeff * row
+                else:
+                    per_group[basis] = coeff * row
+            variance = 0.0
+            for shot_values in per_group.values():
+                values[index] += shot_values.mean()
+                if len(shot_values) > 1:
+                    variance += shot_values.var(ddof=1) / len(shot_values)
+            std_errors[index] = np.sqrt(variance)
+            metadata.append({
+                'shots': shots,
+                'job_ids': [job_id for basis in per_group
+                            for job_id in job_ids[id(circuit), basis]]})
+        return EstimatorResult(values, std_errors, metadata)
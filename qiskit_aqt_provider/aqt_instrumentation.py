@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Timing hooks around the hot paths of job submission and retrieval.
+
+The provider reports the following spans:
+
+    circuit_to_aqt    conversion of a circuit or qobj to an AQT payload
+    schedule          the wait for a slot of the provider's scheduler
+    submit            the HTTP request submitting a payload
+    poll              one HTTP request asking for a job's result
+    wait_for_result   the complete wait for a result, including sleeps
+    format_counts     building the result from the returned samples
+    cancel            cancelling jobs of one backend
+"""
+
+import logging
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+Span = namedtuple('Span', ['name', 'start', 'duration', 'attributes', 'error'])
+Span.__doc__ = """A finished, timed phase.
+
+Attributes:
+    name (str): The span name.
+    start (float): Wall clock start time, as returned by ``time.time()``.
+    duration (float): Duration in seconds.
+    attributes (dict): Context of the span, e.g. backend name and job id.
+    error (BaseException): The exception raised inside the span, if any.
+"""
+
+
+class Instrumentation:
+    """Dispatches timed spans to registered callbacks.
+
+    Callbacks are called with a ``Span`` once the span has finished.
+    Exceptions raised by a callback are logged and otherwise ignored, so
+    instrumentation never changes the outcome of the instrumented code.
+    Optionally, an OpenTelemetry style tracer (any object providing
+    ``start_as_current_span(name, attributes=...)``) can be attached to
+    have every span mirrored as a tracer span.
+
+    Typical usage is:
+
+    .. code-block:: python
+
+        aqt = AQTProvider('MY_TOKEN')
+        aqt.instrumentation.add_callback(
+            lambda span: print(span.name, span.duration))
+
+    Attributes:
+        tracer: Optional OpenTelemetry style tracer.
+    """
+
+    def __init__(self, tracer=None):
+        self._callbacks = []
+        self.tracer = tracer
+
+    def add_callback(self, callback):
+        """Register a callback invoked with every finished ``Span``.
+
+        Parameters:
+            callback (callable): Function taking a single ``Span``.
+        """
+        self._callbacks = self._callbacks + [callback]
+
+    def remove_callback(self, callback):
+        """Unregister a previously added callback.
+
+        Parameters:
+            callback (callable): The callback to remove.
+        """
+        self._callbacks = [cb for cb in self._callbacks if cb != callback]
+
+    @contextmanager
+    def span(self, name, timings=None, **attributes):
+        """Time the enclosed block.
+
+        Parameters:
+            name (str): The span name.
+            timings (dict): If given, the duration is added to
+                ``timings[name]``.
+            **attributes: Context passed on to callbacks and the tracer.
+
+        Yields:
+            dict: The span attributes. Entries added inside the block, such
+            as a returned job id or status, are reported with the span.
+        """
+        start = time.time()
+        counter = time.perf_counter()
+        error = None
+        try:
+            if self.tracer is not None:
+                with self.tracer.start_as_current_span(
+                        name, attributes=_tracer_attributes(attributes)) as span:
+                    known = set(attributes)
+                    yield attributes
+                    if hasattr(span, 'set_attributes'):
+                        span.set_attributes(_tracer_attributes(
+                            {key: value for key, value in attributes.items()
+                             if key not in known}))
+            else:
+                yield attributes
+        except BaseException as ex:
+            error = ex
+            raise
+        finally:
+            duration = time.perf_counter() - counter
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + duration
+            callbacks = self._callbacks
+            if callbacks:
+                event = Span(name, start, duration, attributes, error)
+                for callback in callbacks:
+                    try:
+                        callback(event)
+                    except Exception:  # pylint: disable=broad-except
+                        logger.exception('Instrumentation callback %r failed '
+                                         'for span %s', callback, name)
+
+
+def _tracer_attributes(attributes):
+    return {key: value for key, value in attributes.items()
+            if value is not None}
+
+
+_NULL_INSTRUMENTATION = Instrumentation()
+
+
+def get_instrumentation(provider):
+    """Return the instrumentation of a provider.
+
+    Parameters:
+        provider (AQTProvider): The provider, may be ``None``.
+
+    Returns:
+        Instrumentation: The provider's instrumentation, or a shared instance
+        without callbacks if the provider has none.
+    """
+    return getattr(provider, 'instrumentation', None) or _NULL_INSTRUMENTATION
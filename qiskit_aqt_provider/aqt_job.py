@@ -14,149 +14,328 @@
 
 # pylint: disable=protected-access
 
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
+import numpy as np
 
 from qiskit.providers import JobV1
 from qiskit.providers import JobError
 from qiskit.providers import JobTimeoutError
 from qiskit.providers.jobstatus import JobStatus
 from qiskit.qobj import QasmQobj
-from qiskit.result import Result
-from .qobj_to_aqt import qobj_to_aqt
+from .aqt_result import AQTResult
+from .aqt_runtime import poll_interval
+from .aqt_transport import read_result
+from .aqt_instrumentation import get_instrumentation
+
+
+# Cancellation and the claim on a job's final status only flip a flag, under
+# one of a few striped locks, so jobs need no lock of their own. A job gets
+# an event to sleep on between polls once it is first waited for.
+_LOCKS = tuple(threading.Lock() for _ in range(64))
+
+
+def _lock_of(owner):
+    return _LOCKS[(id(owner) >> 4) % len(_LOCKS)]
+
+
+def _clbit_map(qobj, qubit_offset=0):
+    """Return the classical bit of every qubit, ``-1`` if it is unmeasured.
+
+    Qubit ``i`` of the experiment is ion ``i + qubit_offset``.
+    """
+    qu2cl = {}
+    if isinstance(qobj, QasmQobj):
+        for instruction in qobj.experiments[0].instructions:
+            if instruction.name == 'measure':
+                qu2cl[instruction.qubits[0]] = instruction.memory[0]
+    else:
+        qubit_map = {bit: index for index, bit in enumerate(qobj.qubits)}
+        clbit_map = {bit: index for index, bit in enumerate(qobj.clbits)}
+        for instruction in qobj.data:
+            if instruction[0].name == 'measure':
+                for index, qubit in enumerate(instruction[1]):
+                    qu2cl[qubit_map[qubit]] = clbit_map[instruction[2][index]]
+    return _clbit_array(qu2cl, qubit_offset)
+
+
+def _clbit_array(qu2cl, qubit_offset=0):
+    clbits = np.full(max(qu2cl, default=-1) + 1 + qubit_offset, -1,
+                     dtype=np.int16)
+    clbits[[qubit + qubit_offset for qubit in qu2cl]] = list(qu2cl.values())
+    return clbits
+
+
+class _SharedResult:
+    """The result and final status claim of a remote job serving several
+    handles. The remote job reaches metrics as finished or cancelled once.
+    """
+    __slots__ = ('result', '_final_claimed', '_ticket')
+
+    def __init__(self, ticket=None):
+        self.result = None
+        self._final_claimed = False
+        self._ticket = ticket
 
 
 class AQTJob(JobV1):
-    def __init__(self, backend, job_id, access_token=None, qobj=None):
+    """Handle of a job submitted to an AQT gateway backend.
+
+    Jobs do not keep the submitted circuit. Only what is needed to turn the
+    returned samples into counts is extracted from it, so that a job takes
+    a few hundred bytes no matter the size of the circuit. Its attributes
+    are slots, but since ``qiskit.providers.Job`` has no ``__slots__``,
+    instances still have a (normally empty) ``__dict__``.
+
+    Any thread may wait for or cancel a job. Threads waiting for the same
+    job at the same time may each poll for it; they all get an equal
+    result.
+    """
+
+    __slots__ = ('_job_id', '_backend', 'metadata', 'access_token', 'timings',
+                 'estimated_runtime', '_created',
+                 '_clbits', '_num_clbits', '_name', '_qobj_id', '_cancelled',
+                 '_final_claimed', '_shot_range', '_shared', '_result',
+                 '_ticket', '_wakeup')
+
+    def __init__(self, backend, job_id, access_token=None, qobj=None,
+                 timings=None, shot_range=None, shared=None, qubit_offset=0,
+                 measure_map=None, name=None, num_clbits=None, ticket=None):
         """Initialize a job instance.
 
         Parameters:
             backend (BaseBackend): Backend that job was executed on.
             job_id (str): The unique job ID.
-            access_token (str): The AQT access token.
-            qobj (Qobj): Quantum object, if any.
+            access_token (str): The AQT access token the job was submitted
+                with, the provider's token if ``None``.
+            qobj (QuantumCircuit or QasmQobj): The submitted experiment. It
+                is not retained by the job.
+            timings (dict): Durations of phases that ran before the job
+                was created, e.g. ``circuit_to_aqt`` and ``submit``.
+            shot_range (tuple): ``(start, stop)`` of this job's shots, if
+                the remote job ran several experiments one after the other.
+            shared (_SharedResult): Result holder of the remote job, shared
+                by the handles of all its experiments.
+            qubit_offset (int): First ion of the experiment, if the remote
+                job ran several experiments side by side.
+            measure_map (dict): The classical bit of every measured qubit,
+                for jobs submitted without a circuit.
+            name (str): Experiment name of a job without a circuit.
+            num_clbits (int): Number of classical bits of a job without a
+                circuit, by default up to the highest measured one.
+            ticket (Ticket): Scheduler slot of the job, given back once the
+                job has ended, see ``aqt_scheduler``.
+
+        Attributes:
+            timings (dict): Cumulative time in seconds spent in each
+                instrumented phase of this job, keyed by span name (see
+                ``qiskit_aqt_provider.aqt_instrumentation``).
+            estimated_runtime (float): Seconds the job is expected to take
+                by the backend's ``runtime_model``, ``None`` if unknown,
+                e.g. for ``run()`` without a scheduler.
         """
         super().__init__(backend, job_id)
-        self._backend = backend
         self.access_token = access_token
-        self.qobj = qobj
-        self._job_id = job_id
-        self.memory_mapping = self._build_memory_mapping()
+        self.timings = dict(timings or {})
+        self._cancelled = False
+        self._shot_range = shot_range
+        self._shared = shared
+        self._final_claimed = False
+        self._result = None
+        self._ticket = ticket
+        self._wakeup = None
+        self._created = time.time()
+        model = getattr(backend, 'runtime_model', None)
+        self.estimated_runtime = None if model is None else \
+            model.expected(job_id)
+        if qobj is None:
+            self._num_clbits = num_clbits or max(measure_map.values()) + 1
+            self._name = name
+            self._qobj_id = job_id
+            self._clbits = _clbit_array(measure_map, qubit_offset)
+            return
+        if isinstance(qobj, QasmQobj):
+            self._num_clbits = qobj.experiments[0].header.memory_slots
+            self._name = qobj.experiments[0].header.name
+            self._qobj_id = qobj.qobj_id
+        else:
+            self._num_clbits = qobj.num_clbits
+            self._name = qobj.name
+            self._qobj_id = id(qobj)
+        self._clbits = _clbit_map(qobj, qubit_offset)
 
-    def _wait_for_result(self, timeout=None, wait=5):
-        start_time = time.time()
-        result = None
+    @property
+    def memory_mapping(self):
+        """dict: The classical bit of every measured qubit."""
+        return {qubit: clbit for qubit, clbit in enumerate(self._clbits.tolist())
+                if clbit >= 0}
+
+    def _token(self):
+        return self.access_token or self._backend._provider.access_token
+
+    def _claim_final(self, failed=False):
+        """Return ``True`` for the first caller only, see ``cancel_jobs``.
+
+        The first caller also gives the job's token back to the provider
+        and its slot back to the scheduler.
+        """
+        owner = self if self._shared is None else self._shared
+        with _lock_of(owner):
+            if owner._final_claimed:
+                return False
+            owner._final_claimed = True
+        provider = self._backend._provider
+        if provider is not None:
+            provider.release_token(self.access_token, failed)
+        if owner._ticket is not None:
+            owner._ticket.release()
+        return True
+
+    def _ended(self):
+        owner = self if self._shared is None else self._shared
+        return owner._final_claimed
+
+    def _poll(self):
+        """Ask the gateway for the job once.
+
+        A poll that fails, e.g. on an HTTP error or a malformed body, ends
+        the job as failed, so that its token and slot are given back.
+        """
+        token = self._token()
         header = {
-            "Ocp-Apim-Subscription-Key": self._backend._provider.access_token,
+            "Ocp-Apim-Subscription-Key": token,
             "SDK": "qiskit"
         }
-        while True:
-            elapsed = time.time() - start_time
-            if timeout and elapsed >= timeout:
-                raise JobTimeoutError('Timed out waiting for result')
-            result = requests.put(
-                self._backend.url,
-                data={'id': self._job_id,
-                      'access_token': self._backend._provider.access_token},
-                headers=header
-            ).json()
-            if result['status'] == 'finished':
-                break
-            if result['status'] == 'error':
-                raise JobError('API returned error:\n' + str(result))
-            time.sleep(wait)
+        with get_instrumentation(self._backend._provider).span(
+                'poll', self.timings, backend=self._backend.name(),
+                job_id=self._job_id) as span:
+            try:
+                res = self._backend._get_transport().put(
+                    self._backend.url,
+                    data={'id': self._job_id, 'access_token': token},
+                    headers=header,
+                    stream=True
+                )
+                result = read_result(res)
+                status = result['status']
+            except Exception:
+                span['final'] = self._claim_final(failed=True)
+                raise
+            span['status'] = status
+            if status in ('finished', 'error'):
+                span['final'] = self._claim_final(failed=status == 'error')
+        if status == 'finished' and self._shared is not None:
+            self._shared.result = result
         return result
 
-    def _build_memory_mapping(self):
-        qu2cl = {}
-        if isinstance(self.qobj, QasmQobj):
-            for instruction in self.qobj.experiments[0].instructions:
-                if instruction.name == 'measure':
-                    qu2cl[instruction.qubits[0]] = instruction.memory[0]
-            return qu2cl
-        qubit_map = {}
-        count = 0
-        for bit in self.qobj.qubits:
-            qubit_map[bit] = count
-            count += 1
-        clbit_map = {}
-        count = 0
-        for bit in self.qobj.clbits:
-            clbit_map[bit] = count
-            count += 1
-        for instruction in self.qobj.data:
-            if instruction[0].name == 'measure':
-                for index, qubit in enumerate(instruction[1]):
-                    qu2cl[qubit_map[qubit]] = clbit_map[instruction[2][index]]
-        return qu2cl
+    def _wait_for_result(self, timeout=None, wait=5):
+        instrumentation = get_instrumentation(self._backend._provider)
+        with instrumentation.span('wait_for_result', self.timings,
+                                  backend=self._backend.name(),
+                                  job_id=self._job_id):
+            start_time = time.time()
+            result = None
+            while True:
+                if self._cancelled:
+                    raise JobError('Job %s was cancelled' % self._job_id)
+                if self._shared is not None and self._shared.result is not None:
+                    return self._shared.result
+                elapsed = time.time() - start_time
+                if timeout and elapsed >= timeout:
+                    raise JobTimeoutError('Timed out waiting for result')
+                result = self._poll()
+                if self._cancelled:
+                    raise JobError('Job %s was cancelled' % self._job_id)
+                if result['status'] == 'finished':
+                    break
+                if result['status'] == 'error':
+                    raise JobError('API returned error:\n' + str(result))
+                self._sleep(wait if wait is not None else poll_interval(
+                    self.estimated_runtime, time.time() - self._created))
+        return result
 
-    def _rearrange_result(self, input):
-        if isinstance(self.qobj, QasmQobj):
-            length = self.qobj.experiments[0].header.memory_slots
-        else:
-            length = self.qobj.num_clbits
-        bin_output = list('0' * length)
-        bin_input = list(bin(input)[2:].rjust(length, '0'))
-        bin_input.reverse()
-        for qu, cl in self.memory_mapping.items():
-            bin_output[cl] = bin_input[qu]
-        bin_output.reverse()
-        return hex(int(''.join(bin_output), 2))
-
-    def _format_counts(self, samples):
-        counts = {}
-        for result in samples:
-            h_result = self._rearrange_result(result)
-            if h_result not in counts:
-                counts[h_result] = 1
-            else:
-                counts[h_result] += 1
-        return counts
+    def _sleep(self, seconds):
+        """Wait before the next poll, returning early on cancellation."""
+        with _lock_of(self):
+            if self._cancelled:
+                return
+            if self._wakeup is None:
+                self._wakeup = threading.Event()
+            wakeup = self._wakeup
+        wakeup.wait(seconds)
+
+    def _own_samples(self, result):
+        if self._shot_range is None:
+            return result['samples']
+        return result['samples'][self._shot_range[0]:self._shot_range[1]]
+
+    def _rearrange_samples(self, samples):
+        samples = np.asarray(samples, dtype=np.int64)
+        out = np.zeros_like(samples)
+        for qu, cl in enumerate(self._clbits.tolist()):
+            if cl >= 0:
+                out |= ((samples >> qu) & 1) << cl
+        return out
+
+    def samples(self, timeout=None, wait=5):
+        """Get the measured outcomes of every shot.
+
+        Parameters:
+            timeout (float): A timeout for trying to get the samples.
+            wait (float): A specified wait time between retrieval attempts,
+                chosen from ``estimated_runtime`` if ``None``.
+
+        Returns:
+            numpy.ndarray: One integer per shot, with bit ``i`` holding the
+            value of classical bit ``i``.
+
+        Raises:
+            JobError: If the job was cancelled.
+        """
+        return self.result(timeout, wait).get_samples()
 
     def result(self,
                timeout=None,
                wait=5):
         """Get the result data of a circuit.
 
+        The result is fetched once and kept by the job; further calls
+        return it without polling again. Counts are computed from the
+        samples when they are first asked for.
+
         Parameters:
             timeout (float): A timeout for trying to get the counts.
             wait (float): A specified wait time between counts retrival
-                          attempts.
+                          attempts, chosen from ``estimated_runtime`` if
+                          ``None``.
 
         Returns:
-            Result: Result object.
+            AQTResult: Result object.
+
+        Raises:
+            JobError: If the job was cancelled.
         """
+        if self._cancelled:
+            raise JobError('Job %s was cancelled' % self._job_id)
+        if self._result is not None:
+            return self._result
         result = self._wait_for_result(timeout, wait)
-        if isinstance(self.qobj, QasmQobj):
-            results = [
-                {
-                    'success': True,
-                    'shots': len(result['samples']),
-                    'data': {'counts': self._format_counts(result['samples'])},
-                    'header': {'memory_slots': self.qobj.config.memory_slots,
-                               'name': self.qobj.experiments[0].header.name}
-                }]
-            qobj_id = self.qobj.qobj_id
-        else:
-            results = [
-                {
-                    'success': True,
-                    'shots': len(result['samples']),
-                    'data': {'counts': self._format_counts(result['samples'])},
-                    'header': {'memory_slots': self.qobj.num_clbits,
-                               'name': self.qobj.name}
-                }]
-            qobj_id = id(self.qobj)
-
-        return Result.from_dict({
-            'results': results,
-            'backend_name': self._backend._configuration.backend_name,
-            'backend_version': self._backend._configuration.backend_version,
-            'qobj_id': qobj_id,
-            'success': True,
-            'job_id': self._job_id,
-        })
+        if self._cancelled:
+            raise JobError('Job %s was cancelled' % self._job_id)
+        with get_instrumentation(self._backend._provider).span(
+                'format_counts', self.timings,
+                backend=self._backend.name(), job_id=self._job_id):
+            samples = self._rearrange_samples(self._own_samples(result))
+            self._result = AQTResult(
+                self._backend._configuration.backend_name,
+                self._backend._configuration.backend_version,
+                self._qobj_id, self._job_id,
+                [(self._name, self._num_clbits, samples)],
+                **result.get('metadata', {}))
+        return self._result
 
     def get_counts(self, circuit=None, timeout=None, wait=5):
         """Get the histogram data of a measured circuit.
@@ -165,7 +344,8 @@ class AQTJob(JobV1):
             circuit (str or QuantumCircuit or int or None): The index of the circuit.
             timeout (float): A timeout for trying to get the counts.
             wait (float): A specified wait time between counts retrival
-                          attempts.
+                          attempts, chosen from ``estimated_runtime`` if
+                          ``None``.
 
         Returns:
             dict: Dictionary of string : int key-value pairs.
@@ -173,19 +353,42 @@ class AQTJob(JobV1):
         return self.result(timeout=timeout, wait=wait).get_counts(circuit)
 
     def cancel(self):
-        pass
+        """Cancel the job.
+
+        Polling stops right away: pending and future ``result()`` calls
+        raise ``JobError`` and ``status()`` reports ``CANCELLED``.
+
+        The AQT gateway protocol has no cancel request, so the job is only
+        cancelled locally and keeps running on the remote side.
+
+        Returns:
+            bool: ``False`` if the job had already been cancelled.
+        """
+        return cancel_jobs([self]) == 1
+
+    def _cancel_locally(self):
+        with _lock_of(self):
+            if self._cancelled:
+                return False
+            self._cancelled = True
+            wakeup = self._wakeup
+        if wakeup is not None:
+            wakeup.set()
+        return True
 
     def status(self):
         """Query for the job status.
         """
+        if self._cancelled:
+            return JobStatus.CANCELLED
         header = {
-            "Ocp-Apim-Subscription-Key": self._backend._provider.access_token,
+            "Ocp-Apim-Subscription-Key": self._token(),
             "SDK": "qiskit"
         }
-        result = requests.put(self._backend.url,
-                              data={'id': self._job_id,
-                                    'access_token': self.access_token},
-                              headers=header)
+        result = self._backend._get_transport().put(
+            self._backend.url,
+            data={'id': self._job_id, 'access_token': self._token()},
+            headers=header)
         code = result.status_code
 
         if code == 100:
@@ -199,12 +402,144 @@ class AQTJob(JobV1):
         return status
 
     def submit(self):
-        """Submits a job for execution.
+        """Jobs are submitted by ``backend.run()``, which returns them.
+
+        Raises:
+            JobError: Always.
+        """
+        raise JobError('AQT jobs are submitted by backend.run()')
+
+
+def cancel_jobs(jobs):
+    """Cancel many jobs at once, e.g. every job of an aborted sweep.
+
+    See ``AQTJob.cancel``; cancellation is local only.
+
+    Parameters:
+        jobs (list[AQTJob]): The jobs to cancel.
+
+    Returns:
+        int: Number of jobs that were not cancelled before.
+    """
+    by_backend = OrderedDict()
+    for job in jobs:
+        if job._cancel_locally():
+            by_backend.setdefault(id(job._backend),
+                                  (job._backend, []))[1].append(job)
+    for backend, backend_jobs in by_backend.values():
+        unfinished = sum(job._claim_final()
+                         for job in backend_jobs)
+        with get_instrumentation(backend._provider).span(
+                'cancel', backend=backend.name(),
+                job_ids=[job.job_id() for job in backend_jobs],
+                unfinished=unfinished):
+            pass
+    return sum(len(backend_jobs) for _, backend_jobs in by_backend.values())
+
+
+class JobWatcher:
+    """Polls jobs in the background until they end.
+
+    A job submitted through a ``TokenPool`` or a ``JobScheduler`` holds a
+    slot until a poll sees it end. Callers that submit many jobs before
+    waiting for any would otherwise wait for a slot forever. Providers
+    limiting their jobs hand every new job to their watcher, which polls
+    the jobs in flight from one daemon thread, keeps the results of
+    finished jobs for their handles and so frees the slots. The thread
+    exits once no job is left.
+
+    Attributes:
+        interval (float): Seconds between polls of the same job.
+    """
+
+    def __init__(self, interval=1.0):
+        """Create a watcher.
+
+        Parameters:
+            interval (float): Seconds between polls of the same job.
         """
-        if not self.qobj or not self._job_id:
-            raise Exception
-        aqt_json = qobj_to_aqt(self.qobj, self.access_token)
-        res = requests.post(self._backend.url, data=aqt_json[0])
-        if 'id' not in res:
-            raise Exception
-        self._job_id = res['id']
+        self.interval = interval
+        self._jobs = []
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def add(self, job):
+        """Poll a job until it ends.
+
+        Parameters:
+            job (AQTJob): A job with a ``_SharedResult``, to hold the
+                result for its handles.
+        """
+        with self._lock:
+            self._jobs.append(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name='aqt-job-watcher',
+                                                daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._jobs = [job for job in self._jobs if not job._ended()]
+                if not self._jobs:
+                    self._thread = None
+                    return
+                jobs = list(self._jobs)
+            for job in jobs:
+                if job._ended():
+                    continue
+                try:
+                    job._poll()
+                except Exception:  # pylint: disable=broad-except
+                    # the job ended as failed, its handles raise on their
+                    # own poll
+                    pass
+            time.sleep(self.interval)
+
+
+def split_shots(shots, max_shots):
+    """Split a number of shots into runs of at most ``max_shots``.
+
+    Parameters:
+        shots (int): Total number of shots.
+        max_shots (int): Largest number of shots per run.
+
+    Returns:
+        list[int]: Shots per run.
+    """
+    return [min(max_shots, shots - start)
+            for start in range(0, shots, max_shots)]
+
+
+def run_and_collect(backend, runs, max_workers=8, timeout=None, wait=5,
+                    writer=None):
+    """Submit circuits concurrently and wait for all their samples.
+
+    The circuits go through ``backend.run_batch``, so identical circuits,
+    e.g. repeated parameter bindings, run as one remote job.
+
+    Parameters:
+        backend (BaseBackend): Backend to run the circuits on.
+        runs (list[tuple]): ``(circuit, shots)`` or ``(circuit, shots,
+            parameters)`` per job.
+        max_workers (int): Number of concurrent submissions and polls.
+        timeout (float): Timeout waiting for each job.
+        wait (float): Wait time between result polls.
+        writer (SampleWriter): Store the samples of every job as it
+            finishes, with the run's parameters, see ``aqt_store``.
+
+    Returns:
+        list[tuple]: ``(job, samples)`` per run, see ``AQTJob.samples``.
+    """
+    def _collect(job, run):
+        if writer is None:
+            return job.samples(timeout=timeout, wait=wait)
+        writer.write(job, run[2] if len(run) > 2 else None, timeout, wait)
+        return job.samples()
+
+    jobs = backend.run_batch([run[0] for run in runs],
+                             shots=[run[1] for run in runs],
+                             max_workers=max_workers)
+    with ThreadPoolExecutor(max_workers) as pool:
+        return list(zip(jobs, pool.map(_collect, jobs, runs)))
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Aggregate, Prometheus style metrics of provider activity."""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join(
+        '%s="%s"' % (key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for key, value in labels)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, lock):
+        self.name = name
+        self.documentation = documentation
+        self._lock = lock
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(sorted(labels.items()))
+
+
+class Counter(_Metric):
+    """A monotonically increasing value per label set."""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Increase the counter of the given labels by ``amount``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Return the current value for the given labels."""
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value)
+                    for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """A value per label set that can go up and down."""
+    kind = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        """Decrease the gauge of the given labels by ``amount``."""
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values per label set."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, lock, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, lock)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        """Record an observation for the given labels."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1),
+                                             0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels):
+        """Return the number of observations for the given labels."""
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def samples(self):
+        out = []
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2])
+                     for key, state in self._values.items()]
+        for key, bucket_counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),),
+                                           bucket_counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                out.append((self.name + '_bucket', key + (('le', le),),
+                            cumulative))
+            out.append((self.name + '_sum', key, total))
+            out.append((self.name + '_count', key, count))
+        return out
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms of provider activity.
+
+    The registry is an ``Instrumentation`` callback and derives all its
+    metrics from the reported spans. It keeps no per-job state; jobs report
+    the first poll that observed their final status (the ``final`` span
+    attribute) and the number of cancelled jobs that had not finished.
+
+        aqt_jobs_submitted_total         jobs accepted by the gateway
+        aqt_jobs_in_flight               submitted jobs not yet finished
+        aqt_jobs_finished_total          jobs that returned a result
+        aqt_jobs_failed_total            failed submissions and jobs
+        aqt_jobs_cancelled_total         jobs cancelled before finishing
+        aqt_polls_total                  result polls
+        aqt_phase_duration_seconds       duration of each instrumented phase
+
+    All metrics are labelled by ``backend``. Metrics can be pulled with
+    ``snapshot()`` or ``render()`` or served over HTTP with
+    ``start_http_server()``.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.jobs_submitted = Counter(
+            'aqt_jobs_submitted_total', 'Jobs accepted by the gateway.',
+            threading.Lock())
+        self.jobs_in_flight = Gauge(
+            'aqt_jobs_in_flight', 'Submitted jobs without a final result.',
+            threading.Lock())
+        self.jobs_finished = Counter(
+            'aqt_jobs_finished_total', 'Jobs that returned a result.',
+            threading.Lock())
+        self.jobs_failed = Counter(
+            'aqt_jobs_failed_total', 'Failed submissions and jobs.',
+            threading.Lock())
+        self.jobs_cancelled = Counter(
+            'aqt_jobs_cancelled_total', 'Jobs cancelled before finishing.',
+            threading.Lock())
+        self.polls = Counter(
+            'aqt_polls_total', 'Result polls sent to the gateway.',
+            threading.Lock())
+        self.phase_duration = Histogram(
+            'aqt_phase_duration_seconds', 'Duration of instrumented phases.',
+            threading.Lock(), buckets)
+        self._metrics = [self.jobs_submitted, self.jobs_in_flight,
+                         self.jobs_finished, self.jobs_failed,
+                         self.jobs_cancelled, self.polls,
+                         self.phase_duration]
+
+    def __call__(self, span):
+        """Update the metrics from a finished ``Span``."""
+        backend = span.attributes.get('backend')
+        self.phase_duration.observe(span.duration, phase=span.name,
+                                    backend=backend)
+        if span.name == 'submit':
+            if span.error is not None:
+                self.jobs_failed.inc(backend=backend)
+            else:
+                self.jobs_submitted.inc(backend=backend)
+                self.jobs_in_flight.inc(backend=backend)
+        elif span.name == 'poll':
+            self.polls.inc(backend=backend)
+            status = span.attributes.get('status')
+            if span.attributes.get('final'):
+                # a poll that raised ends its job as failed
+                counter = (self.jobs_finished
+                           if span.error is None and status == 'finished'
+                           else self.jobs_failed)
+                self._job_ended(backend, counter)
+        elif span.name == 'cancel':
+            self._job_ended(backend, self.jobs_cancelled,
+                            span.attributes.get('unfinished', 0))
+
+    def _job_ended(self, backend, counter, amount=1):
+        if amount:
+            self.jobs_in_flight.dec(amount, backend=backend)
+            counter.inc(amount, backend=backend)
+
+    def snapshot(self):
+        """Return all current samples.
+
+        Returns:
+            dict: Maps ``(sample_name, labels)`` tuples, with ``labels`` a
+            sorted tuple of ``(label, value)`` pairs, to sample values.
+        """
+        return {(name, labels): value
+                for metric in self._metrics
+                for name, labels, value in metric.samples()}
+
+    def render(self):
+        """Return the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append('# HELP %s %s' % (metric.name, metric.documentation))
+            lines.append('# TYPE %s %s' % (metric.name, metric.kind))
+            for name, labels, value in metric.samples():
+                labels = tuple((key, label) for key, label in labels
+                               if label is not None)
+                lines.append('%s%s %s' % (name, _format_labels(labels),
+                                          repr(float(value))))
+        return '\n'.join(lines) + '\n'
+
+    def start_http_server(self, port=0, addr='127.0.0.1'):
+        """Serve ``render()`` over HTTP from a daemon thread.
+
+        Parameters:
+            port (int): The port to listen on, ``0`` picks a free port.
+            addr (str): The address to bind to.
+
+        Returns:
+            HTTPServer: The running server. Its ``server_address`` holds
+            the bound address; call ``shutdown()`` to stop it.
+        """
+        registry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type',
+                                 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = _ThreadingHTTPServer((addr, port), _Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        return server
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
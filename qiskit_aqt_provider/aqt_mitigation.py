@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tensored readout error mitigation.
+
+Readout errors are assumed to be independent per qubit, so a device is
+described by one 2x2 assignment matrix per qubit,
+
+    A[q] = [[P(0|0), P(0|1)],
+            [P(1|0), P(1|1)]]
+
+with ``P(m|p)`` the probability of measuring ``m`` after preparing ``p``.
+Two calibration circuits, all qubits in ``0`` and all qubits in ``1``,
+determine all matrices at once.
+"""
+
+import threading
+import time
+
+import numpy as np
+from numpy import pi
+
+from qiskit import QuantumCircuit
+
+from .aqt_job import run_and_collect, split_shots
+
+_CALIBRATIONS = {}
+_CALIBRATIONS_LOCK = threading.Lock()
+
+
+class ReadoutCalibration:
+    """Per-qubit assignment matrices of a backend.
+
+    Attributes:
+        matrices (numpy.ndarray): Array of shape ``(num_qubits, 2, 2)``.
+        timestamp (float): Time of the calibration, as ``time.time()``.
+        job_ids (list[str]): The calibration jobs.
+    """
+
+    def __init__(self, matrices, timestamp=None, job_ids=None):
+        self.matrices = np.asarray(matrices, dtype=float)
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.job_ids = list(job_ids or [])
+        self._inverses = np.linalg.inv(self.matrices)
+
+    @classmethod
+    def from_samples(cls, zeros, ones, num_qubits, **kwargs):
+        """Estimate the matrices from the calibration samples.
+
+        Parameters:
+            zeros (numpy.ndarray): Samples with all qubits prepared in ``0``.
+            ones (numpy.ndarray): Samples with all qubits prepared in ``1``.
+            num_qubits (int): Number of calibrated qubits.
+            **kwargs: Passed on to the constructor.
+
+        Returns:
+            ReadoutCalibration: The calibration.
+        """
+        shifts = np.arange(num_qubits, dtype=np.int64)
+        p10 = ((np.asarray(zeros)[:, None] >> shifts) & 1).mean(axis=0)
+        p01 = 1 - ((np.asarray(ones)[:, None] >> shifts) & 1).mean(axis=0)
+        matrices = np.empty((num_qubits, 2, 2))
+        matrices[:, 0, 0] = 1 - p10
+        matrices[:, 1, 0] = p10
+        matrices[:, 0, 1] = p01
+        matrices[:, 1, 1] = 1 - p01
+        return cls(matrices, **kwargs)
+
+    @property
+    def num_qubits(self):
+        """Number of calibrated qubits."""
+        return len(self.matrices)
+
+    def apply(self, probabilities, qubits, method='least_squares'):
+        """Correct a dense probability vector.
+
+        Parameters:
+            probabilities (numpy.ndarray): Measured probabilities indexed by
+                outcome, of length ``2 ** len(qubits)``.
+            qubits (list): Qubit measured into each classical bit, ``None``
+                for bits that are not measured.
+            method (str): ``'inverse'`` applies the inverse matrices and may
+                return negative quasi-probabilities; ``'least_squares'``
+                also projects the result onto the closest probability
+                distribution.
+
+        Returns:
+            numpy.ndarray: The corrected vector.
+
+        Raises:
+            ValueError: If ``method`` is unknown.
+        """
+        if method not in ('inverse', 'least_squares'):
+            raise ValueError("Unknown mitigation method '%s'" % method)
+        num_bits = len(qubits)
+        vector = np.asarray(probabilities, dtype=float)
+        for bit, qubit in enumerate(qubits):
+            if qubit is None:
+                continue
+            # the middle axis is classical bit ``bit`` of the outcome index
+            vector = np.einsum('ij,ajb->aib', self._inverses[qubit],
+                               vector.reshape(2 ** (num_bits - 1 - bit), 2,
+                                              2 ** bit)).reshape(-1)
+        if method == 'least_squares':
+            vector = project_to_simplex(vector)
+        return vector
+
+
+def project_to_simplex(vector):
+    """Return the closest probability vector in the Euclidean norm.
+
+    Parameters:
+        vector (numpy.ndarray): Quasi-probabilities summing to one.
+
+    Returns:
+        numpy.ndarray: Non-negative vector summing to one.
+    """
+    ordered = np.sort(vector)[::-1]
+    cumulative = np.cumsum(ordered) - 1
+    index = np.arange(1, len(vector) + 1)
+    rho = np.nonzero(ordered - cumulative / index > 0)[0][-1]
+    return np.maximum(vector - cumulative[rho] / (rho + 1), 0)
+
+
+def _calibration_circuits(num_qubits):
+    zeros = QuantumCircuit(num_qubits, num_qubits, name='cal_0')
+    zeros.measure(range(num_qubits), range(num_qubits))
+    ones = QuantumCircuit(num_qubits, num_qubits, name='cal_1')
+    for qubit in range(num_qubits):
+        ones.rx(pi, qubit)
+    ones.measure(range(num_qubits), range(num_qubits))
+    return zeros, ones
+
+
+def calibrate(backend, shots=200, timeout=None, wait=5):
+    """Run the calibration circuits on all qubits of a backend.
+
+    Parameters:
+        backend (BaseBackend): The backend to calibrate.
+        shots (int): Shots per calibration circuit.
+        timeout (float): Timeout waiting for each job.
+        wait (float): Wait time between result polls.
+
+    Returns:
+        ReadoutCalibration: The new calibration.
+    """
+    num_qubits = backend.configuration().n_qubits
+    max_shots = backend.configuration().max_shots
+    runs = []
+    for circuit in _calibration_circuits(num_qubits):
+        runs += [(circuit, run_shots)
+                 for run_shots in split_shots(shots, max_shots)]
+    collected = run_and_collect(backend, runs, timeout=timeout, wait=wait)
+    half = len(runs) // 2
+    return ReadoutCalibration.from_samples(
+        np.concatenate([samples for _, samples in collected[:half]]),
+        np.concatenate([samples for _, samples in collected[half:]]),
+        num_qubits, job_ids=[job.job_id() for job, _ in collected])
+
+
+def get_calibration(backend, shots=200, max_age=3600, refresh=False):
+    """Return a cached calibration of a backend, calibrating if needed.
+
+    Parameters:
+        backend (BaseBackend): The backend.
+        shots (int): Shots per calibration circuit of a new calibration.
+        max_age (float): Seconds after which a calibration expires.
+        refresh (bool): Always run a new calibration.
+
+    Returns:
+        ReadoutCalibration: The calibration.
+    """
+    key = backend.name()
+    with _CALIBRATIONS_LOCK:
+        calibration = _CALIBRATIONS.get(key)
+    if (refresh or calibration is None or
+            time.time() - calibration.timestamp > max_age):
+        calibration = calibrate(backend, shots)
+        with _CALIBRATIONS_LOCK:
+            _CALIBRATIONS[key] = calibration
+    return calibration
+
+
+def clear_calibrations():
+    """Drop all cached calibrations."""
+    with _CALIBRATIONS_LOCK:
+        _CALIBRATIONS.clear()
+
+
+class ReadoutMitigator:
+    """Corrects counts for the readout errors of a backend.
+
+    The calibration is shared by all mitigators of a backend and rerun once
+    it is older than ``max_age`` seconds.
+
+    Typical usage is:
+
+    .. code-block:: python
+
+        mitigator = ReadoutMitigator(backend)
+        job = backend.run(circuit)
+        probabilities = mitigator.apply_job(job)
+
+    Attributes:
+        backend (BaseBackend): The mitigated backend.
+        method (str): Correction method, see ``ReadoutCalibration.apply``.
+    """
+
+    def __init__(self, backend, shots=200, max_age=3600,
+                 method='least_squares'):
+        self.backend = backend
+        self.method = method
+        self._shots = shots
+        self._max_age = max_age
+
+    @property
+    def calibration(self):
+        """The current ``ReadoutCalibration`` of the backend."""
+        return get_calibration(self.backend, self._shots, self._max_age)
+
+    def apply(self, counts, qubits=None):
+        """Correct counts for readout errors.
+
+        Parameters:
+            counts (dict): Counts keyed by bitstring, as returned by
+                ``Result.get_counts()``, or by integer outcome.
+            qubits (list): Qubit measured into each classical bit, ``None``
+                for unmeasured bits. By default classical bit ``i`` holds
+                qubit ``i``.
+
+        Returns:
+            dict: Corrected probabilities, keyed like ``counts``. Outcomes
+            with zero probability are left out.
+        """
+        bitstrings = bool(counts) and isinstance(next(iter(counts)), str)
+        if qubits is None:
+            if bitstrings:
+                num_bits = len(next(iter(counts)).replace(' ', ''))
+            else:
+                num_bits = max(max(counts).bit_length(), 1)
+            qubits = list(range(num_bits))
+        outcomes = np.array([int(key.replace(' ', ''), 2) if bitstrings
+                             else key for key in counts], dtype=np.int64)
+        values = np.array(list(counts.values()), dtype=float)
+        dense = np.zeros(2 ** len(qubits))
+        np.add.at(dense, outcomes, values)
+        dense = self.calibration.apply(dense / dense.sum(), qubits,
+                                       self.method)
+        nonzero = np.nonzero(np.abs(dense) > 1e-12)[0]
+        if bitstrings:
+            return {format(outcome, '0%db' % len(qubits)): dense[outcome]
+                    for outcome in nonzero.tolist()}
+        return {outcome: dense[outcome] for outcome in nonzero.tolist()}
+
+    def apply_job(self, job, timeout=None, wait=5):
+        """Return the corrected probabilities of a job's result.
+
+        Parameters:
+            job (AQTJob): A job of the mitigated backend.
+            timeout (float): A timeout for trying to get the counts.
+            wait (float): A specified wait time between retrieval attempts.
+
+        Returns:
+            dict: Corrected probabilities keyed by bitstring.
+        """
+        counts = job.result(timeout=timeout, wait=wait).get_counts()
+        qubits = [None] * job._num_clbits  # pylint: disable=protected-access
+        for qubit, clbit in job.memory_mapping.items():
+            qubits[clbit] = qubit
+        return self.apply(counts, qubits)
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Matrix product state simulation of AQT operation sequences.
+
+The state of ``n`` ions is held as ``n`` tensors of shape
+``(left bond, 2, right bond)`` with an orthogonality center that is moved
+by QR sweeps, so that every two-qubit gate is followed by an optimal
+truncation of the bond it acts on. Bonds keep at most ``max_bond``
+singular values and drop those whose weight is below ``cutoff``; the sum
+of the dropped weights is reported as ``truncation_error``, an estimate of
+the infidelity of the final state. Gates on ions that are not neighbours
+in the chain are applied through swaps.
+
+Memory and time grow with the bond dimension rather than with ``2 ** n``,
+so circuits of low entanglement, e.g. shallow MS ladders, can be run on
+dozens of ions.
+"""
+
+import gzip
+import itertools
+import json
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+import numpy as np
+from numpy import pi
+
+from .aqt_ops import OP_CODES, ops_from_list
+from .aqt_transport import ReplayedResponse, Transport
+
+_PAULI_XX = np.fliplr(np.eye(4))
+_SWAP = np.eye(4)[[0, 2, 1, 3]]
+
+
+def gate_matrix(name, exponent):
+    """Return the unitary of an AQT operation.
+
+    Parameters:
+        name (str): ``'X'``, ``'Y'`` or ``'MS'``.
+        exponent (float): Rotation angle in units of pi.
+
+    Returns:
+        numpy.ndarray: A 2x2 or, for ``'MS'``, 4x4 matrix.
+    """
+    cos = np.cos(exponent * pi / 2)
+    sin = np.sin(exponent * pi / 2)
+    if name == 'X':
+        return np.array([[cos, -1j * sin], [-1j * sin, cos]])
+    if name == 'Y':
+        return np.array([[cos, -sin], [sin, cos]], dtype=complex)
+    return cos * np.eye(4) - 1j * sin * _PAULI_XX
+
+
+class MPSEngine:
+    """Matrix product state of a chain of ions, see the module documentation.
+
+    Attributes:
+        num_qubits (int): Number of ions.
+        max_bond (int): Largest bond dimension.
+        cutoff (float): Relative weight below which singular values are
+            dropped.
+        truncation_error (float): Sum of the relative weights dropped so far.
+    """
+
+    def __init__(self, num_qubits, max_bond=64, cutoff=1e-12):
+        self.num_qubits = num_qubits
+        self.max_bond = max_bond
+        self.cutoff = cutoff
+        self.truncation_error = 0.0
+        zero = np.zeros((1, 2, 1), dtype=complex)
+        zero[0, 0, 0] = 1
+        self._tensors = [zero.copy() for _ in range(num_qubits)]
+        self._center = 0
+
+    @property
+    def bond_dimensions(self):
+        """list[int]: Dimension of every bond of the chain."""
+        return [tensor.shape[2] for tensor in self._tensors[:-1]]
+
+    def _move_center(self, site):
+        tensors = self._tensors
+        while self._center < site:
+            tensor = tensors[self._center]
+            left, _, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left * 2, right))
+            tensors[self._center] = q.reshape(left, 2, q.shape[1])
+            tensors[self._center + 1] = np.einsum(
+                'ab,bjc->ajc', r, tensors[self._center + 1])
+            self._center += 1
+        while self._center > site:
+            tensor = tensors[self._center]
+            left, _, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left, 2 * right).T)
+            tensors[self._center] = q.T.reshape(q.shape[1], 2, right)
+            tensors[self._center - 1] = np.einsum(
+                'ajb,bc->ajc', tensors[self._center - 1], r.T)
+            self._center -= 1
+
+    def apply_1q(self, qubit, matrix):
+        """Apply a single-qubit gate."""
+        self._tensors[qubit] = np.einsum('ij,ajb->aib', matrix,
+                                         self._tensors[qubit])
+
+    def _apply_adjacent(self, site, matrix):
+        """Apply a gate to ``site`` and ``site + 1`` and truncate the bond."""
+        self._move_center(site)
+        first, second = self._tensors[site], self._tensors[site + 1]
+        left, right = first.shape[0], second.shape[2]
+        theta = np.einsum('aib,bjc->aijc', first, second)
+        theta = np.einsum('ijkl,aklc->aijc', matrix.reshape(2, 2, 2, 2),
+                          theta)
+        u, s, vh = np.linalg.svd(theta.reshape(left * 2, 2 * right),
+                                 full_matrices=False)
+        weights = s ** 2
+        total = weights.sum()
+        keep = int(np.count_nonzero(weights > self.cutoff * total))
+        keep = max(1, min(self.max_bond, keep))
+        self.truncation_error += float(weights[keep:].sum() / total)
+        s = s[:keep] / np.sqrt(weights[:keep].sum())
+        self._tensors[site] = u[:, :keep].reshape(left, 2, keep)
+        self._tensors[site + 1] = (s[:, None] * vh[:keep]).reshape(keep, 2,
+                                                                   right)
+        self._center = site + 1
+
+    def apply_2q(self, first, second, matrix):
+        """Apply a two-qubit gate, swapping ions next to each other first.
+
+        Parameters:
+            first (int): Ion of the first tensor factor of ``matrix``.
+            second (int): Ion of the second tensor factor.
+            matrix (numpy.ndarray): The 4x4 unitary.
+        """
+        if first > second:
+            first, second = second, first
+            matrix = _SWAP @ matrix @ _SWAP
+        for site in range(second - 1, first, -1):
+            self._apply_adjacent(site, _SWAP)
+        self._apply_adjacent(first, matrix)
+        for site in range(first + 1, second):
+            self._apply_adjacent(site, _SWAP)
+
+    def apply_ops(self, ops):
+        """Apply an operation array, see ``aqt_ops``.
+
+        A global ``MS`` gate acts on every pair of ions.
+        """
+        for op, exponent, num_qubits, qubits in zip(
+                ops['op'].tolist(), ops['exponent'].tolist(),
+                ops['num_qubits'].tolist(), ops['qubits'].tolist()):
+            if op == OP_CODES['X']:
+                self.apply_1q(qubits[0], gate_matrix('X', exponent))
+            elif op == OP_CODES['Y']:
+                self.apply_1q(qubits[0], gate_matrix('Y', exponent))
+            elif num_qubits == 2:
+                self.apply_2q(qubits[0], qubits[1],
+                              gate_matrix('MS', exponent))
+            else:
+                matrix = gate_matrix('MS', exponent)
+                for pair in itertools.combinations(range(self.num_qubits), 2):
+                    self.apply_2q(pair[0], pair[1], matrix)
+
+    def statevector(self):
+        """Return the dense state, only feasible for few ions.
+
+        Returns:
+            numpy.ndarray: Amplitudes indexed like Qiskit statevectors, with
+            bit ``i`` of the index holding ion ``i``.
+        """
+        state = np.ones((1, 1), dtype=complex)
+        for tensor in self._tensors:
+            state = np.einsum('xa,ajb->xjb', state, tensor).reshape(
+                -1, tensor.shape[2])
+        state = state.reshape([2] * self.num_qubits)
+        return state.transpose(range(self.num_qubits - 1, -1, -1)).reshape(-1)
+
+    def sample(self, shots, seed=None):
+        """Measure all ions in the computational basis.
+
+        All shots are drawn together, ion by ion, each conditioned on the
+        outcomes of the ions before it.
+
+        Parameters:
+            shots (int): Number of shots.
+            seed (int): Seed of the random generator.
+
+        Returns:
+            numpy.ndarray: One integer per shot, bit ``i`` holding ion ``i``.
+        """
+        self._move_center(0)
+        rng = np.random.default_rng(seed)
+        environment = np.ones((shots, 1), dtype=complex)
+        samples = np.zeros(shots, dtype=np.int64)
+        rows = np.arange(shots)
+        for qubit, tensor in enumerate(self._tensors):
+            amplitudes = np.einsum('sa,abc->sbc', environment, tensor)
+            weights = (np.abs(amplitudes) ** 2).sum(axis=2)
+            ones = rng.random(shots) * weights.sum(axis=1) < weights[:, 1]
+            environment = amplitudes[rows, ones.astype(np.intp)]
+            environment /= np.linalg.norm(environment, axis=1, keepdims=True)
+            samples |= ones.astype(np.int64) << qubit
+        return samples
+
+
+def _decode_payload(data):
+    if isinstance(data, bytes):
+        fields = parse_qs(gzip.decompress(data).decode('utf-8'))
+        return {key: values[0] for key, values in fields.items()}
+    return data
+
+
+class MPSTransport(Transport):
+    """Runs the payloads of a backend on an ``MPSEngine`` instead of
+    sending them to a gateway.
+
+    Jobs are simulated when they are submitted and kept until
+    ``max_jobs`` newer jobs have been run. The engine settings are read from
+    the backend options ``max_bond``, ``cutoff`` and ``seed``.
+    """
+
+    def __init__(self, backend, max_jobs=1000):
+        self._backend = backend
+        self._max_jobs = max_jobs
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._count = itertools.count()
+
+    def _simulate(self, job_id, payload):
+        num_qubits = int(payload['no_qubits'])
+        shots = int(payload['repetitions'])
+        options = self._backend.options
+        engine = MPSEngine(num_qubits, options.max_bond, options.cutoff)
+        try:
+            engine.apply_ops(ops_from_list(json.loads(payload['data'])))
+        except (ValueError, IndexError) as ex:
+            return {'id': job_id, 'status': 'error', 'error': str(ex)}
+        return {'id': job_id, 'status': 'finished',
+                'no_qubits': num_qubits, 'repetitions': shots,
+                'samples': engine.sample(shots, options.seed).tolist(),
+                'metadata': {'truncation_error': engine.truncation_error,
+                             'bond_dimensions': engine.bond_dimensions}}
+
+    def put(self, url, data=None, headers=None, stream=False):
+        if isinstance(data, dict) and 'id' in data:
+            with self._lock:
+                body = self._results.get(data['id'])
+            if body is None:
+                return ReplayedResponse(
+                    404, {'Content-Type': 'application/json'},
+                    json.dumps({'id': data['id'], 'status': 'error',
+                                'error': 'Unknown job'}).encode('utf-8'), url)
+        else:
+            job_id = 'mps-%d' % next(self._count)
+            result = self._simulate(job_id, _decode_payload(data))
+            with self._lock:
+                self._results[job_id] = result
+                while len(self._results) > self._max_jobs:
+                    self._results.popitem(last=False)
+            body = {'id': job_id}
+        return ReplayedResponse(200, {'Content-Type': 'application/json'},
+                                json.dumps(body).encode('utf-8'), url)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Compact array representation of AQT operation sequences.
+
+An AQT payload is a list of ``[op_string, gate_exponent, qubits]`` entries.
+Instead of materializing one Python tuple per gate, sequences are held in a
+structured NumPy array with one row per operation:
+
+    op          uint8      index into ``OP_NAMES``
+    exponent    float64    gate exponent (angle / pi)
+    num_qubits  uint8      number of valid entries in ``qubits``
+    qubits      int16[2]   qubit indices, unused slots set to -1
+
+A global ``MS`` gate (the ``ms`` instruction) has ``num_qubits == 0``.
+"""
+
+import hashlib
+import json
+
+import numpy as np
+
+OP_NAMES = ('X', 'Y', 'MS')
+OP_CODES = {name: code for code, name in enumerate(OP_NAMES)}
+MAX_OP_QUBITS = 2
+
+OP_DTYPE = np.dtype([('op', np.uint8),
+                     ('exponent', np.float64),
+                     ('num_qubits', np.uint8),
+                     ('qubits', np.int16, (MAX_OP_QUBITS,))])
+
+_PADDING = tuple([-1] * pad for pad in range(MAX_OP_QUBITS, -1, -1))
+
+
+def ops_from_columns(names, exponents, qubit_lists):
+    """Build an operation array from per-column lists.
+
+    Each column is assigned in one go, which keeps the cost per operation
+    close to that of appending to a list.
+
+    Parameters:
+        names (list[str]): Operation names, see ``OP_NAMES``.
+        exponents (list[float]): Gate exponents.
+        qubit_lists (list[list[int]]): Qubits of every operation.
+
+    Returns:
+        numpy.ndarray: Array of ``OP_DTYPE``.
+
+    Raises:
+        ValueError: If an entry has an unknown operation or too many qubits.
+    """
+    try:
+        codes = [OP_CODES[name] for name in names]
+    except KeyError as ex:
+        raise ValueError("Unknown AQT operation '%s'" % ex.args[0])
+    num_qubits = [len(qubits) for qubits in qubit_lists]
+    if num_qubits and max(num_qubits) > MAX_OP_QUBITS:
+        raise ValueError("Operation acts on more than %d qubits" %
+                         MAX_OP_QUBITS)
+    ops = np.empty(len(codes), dtype=OP_DTYPE)
+    ops['op'] = codes
+    ops['exponent'] = exponents
+    ops['num_qubits'] = num_qubits
+    ops['qubits'] = np.array([list(qubits) + _PADDING[len(qubits)]
+                              for qubits in qubit_lists],
+                             dtype=np.int16).reshape(-1, MAX_OP_QUBITS)
+    return ops
+
+
+def ops_from_list(seq):
+    """Build an operation array from ``(name, exponent, qubits)`` entries.
+
+    Parameters:
+        seq (list): Sequence of ``(op_string, gate_exponent, qubits)``.
+
+    Returns:
+        numpy.ndarray: Array of ``OP_DTYPE``.
+
+    Raises:
+        ValueError: If an entry has an unknown operation or too many qubits.
+    """
+    if not seq:
+        return ops_from_columns([], [], [])
+    return ops_from_columns(*zip(*seq))
+
+
+def ops_validate(ops, num_qubits):
+    """Check that an operation array can run on ``num_qubits`` ions.
+
+    Parameters:
+        ops (numpy.ndarray): Array of ``OP_DTYPE``.
+        num_qubits (int): Number of ions of the experiment.
+
+    Raises:
+        ValueError: If an exponent is not finite, a qubit is out of range,
+            an ``X`` or ``Y`` does not act on one qubit or an ``MS`` does
+            not act on two distinct qubits or on all of them.
+    """
+    if not np.isfinite(ops['exponent']).all():
+        raise ValueError('Gate exponents must be finite')
+    counts = ops['num_qubits']
+    single = ops['op'] != OP_CODES['MS']
+    if (counts[single] != 1).any():
+        raise ValueError("'X' and 'Y' act on exactly one qubit")
+    if np.isin(counts[~single], (0, 2), invert=True).any():
+        raise ValueError("'MS' acts on two qubits or, without qubits, on all")
+    used = np.arange(MAX_OP_QUBITS) < counts[:, None]
+    qubits = ops['qubits'][used]
+    if len(qubits) and (qubits.min() < 0 or qubits.max() >= num_qubits):
+        raise ValueError('Qubit index out of range for %d qubits' %
+                         num_qubits)
+    pairs = ops['qubits'][counts == 2]
+    if (pairs[:, 0] == pairs[:, 1]).any():
+        raise ValueError("'MS' acts on two distinct qubits")
+
+
+def ops_to_list(ops):
+    """Return the ``(name, exponent, qubits)`` tuples of an operation array.
+
+    Parameters:
+        ops (numpy.ndarray): Array of ``OP_DTYPE``.
+
+    Returns:
+        list: One ``(op_string, gate_exponent, qubits)`` tuple per row.
+    """
+    return [(OP_NAMES[op], exponent, qubits[:num_qubits])
+            for op, exponent, num_qubits, qubits in zip(
+                ops['op'].tolist(), ops['exponent'].tolist(),
+                ops['num_qubits'].tolist(), ops['qubits'].tolist())]
+
+
+def ops_to_json(ops):
+    """Serialize an operation array to the AQT JSON ``data`` string.
+
+    Parameters:
+        ops (numpy.ndarray): Array of ``OP_DTYPE``.
+
+    Returns:
+        str: The JSON encoded operation list.
+    """
+    return json.dumps(ops_to_list(ops))
+
+
+def ops_shift(ops, offset):
+    """Return the operations moved to qubits ``offset`` places higher.
+
+    Parameters:
+        ops (numpy.ndarray): Array of ``OP_DTYPE``.
+        offset (int): Number of qubits to shift by.
+
+    Returns:
+        numpy.ndarray: The shifted copy, or ``ops`` itself for offset 0.
+    """
+    if not offset:
+        return ops
+    shifted = ops.copy()
+    qubits = shifted['qubits']
+    qubits[qubits >= 0] += offset
+    return shifted
+
+
+def ops_have_global_gates(ops):
+    """Return whether any operation acts on all qubits (a global ``MS``).
+
+    Parameters:
+        ops (numpy.ndarray): Array of ``OP_DTYPE``.
+
+    Returns:
+        bool: ``True`` if the sequence contains a global gate.
+    """
+    return bool((ops['num_qubits'] == 0).any())
+
+
+def ops_digest(ops, num_qubits):
+    """Return a stable fingerprint of an operation sequence.
+
+    Parameters:
+        ops (numpy.ndarray): Array of ``OP_DTYPE``.
+        num_qubits (int): Register width the sequence runs on.
+
+    Returns:
+        str: Hex digest identifying the sequence and its width.
+    """
+    digest = hashlib.sha1(np.ascontiguousarray(ops, dtype=OP_DTYPE).tobytes())
+    digest.update(b'%d' % num_qubits)
+    return digest.hexdigest()
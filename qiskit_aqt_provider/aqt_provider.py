@@ -15,7 +15,13 @@
 
 from qiskit.providers.providerutils import filter_backends
 from qiskit.providers.exceptions import QiskitBackendNotFoundError
-from .aqt_backend import AQTSimulator, AQTSimulatorNoise1, AQTDevice
+from .aqt_backend import (AQTSimulator, AQTSimulatorNoise1, AQTDevice,
+                          AQTMPSSimulator)
+from .aqt_instrumentation import Instrumentation
+from .aqt_job import JobWatcher
+from .aqt_metrics import MetricsRegistry
+from .aqt_token_pool import TokenPool
+from .aqt_transport import Transport
 
 
 class AQTProvider():
@@ -33,22 +39,68 @@ class AQTProvider():
 
     where `'MY_TOKEN'` is the access token provided by AQT.
 
+    A provider and its backends can be shared by any number of threads.
+    Submissions and polls take no provider-wide lock: each thread sends its
+    requests over its own HTTP session, backends read a snapshot of their
+    options per call, and the metrics lock each metric separately.
+
     Attributes:
         access_token (str): The access token.
         name (str): Name of the provider instance.
         backends (BackendService): A service instance that allows
                                    for grabbing backends.
+        instrumentation (Instrumentation): Timing hooks around conversion,
+                                           submission and result retrieval.
+        metrics (MetricsRegistry): Aggregate counters and histograms of the
+                                   provider's activity.
+        transport (Transport): Sends the HTTP requests of all backends and
+                               jobs, see ``aqt_transport``.
+        scheduler (JobScheduler): Orders submissions by priority, see
+                                  ``aqt_scheduler``. ``None`` submits
+                                  right away.
+        watcher (JobWatcher): Polls the jobs holding a scheduler or token
+                              slot in the background, so that the slots
+                              are given back without the caller waiting
+                              for the jobs.
     """
 
-    def __init__(self, access_token):
+    def __init__(self, access_token, transport=None, scheduler=None):
         super().__init__()
 
         self.access_token = access_token
         self.name = 'aqt_provider'
+        self.transport = transport or Transport()
+        self.scheduler = scheduler
+        self.watcher = JobWatcher()
+        self.instrumentation = Instrumentation()
+        self.metrics = MetricsRegistry()
+        self.instrumentation.add_callback(self.metrics)
         # Populate the list of AQT backends
         self.backends = BackendService([AQTSimulator(provider=self),
                                         AQTSimulatorNoise1(provider=self),
-                                        AQTDevice(provider=self)])
+                                        AQTDevice(provider=self),
+                                        AQTMPSSimulator(provider=self)])
+
+    def acquire_token(self):
+        """Return the access token to submit the next job with.
+
+        Returns:
+            str: The token.
+        """
+        return self.access_token
+
+    def release_token(self, token, failed=False):
+        """Called once a job submitted with ``token`` has ended.
+
+        Parameters:
+            token (str): The token returned by ``acquire_token``.
+            failed (bool): Whether the submission or the job failed.
+        """
+
+    def _limits_jobs(self):
+        """Whether submitted jobs hold a slot until they end, so that they
+        have to be watched."""
+        return self.scheduler is not None
 
     def __str__(self):
         return "<AQTProvider(name={})>".format(self.name)
@@ -83,6 +135,61 @@ class AQTProvider():
         return type(self).__name__ == type(other).__name__
 
 
+class AQTPoolProvider(AQTProvider):
+    """Provider spreading jobs over several access tokens.
+
+    Every submission takes the token chosen by a ``TokenPool``, and its job
+    polls with that same token. Tokens are given back to the pool when
+    their jobs finish, fail or are cancelled. The provider's ``watcher``
+    polls the jobs in the background, so tokens are given back even before
+    the jobs are waited for.
+
+    Typical usage is:
+
+    .. code-block:: python
+
+        from qiskit_aqt_provider import AQTPoolProvider
+
+        aqt = AQTPoolProvider(['TOKEN_1', 'TOKEN_2'], max_in_flight=4)
+
+    Attributes:
+        pool (TokenPool): The token pool.
+    """
+
+    def __init__(self, access_tokens, strategy='least_loaded',
+                 max_in_flight=None, max_failures=3, cooldown=60.0,
+                 acquire_timeout=None, transport=None, scheduler=None):
+        """Create a pooled provider.
+
+        Parameters:
+            access_tokens (list[str]): The access tokens.
+            strategy (str): ``'least_loaded'`` or ``'round_robin'``.
+            max_in_flight (int or dict): Concurrent jobs per token, see
+                ``TokenPool``.
+            max_failures (int): Consecutive failures before a token is
+                left out for ``cooldown`` seconds.
+            cooldown (float): Seconds an unhealthy token is left out.
+            acquire_timeout (float): Seconds a submission waits for a free
+                token, ``None`` waits forever.
+            transport (Transport): The HTTP transport.
+            scheduler (JobScheduler): The submission scheduler.
+        """
+        self.pool = TokenPool(access_tokens, strategy, max_in_flight,
+                              max_failures, cooldown)
+        self._acquire_timeout = acquire_timeout
+        super().__init__(access_tokens[0], transport, scheduler)
+        self.name = 'aqt_pool_provider'
+
+    def acquire_token(self):
+        return self.pool.acquire(self._acquire_timeout)
+
+    def release_token(self, token, failed=False):
+        self.pool.release(token, failed)
+
+    def _limits_jobs(self):
+        return True
+
+
 class BackendService():
     """A service class that allows for autocompletion
     of backends from provider.
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Results built over the raw sample arrays of AQT jobs.
+
+``AQTResult`` is a ``qiskit.result.Result`` whose experiments hold the
+samples of each shot. Counts are only computed when they are asked for,
+with ``numpy.unique`` instead of a loop over hexadecimal keys, and can be
+read keyed by integer outcome with ``get_int_counts``.
+
+Marginal counts over subsets of classical bits are computed from the
+samples with bit shifts, in time linear in the number of shots.
+"""
+
+import numpy as np
+
+from qiskit.qobj import QobjExperimentHeader
+from qiskit.result import Counts, Result
+from qiskit.result.models import ExperimentResult, ExperimentResultData
+
+
+def int_counts(samples):
+    """Count the outcomes of an array of samples.
+
+    Parameters:
+        samples (numpy.ndarray): One integer outcome per shot.
+
+    Returns:
+        dict: Counts keyed by integer outcome, in ascending order.
+    """
+    outcomes, counts = np.unique(samples, return_counts=True)
+    return dict(zip(outcomes.tolist(), counts.tolist()))
+
+
+def _bit_matrix(samples, num_bits):
+    shifts = np.arange(num_bits, dtype=np.int64)
+    return ((np.asarray(samples, dtype=np.int64)[:, None] >> shifts) & 1
+            ).astype(np.uint8)
+
+
+def _counts_of(values, num_bits):
+    if num_bits <= 16:
+        counts = np.bincount(values, minlength=1)
+        outcomes = np.nonzero(counts)[0]
+        return dict(zip(outcomes.tolist(), counts[outcomes].tolist()))
+    return int_counts(values)
+
+
+def marginal_samples(samples, clbits):
+    """Restrict samples to some classical bits.
+
+    Parameters:
+        samples (numpy.ndarray): One integer outcome per shot.
+        clbits (list[int]): The kept classical bits; bit ``i`` of the
+            marginal outcome is classical bit ``clbits[i]``.
+
+    Returns:
+        numpy.ndarray: One marginal outcome per shot.
+    """
+    samples = np.asarray(samples, dtype=np.int64)
+    out = np.zeros_like(samples)
+    for index, clbit in enumerate(clbits):
+        out |= ((samples >> clbit) & 1) << index
+    return out
+
+
+def marginal_counts(samples, clbits):
+    """Count the outcomes of some classical bits.
+
+    Parameters:
+        samples (numpy.ndarray): One integer outcome per shot.
+        clbits (list[int]): The kept classical bits, see
+            ``marginal_samples``.
+
+    Returns:
+        dict: Counts keyed by integer marginal outcome, in ascending order.
+    """
+    return _counts_of(marginal_samples(samples, clbits), len(clbits))
+
+
+def marginals(samples, subsets):
+    """Count the outcomes of many subsets of classical bits at once.
+
+    The samples are split into bits once; every subset then takes one
+    matrix-vector product over the shots.
+
+    Parameters:
+        samples (numpy.ndarray): One integer outcome per shot.
+        subsets (list[list[int]]): The kept classical bits of each
+            marginal, see ``marginal_samples``.
+
+    Returns:
+        list[dict]: Counts keyed by integer marginal outcome per subset.
+    """
+    subsets = [list(subset) for subset in subsets]
+    num_bits = max((max(subset, default=-1) for subset in subsets),
+                   default=-1) + 1
+    bits = _bit_matrix(samples, num_bits)
+    out = []
+    for subset in subsets:
+        weights = np.left_shift(1, np.arange(len(subset), dtype=np.int64))
+        values = bits[:, subset].astype(np.int64) @ weights
+        out.append(_counts_of(values, len(subset)))
+    return out
+
+
+class SampleData(ExperimentResultData):
+    """Experiment data computing its counts from the samples on first use.
+
+    Counts can be assigned, as ``qiskit.result.marginal_counts`` does. They
+    then replace the samples, which are set to ``None``.
+
+    Attributes:
+        samples (numpy.ndarray): One integer per shot, with bit ``i``
+            holding the value of classical bit ``i``.
+    """
+
+    def __init__(self, samples):  # pylint: disable=super-init-not-called
+        self.samples = samples
+        self._int_counts = None
+
+    def int_counts(self):
+        """Return the counts keyed by integer outcome."""
+        if self._int_counts is None:
+            self._int_counts = int_counts(self.samples)
+        return self._int_counts
+
+    @property
+    def counts(self):
+        """dict: The counts keyed by hexadecimal string."""
+        return {hex(outcome): count
+                for outcome, count in self.int_counts().items()}
+
+    @counts.setter
+    def counts(self, counts):
+        self.samples = None
+        self._int_counts = {int(outcome, 16): count
+                            for outcome, count in counts.items()}
+
+    def to_dict(self):
+        return {'counts': self.counts}
+
+
+class AQTResult(Result):
+    """Result of AQT jobs, see the module documentation."""
+
+    def __init__(self, backend_name, backend_version, qobj_id, job_id,
+                 experiments, **kwargs):
+        """Create a result.
+
+        Parameters:
+            backend_name (str): Name of the backend.
+            backend_version (str): Version of the backend.
+            qobj_id (str): Identifier of the submitted experiments.
+            job_id (str): The job ID.
+            experiments (list[tuple]): ``(name, memory_slots, samples)`` per
+                experiment.
+            **kwargs: Further metadata, readable as attributes.
+        """
+        results = [
+            ExperimentResult(shots=len(samples), success=True,
+                             data=SampleData(samples),
+                             header=QobjExperimentHeader(
+                                 memory_slots=memory_slots, name=name))
+            for name, memory_slots, samples in experiments]
+        super().__init__(backend_name, backend_version, qobj_id, job_id, True,
+                         results, **kwargs)
+
+    def _per_experiment(self, experiment, function):
+        if experiment is None:
+            keys = range(len(self.results))
+        else:
+            keys = [experiment]
+        values = [function(self._get_experiment(key)) for key in keys]
+        if len(values) == 1:
+            return values[0]
+        return values
+
+    def get_samples(self, experiment=None):
+        """Get the outcome of every shot of an experiment.
+
+        Parameters:
+            experiment (str or QuantumCircuit or int or None): The
+                experiment, as for ``get_counts``.
+
+        Returns:
+            numpy.ndarray or list[numpy.ndarray]: One integer per shot, with
+            bit ``i`` holding the value of classical bit ``i``.
+        """
+        return self._per_experiment(experiment, lambda exp: exp.data.samples)
+
+    def get_int_counts(self, experiment=None):
+        """Get the counts of an experiment keyed by integer outcome.
+
+        Parameters:
+            experiment (str or QuantumCircuit or int or None): The
+                experiment, as for ``get_counts``.
+
+        Returns:
+            dict or list[dict]: Counts keyed by integer outcome.
+        """
+        return self._per_experiment(experiment,
+                                    lambda exp: exp.data.int_counts())
+
+    def get_marginal_counts(self, clbits, experiment=None):
+        """Get the counts of some classical bits of an experiment.
+
+        Parameters:
+            clbits (list[int]): The kept classical bits; bit ``i`` of the
+                marginal outcome is classical bit ``clbits[i]``.
+            experiment (str or QuantumCircuit or int or None): The
+                experiment, as for ``get_counts``.
+
+        Returns:
+            Counts or list[Counts]: The marginal counts.
+        """
+        return self._per_experiment(
+            experiment,
+            lambda exp: Counts(marginal_counts(exp.data.samples, clbits),
+                               memory_slots=len(clbits)))
+
+    def get_marginals(self, subsets, experiment=None):
+        """Get the counts of many subsets of classical bits at once.
+
+        Parameters:
+            subsets (list[list[int]]): The kept classical bits of each
+                marginal, see ``get_marginal_counts``.
+            experiment (str or QuantumCircuit or int or None): The
+                experiment, as for ``get_counts``.
+
+        Returns:
+            list[dict] or list[list[dict]]: Counts keyed by integer marginal
+            outcome per subset.
+        """
+        return self._per_experiment(
+            experiment, lambda exp: marginals(exp.data.samples, subsets))
+
+    def get_counts(self, experiment=None):
+        """Get the counts of an experiment keyed by bitstring.
+
+        Parameters:
+            experiment (str or QuantumCircuit or int or None): The
+                experiment, see ``qiskit.result.Result.get_counts``.
+
+        Returns:
+            Counts or list[Counts]: The counts.
+        """
+        return self._per_experiment(
+            experiment,
+            lambda exp: Counts(exp.data.int_counts(),
+                               memory_slots=exp.header.memory_slots))
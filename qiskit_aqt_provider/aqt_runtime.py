@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Estimates of how long a payload occupies a backend.
+
+The runtime of a job is modelled as a linear function of the features in
+``FEATURES``: a fixed overhead per job, a cost per shot for cooling and
+readout, and per shot the number of single-qubit and MS gates and the
+depth, i.e. the largest number of operations on one ion. The coefficients
+start from rough prior values and are fitted to the observed durations of
+finished jobs, with non-negative least squares pulled towards the prior,
+so that few observations cannot produce wild estimates.
+
+Every backend has a ``runtime_model`` that learns from its own jobs: the
+features of a payload are recorded at submission, and the duration until
+a poll first sees the job finished is taken as its runtime. This includes
+the time spent in the gateway queue and up to one polling interval, so
+the estimates are on the safe side.
+
+The estimates are used to choose polling intervals (``wait=None`` in
+``AQTJob.result``), to share scheduler slots by device time (see
+``aqt_scheduler``) and to bound the size of packed payloads
+(``max_runtime`` of ``run_batch``).
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+from scipy.optimize import nnls
+
+from .aqt_ops import OP_CODES
+
+FEATURES = ('jobs', 'shots', 'single_qubit_gates', 'ms_gates', 'depth')
+
+# seconds per unit of every feature before any calibration
+DEFAULT_COEFFICIENTS = (2.0, 0.01, 2e-5, 2e-4, 0.0)
+
+
+def runtime_features(ops, num_qubits, shots):
+    """Return the features of a payload.
+
+    Parameters:
+        ops (numpy.ndarray): The operations, see ``aqt_ops``.
+        num_qubits (int): Number of ions.
+        shots (int): Number of repetitions.
+
+    Returns:
+        numpy.ndarray: One value per entry of ``FEATURES``.
+    """
+    ms = ops['op'] == OP_CODES['MS']
+    qubits = ops['qubits'][ops['qubits'] >= 0]
+    depth = np.bincount(qubits, minlength=num_qubits)
+    # a global MS gate acts on every ion
+    depth = depth + np.count_nonzero(ms & (ops['num_qubits'] == 0))
+    return np.array([1.0, shots, shots * np.count_nonzero(~ms),
+                     shots * np.count_nonzero(ms),
+                     shots * depth.max(initial=0)], dtype=float)
+
+
+def poll_interval(estimate, elapsed, minimum=0.1, maximum=5.0):
+    """Return the time to wait before the next poll of a job.
+
+    Before the estimated end of the job, the wait lasts until then. After
+    it, polls come every tenth of the estimate.
+
+    Parameters:
+        estimate (float): Estimated runtime of the job, ``None`` if unknown.
+        elapsed (float): Seconds since the job was submitted.
+        minimum (float): Shortest interval.
+        maximum (float): Longest interval.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    if estimate is None:
+        return maximum
+    if elapsed < estimate:
+        interval = estimate - elapsed
+    else:
+        interval = 0.1 * estimate
+    return min(max(interval, minimum), maximum)
+
+
+class RuntimeModel:
+    """Linear runtime model of a backend, see the module documentation.
+
+    The model is an instrumentation callback: registered with a provider,
+    it learns from the polls of the jobs announced by ``submitted``.
+
+    Attributes:
+        coefficients (numpy.ndarray): Seconds per unit of every feature.
+        prior (numpy.ndarray): The coefficients without observations.
+        regularization (float): Weight of the prior, in observations.
+    """
+
+    def __init__(self, coefficients=DEFAULT_COEFFICIENTS, regularization=1.0,
+                 max_observations=1000, max_pending=10000):
+        """Create a model.
+
+        Parameters:
+            coefficients (tuple): Prior seconds per unit of every feature.
+            regularization (float): Weight of the prior, in observations.
+            max_observations (int): Number of most recent observations the
+                fit uses.
+            max_pending (int): Largest number of submitted jobs tracked
+                until they finish.
+        """
+        self.prior = np.array(coefficients, dtype=float)
+        self.coefficients = self.prior.copy()
+        self.regularization = regularization
+        self._observations = deque(maxlen=max_observations)
+        self._pending = OrderedDict()
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+
+    def estimate(self, ops, num_qubits, shots):
+        """Estimate the runtime of a payload.
+
+        Parameters:
+            ops (numpy.ndarray): The operations, see ``aqt_ops``.
+            num_qubits (int): Number of ions.
+            shots (int): Number of repetitions.
+
+        Returns:
+            float: Seconds.
+        """
+        return self.estimate_features(runtime_features(ops, num_qubits,
+                                                       shots))
+
+    def estimate_features(self, features):
+        """Estimate the runtime of a payload from its features.
+
+        Returns:
+            float: Seconds.
+        """
+        return float(np.dot(self.coefficients, features))
+
+    def observe(self, features, duration):
+        """Add the observed runtime of a payload and refit the model.
+
+        Parameters:
+            features (numpy.ndarray): See ``runtime_features``.
+            duration (float): Observed runtime in seconds.
+        """
+        with self._lock:
+            self._observations.append((np.asarray(features, dtype=float),
+                                       float(duration)))
+            self._fit()
+
+    def _fit(self):
+        features = np.array([row for row, _ in self._observations])
+        durations = np.array([duration for _, duration in self._observations])
+        # the prior enters as one row per coefficient, scaled like the
+        # observed features so that it weighs as ``regularization`` jobs
+        scale = np.sqrt(np.mean(features ** 2, axis=0))
+        scale[scale == 0] = 1.0
+        weight = np.sqrt(self.regularization) * np.diag(scale)
+        matrix = np.vstack([features, weight]) / scale
+        target = np.concatenate([durations, weight @ self.prior])
+        solution, _ = nnls(matrix, target)
+        self.coefficients = solution / scale
+
+    def submitted(self, job_id, features, start=None):
+        """Track a submitted job until a poll sees it finished.
+
+        Parameters:
+            job_id (str): The job ID.
+            features (numpy.ndarray): See ``runtime_features``.
+            start (float): Submission time, now by default.
+        """
+        with self._lock:
+            self._pending[job_id] = (features,
+                                     time.time() if start is None else start)
+            while len(self._pending) > self._max_pending:
+                self._pending.popitem(last=False)
+
+    def expected(self, job_id):
+        """Return the estimated runtime of a tracked job, ``None`` if it is
+        not tracked."""
+        with self._lock:
+            entry = self._pending.get(job_id)
+        if entry is None:
+            return None
+        return self.estimate_features(entry[0])
+
+    def __call__(self, span):
+        if span.name == 'cancel':
+            with self._lock:
+                for job_id in span.attributes.get('job_ids', ()):
+                    self._pending.pop(job_id, None)
+            return
+        if span.name != 'poll' or not span.attributes.get('final'):
+            return
+        with self._lock:
+            entry = self._pending.pop(span.attributes.get('job_id'), None)
+        if entry is not None and span.error is None and \
+                span.attributes.get('status') == 'finished':
+            self.observe(entry[0], span.start + span.duration - entry[1])
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Batched sampling of (parametrized) circuits on AQT backends."""
+
+from collections import namedtuple
+
+import numpy as np
+
+from qiskit import QuantumCircuit, transpile
+
+from .aqt_job import run_and_collect, split_shots
+
+SamplerResult = namedtuple('SamplerResult', ['quasi_dists', 'metadata'])
+SamplerResult.__doc__ = """Outcome distributions of a sampler run.
+
+Attributes:
+    quasi_dists (list[list[dict]]): Per unit, one distribution per parameter
+        binding, mapping the measured integer (bit ``i`` is classical bit
+        ``i``) to its probability.
+    metadata (list[list[dict]]): Per unit and binding, the ``shots`` taken
+        and the ``job_ids`` of the jobs used.
+"""
+
+
+def quasi_distribution(samples):
+    """Return the outcome probabilities of integer samples.
+
+    Parameters:
+        samples (numpy.ndarray): One measured integer per shot.
+
+    Returns:
+        dict: Maps every observed integer to its relative frequency.
+    """
+    if not len(samples):
+        return {}
+    values, counts = np.unique(samples, return_counts=True)
+    return dict(zip(values.tolist(), (counts / len(samples)).tolist()))
+
+
+def _bindings(circuit, parameter_values):
+    """Return the parameter binding dicts of a unit."""
+    parameters = sorted(circuit.parameters, key=lambda param: param.name)
+    if parameter_values is None:
+        if parameters:
+            raise ValueError("Circuit '%s' has unbound parameters %s" %
+                             (circuit.name, [p.name for p in parameters]))
+        return [None]
+    if isinstance(parameter_values, dict):
+        return [parameter_values]
+    values = np.asarray(parameter_values, dtype=float)
+    if values.ndim == 1:
+        values = values[None, :]
+    if values.ndim != 2 or values.shape[1] != len(parameters):
+        raise ValueError("Circuit '%s' has %d parameters, got values of "
+                         "shape %s" % (circuit.name, len(parameters),
+                                       np.shape(parameter_values)))
+    return [dict(zip(parameters, row)) for row in values.tolist()]
+
+
+class AQTSampler:
+    """Samples many circuits and parameter bindings in one call.
+
+    Work is given as units of ``(circuit, parameter_values, shots)``. Every
+    circuit is transpiled once and then bound to each of its parameter
+    sets. Each bound circuit becomes one or more jobs, as the gateway takes
+    a single experiment of at most ``max_shots`` shots per job, and all
+    jobs are submitted and collected concurrently.
+
+    Typical usage is:
+
+    .. code-block:: python
+
+        sampler = AQTSampler(backend)
+        result = sampler.run([(circuit, [[0.1], [0.2], [0.3]], 400)])
+        print(result.quasi_dists[0])
+
+    Attributes:
+        backend (BaseBackend): Backend the circuits run on.
+        shots (int): Default number of shots per binding.
+    """
+
+    def __init__(self, backend, shots=None, max_workers=8):
+        """Create a sampler.
+
+        Parameters:
+            backend (BaseBackend): Backend the circuits run on.
+            shots (int): Default number of shots per binding, the backend's
+                ``shots`` option if ``None``.
+            max_workers (int): Number of jobs submitted and waited for
+                concurrently.
+        """
+        self.backend = backend
+        self.shots = shots
+        self._max_workers = max_workers
+
+    def run(self, units, timeout=None, wait=5):
+        """Sample every binding of every unit.
+
+        Parameters:
+            units (list): Units, each a ``QuantumCircuit`` or a tuple of
+                ``(circuit, parameter_values)`` or ``(circuit,
+                parameter_values, shots)``. ``parameter_values`` is ``None``,
+                a dict of parameter values, a sequence of values in the
+                order of the sorted parameter names, or a 2d array with one
+                binding per row.
+            timeout (float): Timeout waiting for each job.
+            wait (float): Wait time between result polls.
+
+        Returns:
+            SamplerResult: The distributions, in the order of the units and
+            their bindings.
+
+        Raises:
+            ValueError: If parameter values do not match their circuit.
+        """
+        if isinstance(units, QuantumCircuit):
+            units = [units]
+        max_shots = self.backend.configuration().max_shots
+        keys = []
+        runs = []
+        num_bindings = []
+        for index, unit in enumerate(units):
+            if isinstance(unit, QuantumCircuit):
+                unit = (unit,)
+            circuit = unit[0]
+            parameter_values = unit[1] if len(unit) > 1 else None
+            shots = (unit[2] if len(unit) > 2 else None) or \
+                self.shots or self.backend.options.shots
+            bindings = _bindings(circuit, parameter_values)
+            num_bindings.append(len(bindings))
+            transpiled = transpile(circuit, self.backend)
+            for position, binding in enumerate(bindings):
+                bound = (transpiled if binding is None
+                         else transpiled.bind_parameters(binding))
+                for run_shots in split_shots(shots, max_shots):
+                    keys.append((index, position))
+                    runs.append((bound, run_shots))
+
+        samples = {}
+        job_ids = {}
+        for key, (job, job_samples) in zip(keys, run_and_collect(
+                self.backend, runs, self._max_workers, timeout, wait)):
+            samples.setdefault(key, []).append(job_samples)
+            job_ids.setdefault(key, []).append(job.job_id())
+        quasi_dists = [[None] * count for count in num_bindings]
+        metadata = [[None] * count for count in num_bindings]
+        for (index, position), parts in samples.items():
+            merged = np.concatenate(parts)
+            quasi_dists[index][position] = quasi_distribution(merged)
+            metadata[index][position] = {'shots': len(merged),
+                                         'job_ids': job_ids[index, position]}
+        return SamplerResult(quasi_dists, metadata)
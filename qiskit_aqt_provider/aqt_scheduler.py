@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Client-side scheduling of job submissions by priority.
+
+A ``JobScheduler`` attached to a provider limits how many of its jobs are
+on the gateway at once. Every submission first takes a slot, and the slot
+is given back once the job has ended, i.e. once a poll saw it finish or
+fail, or it was cancelled. When no slot is free, submissions wait, and a
+freed slot goes to the waiting submission of the highest priority class
+whose class is below its own quota. Within a class, the user whose jobs
+of that class in flight take the least device time goes first, and each
+user's submissions keep their order. Backends give the estimated runtime
+of every payload as its cost, see ``aqt_runtime``.
+
+Since the gateway runs jobs in the order it receives them, keeping its
+queue short lets interactive jobs overtake a large sweep:
+
+.. code-block:: python
+
+    scheduler = JobScheduler(max_in_flight=4,
+                             classes=[('interactive', None), ('batch', 3)])
+    aqt = AQTProvider('MY_TOKEN', scheduler=scheduler)
+    backend = aqt.get_backend('aqt_qasm_simulator')
+
+    # sweep threads
+    backend.run(circuit, priority='batch', user='sweep')
+    # notebook
+    backend.run(circuit, priority='interactive', user='alice')
+
+Jobs hold their slot until their end is observed. The provider's
+``watcher`` polls them in the background for that, so callers may submit
+more jobs than there are slots before waiting for any.
+"""
+
+import itertools
+import threading
+
+from qiskit.exceptions import QiskitError
+
+DEFAULT_CLASSES = (('interactive', None), ('batch', None))
+
+
+class _Request:
+    __slots__ = ('seq', 'priority', 'user')
+
+    def __init__(self, seq, priority, user):
+        self.seq = seq
+        self.priority = priority
+        self.user = user
+
+
+class Ticket:
+    """The slot of one submitted job, see ``JobScheduler.acquire``.
+
+    Attributes:
+        priority (str): The priority class of the job.
+        user (str): The user the job was submitted for.
+        cost (float): The cost of the job, e.g. its estimated runtime.
+    """
+
+    __slots__ = ('priority', 'user', 'cost', '_scheduler', '_released')
+
+    def __init__(self, scheduler, priority, user, cost):
+        self.priority = priority
+        self.user = user
+        self.cost = cost
+        self._scheduler = scheduler
+        self._released = False
+
+    def release(self):
+        """Give the slot back. Further calls do nothing."""
+        self._scheduler._release(self)
+
+
+class JobScheduler:
+    """Hands out submission slots by priority class and user.
+
+    Attributes:
+        max_in_flight (int): Largest number of jobs in flight in total.
+        classes (list[str]): The priority classes, highest first.
+        default_priority (str): Class of submissions that name none.
+    """
+
+    def __init__(self, max_in_flight=8, classes=DEFAULT_CLASSES,
+                 default_priority=None):
+        """Create a scheduler.
+
+        Parameters:
+            max_in_flight (int): Largest number of jobs in flight in total.
+            classes (list[tuple]): ``(name, quota)`` per priority class,
+                highest priority first. The quota is the largest number of
+                jobs of the class in flight, ``None`` is only limited by
+                ``max_in_flight``.
+            default_priority (str): Class of submissions that name none,
+                the lowest class by default.
+
+        Raises:
+            ValueError: If no classes or an unknown default are given.
+        """
+        if not classes:
+            raise ValueError('At least one priority class is required')
+        self.max_in_flight = max_in_flight
+        self.classes = [name for name, _ in classes]
+        self._quotas = dict(classes)
+        if default_priority is None:
+            default_priority = self.classes[-1]
+        if default_priority not in self._quotas:
+            raise ValueError("Unknown priority class '%s'" % default_priority)
+        self.default_priority = default_priority
+        self._in_flight = {name: {} for name in self.classes}
+        self._waiting = []
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+
+    def _class_load(self, priority):
+        return sum(jobs for jobs, _ in self._in_flight[priority].values())
+
+    def _next(self):
+        """Return the waiting request that gets the next free slot."""
+        if sum(map(self._class_load, self.classes)) >= self.max_in_flight:
+            return None
+        for priority in self.classes:
+            quota = self._quotas[priority]
+            if quota is not None and self._class_load(priority) >= quota:
+                continue
+            candidates = [request for request in self._waiting
+                          if request.priority == priority]
+            if candidates:
+                users = self._in_flight[priority]
+                return min(candidates, key=lambda request: (
+                    users.get(request.user, (0, 0.0))[1], request.seq))
+        return None
+
+    def acquire(self, priority=None, user=None, timeout=None, cost=1.0):
+        """Wait for a slot.
+
+        Parameters:
+            priority (str): The priority class, ``default_priority`` if
+                ``None``.
+            user (str): The user submitting, for fair sharing within the
+                class.
+            timeout (float): Seconds to wait, ``None`` waits forever.
+            cost (float): Share of the user's fair share the job takes up
+                while in flight, e.g. its estimated runtime.
+
+        Returns:
+            Ticket: The slot, to be released once the job has ended.
+
+        Raises:
+            ValueError: If the priority class is unknown.
+            QiskitError: If no slot was given within ``timeout``.
+        """
+        if priority is None:
+            priority = self.default_priority
+        if priority not in self._quotas:
+            raise ValueError("Unknown priority class '%s'" % priority)
+        with self._condition:
+            request = _Request(next(self._seq), priority, user)
+            self._waiting.append(request)
+            try:
+                if not self._condition.wait_for(
+                        lambda: self._next() is request, timeout):
+                    raise QiskitError('No scheduler slot became free')
+            finally:
+                self._waiting.remove(request)
+                # the next request may be admitted now, or instead of this one
+                self._condition.notify_all()
+            users = self._in_flight[priority]
+            jobs, total = users.get(user, (0, 0.0))
+            users[user] = (jobs + 1, total + cost)
+            return Ticket(self, priority, user, cost)
+
+    def _release(self, ticket):
+        with self._condition:
+            if ticket._released:
+                return
+            ticket._released = True
+            users = self._in_flight[ticket.priority]
+            jobs, total = users[ticket.user]
+            if jobs == 1:
+                del users[ticket.user]
+            else:
+                users[ticket.user] = (jobs - 1, total - ticket.cost)
+            self._condition.notify_all()
+
+    def stats(self):
+        """Return the state of every priority class.
+
+        Returns:
+            dict: Maps class names to dicts with ``in_flight``, ``waiting``,
+            ``quota``, ``users``, the jobs in flight per user, and ``cost``,
+            their total cost per user.
+        """
+        with self._condition:
+            return {priority: self._class_stats(priority)
+                    for priority in self.classes}
+
+    def _class_stats(self, priority):
+        users = self._in_flight[priority]
+        return {'in_flight': self._class_load(priority),
+                'waiting': sum(request.priority == priority
+                               for request in self._waiting),
+                'quota': self._quotas[priority],
+                'users': {user: jobs for user, (jobs, _) in users.items()},
+                'cost': {user: total for user, (_, total) in users.items()}}
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""On-disk storage of the samples of large sweeps.
+
+A store is a directory of NPY shards holding the samples of many
+experiments back to back, and an ``experiments.jsonl`` file with one line
+of metadata per experiment: its name, job id, backend, classical bit
+mapping, parameters and location in the shards. A ``SampleWriter`` fills
+shards of ``shard_size`` samples and writes the metadata of their
+experiments once a shard is on disk, so readers only ever see complete
+experiments.
+
+A ``SampleReader`` only parses the metadata. The shards are memory mapped
+on first use and the samples of an experiment are a view into them, so
+analysis can start right away and only reads the pages it touches.
+
+.. code-block:: python
+
+    with SampleWriter('sweep') as writer:
+        run_and_collect(backend, runs, writer=writer)
+
+    reader = SampleReader('sweep')
+    for metadata, samples in reader:
+        ...
+"""
+
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from .aqt_result import int_counts
+
+METADATA_FILE = 'experiments.jsonl'
+_SHARD = 'samples-%05d.npy'
+_SHARD_PATTERN = re.compile(r'^samples-(\d+)\.npy$')
+
+
+class SampleWriter:
+    """Appends the samples of experiments to a store.
+
+    A writer may be shared by threads. Writing to a directory that already
+    holds a store adds new shards after the existing ones.
+
+    Attributes:
+        path (str): The store directory.
+        shard_size (int): Samples after which a shard is written.
+    """
+
+    def __init__(self, path, shard_size=1 << 22):
+        """Open a store for writing, creating its directory if needed.
+
+        Parameters:
+            path (str): The store directory.
+            shard_size (int): Samples after which a shard is written.
+        """
+        self.path = path
+        self.shard_size = shard_size
+        os.makedirs(path, exist_ok=True)
+        shards = [int(match.group(1)) for match in
+                  map(_SHARD_PATTERN.match, os.listdir(path)) if match]
+        self._shard = max(shards, default=-1) + 1
+        self._chunks = []
+        self._pending = []
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def write_samples(self, samples, name=None, job_id=None, backend=None,
+                      memory_mapping=None, num_clbits=None, parameters=None):
+        """Add the samples of one experiment.
+
+        Parameters:
+            samples (numpy.ndarray): One integer outcome per shot.
+            name (str): Experiment name.
+            job_id (str): ID of the job that ran the experiment.
+            backend (str): Name of the backend.
+            memory_mapping (dict): The classical bit of every measured
+                qubit.
+            num_clbits (int): Number of classical bits of the outcomes.
+            parameters (dict): Parameters of the experiment, e.g. the
+                values bound to the circuit. Must be JSON serializable.
+        """
+        samples = np.asarray(samples, dtype=np.int64)
+        metadata = {
+            'name': name, 'job_id': job_id, 'backend': backend,
+            'num_clbits': num_clbits, 'shots': len(samples),
+            'memory_mapping': sorted((memory_mapping or {}).items()),
+            'parameters': parameters or {}}
+        with self._lock:
+            metadata['start'] = self._size
+            self._chunks.append(samples)
+            self._pending.append(metadata)
+            self._size += len(samples)
+            if self._size >= self.shard_size:
+                self._flush()
+
+    def write(self, job, parameters=None, timeout=None, wait=5):
+        """Wait for a job and add the samples of its experiment.
+
+        Parameters:
+            job (AQTJob): The job.
+            parameters (dict): Parameters of the experiment, see
+                ``write_samples``.
+            timeout (float): Timeout waiting for the result.
+            wait (float): Wait time between result polls.
+        """
+        result = job.result(timeout, wait)
+        header = result.results[0].header
+        self.write_samples(result.get_samples(), name=header.name,
+                           job_id=job.job_id(),
+                           backend=job.backend().name(),
+                           memory_mapping=job.memory_mapping,
+                           num_clbits=header.memory_slots,
+                           parameters=parameters)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        path = os.path.join(self.path, _SHARD % self._shard)
+        np.save(path, np.concatenate(self._chunks))
+        with open(os.path.join(self.path, METADATA_FILE), 'a') as out:
+            for metadata in self._pending:
+                metadata['shard'] = self._shard
+                metadata['stop'] = metadata['start'] + metadata['shots']
+                out.write(json.dumps(metadata) + '\n')
+        self._shard += 1
+        self._chunks = []
+        self._pending = []
+        self._size = 0
+
+    def flush(self):
+        """Write the buffered samples as a shard, even if it is not full."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Flush the writer."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SampleReader:
+    """Reads a store written by ``SampleWriter``, see the module
+    documentation.
+
+    Attributes:
+        path (str): The store directory.
+        experiments (list[dict]): The metadata of every experiment.
+    """
+
+    def __init__(self, path):
+        """Open a store.
+
+        Parameters:
+            path (str): The store directory.
+        """
+        self.path = path
+        self.experiments = []
+        with open(os.path.join(path, METADATA_FILE)) as lines:
+            for line in lines:
+                metadata = json.loads(line)
+                metadata['memory_mapping'] = dict(metadata['memory_mapping'])
+                self.experiments.append(metadata)
+        self._shards = {}
+
+    def _shard(self, index):
+        shard = self._shards.get(index)
+        if shard is None:
+            shard = np.load(os.path.join(self.path, _SHARD % index),
+                            mmap_mode='r')
+            self._shards[index] = shard
+        return shard
+
+    def __len__(self):
+        return len(self.experiments)
+
+    def __iter__(self):
+        for index, metadata in enumerate(self.experiments):
+            yield metadata, self.samples(index)
+
+    def samples(self, index):
+        """Return the samples of an experiment without copying them.
+
+        Parameters:
+            index (int): Position of the experiment in ``experiments``.
+
+        Returns:
+            numpy.ndarray: A read-only view into the memory mapped shard.
+        """
+        metadata = self.experiments[index]
+        return self._shard(metadata['shard'])[metadata['start']:
+                                              metadata['stop']]
+
+    def int_counts(self, index):
+        """Count the outcomes of an experiment.
+
+        Parameters:
+            index (int): Position of the experiment in ``experiments``.
+
+        Returns:
+            dict: Counts keyed by integer outcome.
+        """
+        return int_counts(self.samples(index))
+
+    def find(self, **fields):
+        """Return the positions of the experiments matching all fields.
+
+        Fields are compared with the metadata, or with the parameters for
+        keys that are not metadata, e.g. ``find(name='ramsey', delay=5)``.
+
+        Returns:
+            list[int]: Positions in ``experiments``.
+        """
+        def matches(metadata):
+            return all(metadata[key] == value if key in metadata
+                       else metadata['parameters'].get(key) == value
+                       for key, value in fields.items())
+        return [index for index, metadata in enumerate(self.experiments)
+                if matches(metadata)]
+
+    def column(self, key):
+        """Return one metadata field or parameter of every experiment.
+
+        Parameters:
+            key (str): Metadata field or parameter name.
+
+        Returns:
+            list: One value per experiment, ``None`` where it is missing.
+        """
+        return [metadata[key] if key in metadata
+                else metadata['parameters'].get(key)
+                for metadata in self.experiments]
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Spreading jobs over several AQT access tokens."""
+
+import threading
+import time
+
+from qiskit.exceptions import QiskitError
+
+STRATEGIES = ('least_loaded', 'round_robin')
+
+
+class _TokenState:
+    __slots__ = ('token', 'limit', 'in_flight', 'failures', 'blocked_until')
+
+    def __init__(self, token, limit):
+        self.token = token
+        self.limit = limit
+        self.in_flight = 0
+        self.failures = 0
+        self.blocked_until = 0.0
+
+    def load(self):
+        if self.limit is None:
+            return float(self.in_flight)
+        return self.in_flight / self.limit
+
+
+class TokenPool:
+    """Hands out access tokens for job submissions.
+
+    Every submission takes a slot of a token, which is given back once the
+    job has ended. A token with ``max_failures`` failures in a row, e.g.
+    rejected submissions or jobs ending in an error, is left out for
+    ``cooldown`` seconds; a success resets its failure count. Tokens at
+    their concurrency limit are skipped, and ``acquire`` waits if all of
+    them are.
+
+    Attributes:
+        strategy (str): ``'least_loaded'`` picks the token with the lowest
+            share of its limit in use, ``'round_robin'`` cycles through the
+            tokens.
+    """
+
+    def __init__(self, tokens, strategy='least_loaded', max_in_flight=None,
+                 max_failures=3, cooldown=60.0):
+        """Create a pool.
+
+        Parameters:
+            tokens (list[str]): The access tokens.
+            strategy (str): Selection strategy, one of ``STRATEGIES``.
+            max_in_flight (int or dict): Concurrent jobs allowed per token,
+                for all tokens or keyed by token. ``None`` is unlimited.
+            max_failures (int): Consecutive failures before a cooldown.
+            cooldown (float): Seconds an unhealthy token is left out.
+
+        Raises:
+            ValueError: If no tokens or an unknown strategy are given.
+        """
+        if not tokens:
+            raise ValueError('At least one access token is required')
+        if strategy not in STRATEGIES:
+            raise ValueError("Unknown token selection strategy '%s'" %
+                             strategy)
+        self.strategy = strategy
+        self._max_failures = max_failures
+        self._cooldown = cooldown
+        self._states = []
+        for token in tokens:
+            limit = (max_in_flight.get(token) if isinstance(max_in_flight, dict)
+                     else max_in_flight)
+            self._states.append(_TokenState(token, limit))
+        self._by_token = {state.token: state for state in self._states}
+        self._next = 0
+        self._condition = threading.Condition()
+
+    @property
+    def tokens(self):
+        """list[str]: The tokens of the pool."""
+        return [state.token for state in self._states]
+
+    def _candidates(self):
+        free = [state for state in self._states
+                if state.limit is None or state.in_flight < state.limit]
+        now = time.time()
+        healthy = [state for state in free if state.blocked_until <= now]
+        if healthy:
+            return healthy
+        # all free tokens are cooling down, use the one recovering first
+        return sorted(free, key=lambda state: state.blocked_until)[:1]
+
+    def acquire(self, timeout=None):
+        """Take a slot of the best available token.
+
+        Parameters:
+            timeout (float): Seconds to wait for a free slot, ``None`` waits
+                forever.
+
+        Returns:
+            str: The token.
+
+        Raises:
+            QiskitError: If no slot became free within ``timeout``.
+        """
+        with self._condition:
+            if not self._condition.wait_for(self._candidates, timeout):
+                raise QiskitError('All access tokens are at their limit of '
+                                  'concurrent jobs')
+            candidates = self._candidates()
+            if self.strategy == 'round_robin':
+                order = {id(state): (index - self._next) % len(self._states)
+                         for index, state in enumerate(self._states)}
+                state = min(candidates, key=lambda cand: order[id(cand)])
+                self._next = (self._states.index(state) + 1) % len(self._states)
+            else:
+                state = min(candidates, key=_TokenState.load)
+            state.in_flight += 1
+            return state.token
+
+    def release(self, token, failed=False):
+        """Give back the slot of an ended job.
+
+        Parameters:
+            token (str): The token the job was submitted with.
+            failed (bool): Whether the submission or the job failed.
+        """
+        with self._condition:
+            state = self._by_token.get(token)
+            if state is None:
+                return
+            state.in_flight = max(state.in_flight - 1, 0)
+            if failed:
+                state.failures += 1
+                if state.failures >= self._max_failures:
+                    state.blocked_until = time.time() + self._cooldown
+            else:
+                state.failures = 0
+                state.blocked_until = 0.0
+            self._condition.notify_all()
+
+    def stats(self):
+        """Return the state of every token.
+
+        Returns:
+            dict: Maps tokens to dicts with ``in_flight``, ``limit``,
+            ``failures`` and ``healthy``.
+        """
+        now = time.time()
+        with self._condition:
+            return {state.token: {'in_flight': state.in_flight,
+                                  'limit': state.limit,
+                                  'failures': state.failures,
+                                  'healthy': state.blocked_until <= now}
+                    for state in self._states}
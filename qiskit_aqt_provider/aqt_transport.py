@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""HTTP transports, encoding of request bodies and decoding of responses.
+
+All requests to the gateway go through the ``transport`` of the provider.
+Besides the default ``Transport``, which talks to the network, the
+``RecordingTransport`` saves every exchange with its timing to a cassette
+file, and the ``ReplayTransport`` plays a cassette back offline at the
+original or an accelerated speed. Replays give reproducible end-to-end
+benchmarks of submission and polling.
+"""
+
+import base64
+import gzip
+import json
+import threading
+import time
+from collections import deque
+from urllib.parse import urlencode
+
+import numpy as np
+import requests
+
+CHUNK_SIZE = 64 * 1024
+
+_SAMPLES_KEY = b'"samples"'
+_WHITESPACE = b' \t\r\n'
+
+
+def encode_payload(aqt_json, compress=False):
+    """Encode a payload dict for submission to the gateway.
+
+    Parameters:
+        aqt_json (dict): Payload as produced by ``circuit_to_aqt``.
+        compress (bool): Gzip the form encoded body.
+
+    Returns:
+        tuple: ``(data, headers)`` to pass on to the HTTP request. Without
+        compression ``data`` is the payload dict itself and ``headers`` is
+        empty.
+    """
+    if not compress:
+        return aqt_json, {}
+    body = gzip.compress(urlencode(aqt_json).encode('utf-8'))
+    headers = {'Content-Type': 'application/x-www-form-urlencoded',
+               'Content-Encoding': 'gzip'}
+    return body, headers
+
+
+class SamplesParser:
+    """Incremental parser for AQT result bodies.
+
+    The ``samples`` list is decoded chunk by chunk straight into integer
+    arrays, so the body never has to be held as text or as a list of Python
+    ints. Everything else in the body is small and handed to ``json``.
+    """
+
+    def __init__(self):
+        self._head = bytearray()
+        self._scanned = 0
+        self._state = 'head'
+        self._carry = b''
+        self._chunks = []
+
+    def feed(self, chunk):
+        """Consume the next chunk of the response body.
+
+        Parameters:
+            chunk (bytes): Raw (decompressed) body bytes.
+        """
+        if self._state == 'head':
+            self._head += chunk
+            chunk = self._find_samples()
+            if chunk is None:
+                return
+        if self._state == 'samples':
+            end = chunk.find(b']')
+            if end < 0:
+                self._parse(self._carry + chunk, final=False)
+                return
+            self._parse(self._carry + chunk[:end], final=True)
+            self._carry = b''
+            self._state = 'tail'
+            self._head += chunk[end:]
+            return
+        self._head += chunk
+
+    def _find_samples(self):
+        while True:
+            start = self._head.find(_SAMPLES_KEY, self._scanned)
+            if start < 0:
+                self._scanned = max(0, len(self._head) - len(_SAMPLES_KEY) + 1)
+                return None
+            pos = start + len(_SAMPLES_KEY)
+            for expected in (b':', b'['):
+                while pos < len(self._head) and self._head[pos] in _WHITESPACE:
+                    pos += 1
+                if pos >= len(self._head) or self._head[pos:pos + 1] != expected:
+                    break
+                pos += 1
+            else:
+                rest = bytes(self._head[pos:])
+                del self._head[pos:]
+                self._state = 'samples'
+                return rest
+            if pos >= len(self._head):
+                # wait for more data before deciding on this key
+                self._scanned = start
+                return None
+            self._scanned = start + 1
+
+    def _parse(self, data, final):
+        if not final:
+            cut = data.rfind(b',')
+            self._carry = data[cut + 1:]
+            data = data[:cut + 1]
+        if not data.strip(_WHITESPACE):
+            return
+        # text mode fromstring parses in C, far faster than int() per item,
+        # but stops silently at bad input, hence the length check
+        values = np.fromstring(data.decode('ascii'), dtype=np.int64, sep=',')
+        expected = data.count(b',') + (not data.rstrip(_WHITESPACE).endswith(b','))
+        if len(values) != expected:
+            raise ValueError('Malformed samples in response body')
+        self._chunks.append(values)
+
+    def close(self):
+        """Finish parsing and return the decoded body.
+
+        Returns:
+            dict: The response body. If present, ``samples`` is a
+            ``numpy.ndarray`` of integers.
+
+        Raises:
+            ValueError: If the body ends inside the ``samples`` list.
+        """
+        if self._state == 'samples':
+            raise ValueError('Truncated samples in response body')
+        body = json.loads(self._head.decode('utf-8'))
+        if self._state == 'tail':
+            if self._chunks:
+                body['samples'] = np.concatenate(self._chunks)
+            else:
+                body['samples'] = np.zeros(0, dtype=np.int64)
+        return body
+
+
+def read_result(response, chunk_size=CHUNK_SIZE):
+    """Decode a (streamed) gateway response.
+
+    Parameters:
+        response (requests.Response): Response, ideally requested with
+            ``stream=True``.
+        chunk_size (int): Number of bytes to read at a time.
+
+    Returns:
+        dict: The response body, see ``SamplesParser.close``.
+    """
+    parser = SamplesParser()
+    for chunk in response.iter_content(chunk_size):
+        parser.feed(chunk)
+    return parser.close()
+
+
+class Transport:
+    """Sends requests to the gateway with ``requests``.
+
+    Every thread uses a ``requests.Session`` of its own, so connections
+    are kept open between requests without being shared across threads.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def put(self, url, data=None, headers=None, stream=False):
+        """Send a PUT request.
+
+        Parameters:
+            url (str): The URL.
+            data (dict or bytes): Form data or an encoded body.
+            headers (dict): Request headers.
+            stream (bool): Do not download the body right away.
+
+        Returns:
+            requests.Response: The response.
+        """
+        return self._session().put(url, data=data, headers=headers,
+                                   stream=stream)
+
+
+_DEFAULT_TRANSPORT = Transport()
+
+
+def get_transport(provider):
+    """Return the transport of a provider.
+
+    Parameters:
+        provider (AQTProvider): The provider, may be ``None``.
+
+    Returns:
+        Transport: The provider's transport, or the default one.
+    """
+    return getattr(provider, 'transport', None) or _DEFAULT_TRANSPORT
+
+
+class ReplayedResponse:
+    """A response read from a cassette, with the parts of the
+    ``requests.Response`` interface used by the provider.
+
+    Attributes:
+        status_code (int): The HTTP status code.
+        headers (dict): The response headers.
+        content (bytes): The body.
+    """
+
+    def __init__(self, status_code, headers, content, url=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self):
+        """str: The body as text."""
+        return self.content.decode('utf-8')
+
+    def json(self):
+        """Return the decoded JSON body."""
+        return json.loads(self.content.decode('utf-8'))
+
+    def iter_content(self, chunk_size=1):
+        """Iterate over the body in chunks of ``chunk_size`` bytes."""
+        return (self.content[start:start + chunk_size]
+                for start in range(0, len(self.content), chunk_size))
+
+    def raise_for_status(self):
+        """Raise ``requests.HTTPError`` for error status codes."""
+        if self.status_code >= 400:
+            raise requests.HTTPError('%d Error for url: %s' %
+                                     (self.status_code, self.url),
+                                     response=self)
+
+
+_SECRET_FIELDS = ('access_token', 'Ocp-Apim-Subscription-Key')
+
+
+def _interaction_key(url, data):
+    """Match polls by job id and submissions by their order."""
+    if isinstance(data, dict) and 'id' in data:
+        return '%s poll %s' % (url, data['id'])
+    return '%s submit' % url
+
+
+class RecordingTransport(Transport):
+    """Records every exchange of another transport to a cassette.
+
+    Access tokens are not written to the cassette. Call ``save()``, or use
+    the transport as a context manager, to write the file.
+
+    Typical usage is:
+
+    .. code-block:: python
+
+        with RecordingTransport('run.json') as transport:
+            aqt = AQTProvider('MY_TOKEN', transport=transport)
+            ...
+    """
+
+    def __init__(self, path, transport=None):
+        """Create a recorder.
+
+        Parameters:
+            path (str): The cassette file to write.
+            transport (Transport): The transport to record, the default
+                network transport if ``None``.
+        """
+        self.path = path
+        self._transport = transport or _DEFAULT_TRANSPORT
+        self._interactions = []
+        self._lock = threading.Lock()
+        self._start = time.time()
+
+    def put(self, url, data=None, headers=None, stream=False):
+        start = time.time()
+        counter = time.perf_counter()
+        response = self._transport.put(url, data=data, headers=headers,
+                                       stream=stream)
+        content = response.content
+        duration = time.perf_counter() - counter
+        interaction = {
+            'key': _interaction_key(url, data),
+            'offset': start - self._start,
+            'duration': duration,
+            'status': response.status_code,
+            'headers': {key: value for key, value in response.headers.items()
+                        if key.lower() not in ('content-encoding',
+                                               'transfer-encoding')},
+            'body': base64.b64encode(content).decode('ascii'),
+        }
+        if isinstance(data, dict):
+            interaction['request'] = {key: value for key, value in data.items()
+                                      if key not in _SECRET_FIELDS}
+        with self._lock:
+            self._interactions.append(interaction)
+        return ReplayedResponse(response.status_code, interaction['headers'],
+                                content, url)
+
+    def save(self):
+        """Write the recorded exchanges to the cassette file."""
+        with self._lock:
+            interactions = list(self._interactions)
+        with open(self.path, 'w') as cassette:
+            json.dump({'version': 1, 'interactions': interactions}, cassette)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.save()
+
+
+class ReplayTransport(Transport):
+    """Plays back a cassette written by ``RecordingTransport``.
+
+    Submissions are answered in their recorded order and polls in the
+    recorded order of their job id, so a replay sees the same sequence of
+    job states as the recording. Each response is delayed by its recorded
+    duration divided by ``speed``.
+    """
+
+    def __init__(self, path, speed=1.0):
+        """Load a cassette.
+
+        Parameters:
+            path (str): The cassette file.
+            speed (float): Replay speed factor; ``None`` answers without
+                delay.
+        """
+        with open(path) as cassette:
+            interactions = json.load(cassette)['interactions']
+        self.speed = speed
+        self._queues = {}
+        for interaction in interactions:
+            self._queues.setdefault(interaction['key'],
+                                    deque()).append(interaction)
+        self._lock = threading.Lock()
+
+    def put(self, url, data=None, headers=None, stream=False):
+        """Return the next recorded response for this request.
+
+        Raises:
+            LookupError: If the cassette has no further matching response.
+        """
+        key = _interaction_key(url, data)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                raise LookupError('No recorded response left for %s' % key)
+            interaction = queue.popleft()
+        if self.speed:
+            time.sleep(interaction['duration'] / self.speed)
+        return ReplayedResponse(interaction['status'], interaction['headers'],
+                                base64.b64decode(interaction['body']), url)
+
+    def remaining(self):
+        """Return the number of recorded responses not played yet."""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
@@ -16,14 +16,18 @@ import json
 
 from numpy import pi
 
+from .aqt_ops import ops_from_columns, ops_to_json
 
-def _experiment_to_seq(circuit):
+
+def _experiment_to_columns(circuit):
     count = 0
     qubit_map = {}
     for bit in circuit.qubits:
         qubit_map[bit] = count
         count += 1
-    ops = []
+    names = []
+    exponents = []
+    qubit_lists = []
     meas = 0
     for instruction in circuit.data:
         inst = instruction[0]
@@ -45,17 +49,28 @@ def _experiment_to_seq(circuit):
         else:
             raise Exception("Operation '%s' outside of basis rx, ry, rxx" %
                             inst.name)
-        exponent = inst.params[0] / pi
+        exponent = float(inst.params[0] / pi)
         # hack: split X into X**0.5 . X**0.5
         if name == 'X' and exponent == 1.0:
-            ops.append((name, float(0.5), qubits))
-            ops.append((name, float(0.5), qubits))
-        else:
-            # (op name, exponent, [qubit index])
-            ops.append((name, float(exponent), qubits))
+            names.append(name)
+            exponents.append(0.5)
+            qubit_lists.append(qubits)
+            exponent = 0.5
+        # (op name, exponent, [qubit index])
+        names.append(name)
+        exponents.append(exponent)
+        qubit_lists.append(qubits)
     if not meas:
         raise ValueError('Circuit must have at least one measurements.')
-    return json.dumps(ops)
+    return names, exponents, qubit_lists
+
+
+def _experiment_to_ops(circuit):
+    return ops_from_columns(*_experiment_to_columns(circuit))
+
+
+def _experiment_to_seq(circuit):
+    return json.dumps(list(zip(*_experiment_to_columns(circuit))))
 
 
 def circuit_to_aqt(circuits, access_token, shots=100):
@@ -85,3 +100,23 @@ def circuit_to_aqt(circuits, access_token, shots=100):
     }
     out_json.append(out_dict)
     return out_json
+
+
+def ops_to_aqt(ops, num_qubits, access_token, shots=100):
+    """Return the json payload of an operation array.
+
+    Parameters:
+        ops (numpy.ndarray): Operations, see ``aqt_ops.OP_DTYPE``.
+        num_qubits (int): Number of qubits of the experiment.
+        access_token (str): The AQT access token.
+        shots (int): Number of repetitions.
+
+    Returns:
+        dict: The payload, as in ``circuit_to_aqt``.
+    """
+    return {
+        'data': ops_to_json(ops),
+        'access_token': access_token,
+        'repetitions': shots,
+        'no_qubits': num_qubits,
+    }
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Direct translation of OpenQASM 2 programs into AQT operations.
+
+Programs written in the AQT basis, i.e. ``rx``, ``ry``, ``rxx`` and ``ms``
+gates, ``measure`` and ``barrier``, are read statement by statement into an
+operation array and a measurement map, without building a
+``QuantumCircuit``. Anything else raises ``UnsupportedQasm``, upon which
+``AQTBackend.run_qasm`` falls back to ``QuantumCircuit.from_qasm_str`` and
+``transpile``.
+"""
+
+import ast
+import operator
+import re
+from collections import namedtuple
+
+from numpy import pi
+
+from .aqt_ops import ops_from_columns
+
+NativeProgram = namedtuple('NativeProgram', ['ops', 'num_qubits',
+                                             'num_clbits', 'measure_map'])
+NativeProgram.__doc__ = """A program translated by ``parse_qasm``.
+
+Attributes:
+    ops (numpy.ndarray): The operations, see ``aqt_ops.OP_DTYPE``.
+    num_qubits (int): Total size of the quantum registers.
+    num_clbits (int): Total size of the classical registers.
+    measure_map (dict): The classical bit of every measured qubit.
+"""
+
+
+class UnsupportedQasm(ValueError):
+    """The program uses a construct the direct translation does not cover."""
+
+
+_REGISTER = re.compile(r'^(qreg|creg)\s+(\w+)\s*\[\s*(\d+)\s*\]$')
+_GATE = re.compile(r'^(rx|ry|rxx|ms)\s*\((.*)\)\s*(.+)$')
+_MEASURE = re.compile(r'^measure\s+(.+?)\s*->\s*(.+)$')
+_ARGUMENT = re.compile(r'^(\w+)\s*(?:\[\s*(\d+)\s*\])?$')
+
+_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub,
+              ast.Mult: operator.mul, ast.Div: operator.truediv,
+              ast.Pow: operator.pow, ast.USub: operator.neg,
+              ast.UAdd: operator.pos}
+
+
+def _evaluate(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return float(node.value)
+    if isinstance(node, ast.Name) and node.id == 'pi':
+        return pi
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_evaluate(node.left),
+                                         _evaluate(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_evaluate(node.operand))
+    raise UnsupportedQasm('Unsupported angle expression')
+
+
+def _angle(expression):
+    try:
+        tree = ast.parse(expression.replace('^', '**'), mode='eval')
+    except SyntaxError:
+        raise UnsupportedQasm("Cannot read angle '%s'" % expression)
+    return _evaluate(tree.body)
+
+
+def _statements(source):
+    """Yield the statements of a program, without comments."""
+    if isinstance(source, str):
+        source = source.splitlines()
+    pending = ''
+    for line in source:
+        pending += ' ' + line.split('//', 1)[0]
+        *statements, pending = pending.split(';')
+        for statement in statements:
+            statement = ' '.join(statement.split())
+            if statement:
+                yield statement
+    if pending.strip():
+        raise ValueError("Missing ';' after '%s'" % pending.strip())
+
+
+def parse_qasm(source):
+    """Translate an OpenQASM 2 program written in the AQT basis.
+
+    Registers are laid out in the order of their declaration, as in
+    ``QuantumCircuit.from_qasm_str``.
+
+    Parameters:
+        source (str or iterable): The program, or its lines, e.g. an open
+            file.
+
+    Returns:
+        NativeProgram: The translated program.
+
+    Raises:
+        UnsupportedQasm: If the program uses other gates or statements.
+        ValueError: If the program is malformed or measures nothing.
+    """
+    registers = {'qreg': {}, 'creg': {}}
+    sizes = {'qreg': 0, 'creg': 0}
+    names, exponents, qubit_lists = [], [], []
+    measure_map = {}
+
+    def bits(argument, kind):
+        match = _ARGUMENT.match(argument.strip())
+        if match is None or match.group(1) not in registers[kind]:
+            raise ValueError("Unknown %s '%s'" % (kind, argument.strip()))
+        offset, size = registers[kind][match.group(1)]
+        if match.group(2) is None:
+            return list(range(offset, offset + size))
+        index = int(match.group(2))
+        if index >= size:
+            raise ValueError("Index out of range in '%s'" % argument.strip())
+        return [offset + index]
+
+    for statement in _statements(source):
+        if statement.startswith(('OPENQASM', 'include')):
+            continue
+        match = _REGISTER.match(statement)
+        if match:
+            kind, name, size = match.group(1), match.group(2), int(
+                match.group(3))
+            registers[kind][name] = (sizes[kind], size)
+            sizes[kind] += size
+            continue
+        match = _GATE.match(statement)
+        if match:
+            gate = match.group(1)
+            exponent = _angle(match.group(2)) / pi
+            arguments = [bits(argument, 'qreg')
+                         for argument in match.group(3).split(',')]
+            if gate == 'ms':
+                names.append('MS')
+                exponents.append(exponent)
+                qubit_lists.append([])
+            elif gate == 'rxx':
+                if len(arguments) != 2 or \
+                        len(arguments[0]) != 1 or len(arguments[1]) != 1:
+                    raise UnsupportedQasm('rxx on whole registers')
+                names.append('MS')
+                exponents.append(exponent)
+                qubit_lists.append(arguments[0] + arguments[1])
+            else:
+                if len(arguments) != 1:
+                    raise ValueError("'%s' takes one qubit" % gate)
+                name = 'X' if gate == 'rx' else 'Y'
+                # as in circuit_to_aqt: X(1) is sent as two X(0.5)
+                parts = [0.5, 0.5] if name == 'X' and exponent == 1.0 \
+                    else [exponent]
+                for qubit in arguments[0]:
+                    names.extend([name] * len(parts))
+                    exponents.extend(parts)
+                    qubit_lists.extend([[qubit]] * len(parts))
+            continue
+        match = _MEASURE.match(statement)
+        if match:
+            qubits = bits(match.group(1), 'qreg')
+            clbits = bits(match.group(2), 'creg')
+            if len(qubits) != len(clbits):
+                raise ValueError("Register sizes differ in '%s'" % statement)
+            measure_map.update(zip(qubits, clbits))
+            continue
+        if statement.startswith('barrier'):
+            continue
+        raise UnsupportedQasm("Unsupported statement '%s'" % statement)
+    if not measure_map:
+        raise ValueError('Circuit must have at least one measurements.')
+    return NativeProgram(ops_from_columns(names, exponents, qubit_lists),
+                         sizes['qreg'], sizes['creg'], measure_map)
@@ -16,11 +16,16 @@ import json
 
 from numpy import pi
 
+from .aqt_ops import ops_from_columns
 
-def _experiment_to_seq(experiment):
-    ops = []
+
+def _experiment_to_columns(experiment):
+    names = []
+    exponents = []
+    qubit_lists = []
     meas = 0
     for inst in experiment.instructions:
+        qubits = getattr(inst, 'qubits', [])
         if inst.name == 'rx':
             name = 'X'
         elif inst.name == 'ry':
@@ -29,7 +34,7 @@ def _experiment_to_seq(experiment):
             name = 'MS'
         elif inst.name == 'ms':
             name = 'MS'
-            inst.qubits = []
+            qubits = []
         elif inst.name == 'measure':
             meas += 1
             continue
@@ -38,18 +43,28 @@ def _experiment_to_seq(experiment):
         else:
             raise Exception("Operation '%s' outside of basis rx, ry, rxx" %
                             inst.name)
-        exponent = inst.params[0] / pi
-
+        exponent = float(inst.params[0] / pi)
         # hack: split X into X**0.5 . X**0.5
         if name == 'X' and exponent == 1.0:
-            ops.append((name, float(0.5), inst.qubits))
-            ops.append((name, float(0.5), inst.qubits))
-        else:
-            # (op name, exponent, [qubit index])
-            ops.append((name, float(exponent), inst.qubits))
+            names.append(name)
+            exponents.append(0.5)
+            qubit_lists.append(qubits)
+            exponent = 0.5
+        # (op name, exponent, [qubit index])
+        names.append(name)
+        exponents.append(exponent)
+        qubit_lists.append(qubits)
     if not meas:
         raise ValueError('Circuit must have at least one measurements.')
-    return json.dumps(ops)
+    return names, exponents, qubit_lists
+
+
+def _experiment_to_ops(experiment):
+    return ops_from_columns(*_experiment_to_columns(experiment))
+
+
+def _experiment_to_seq(experiment):
+    return json.dumps(list(zip(*_experiment_to_columns(experiment))))
 
 
 def qobj_to_aqt(qobj, access_token):
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Helpers shared by the tests."""
+
+import unittest.mock
+
+import numpy as np
+
+from qiskit import BasicAer, execute
+
+
+def simulated_job(circuit, shots):
+    """A job whose samples come from the BasicAer simulator."""
+    memory = execute(circuit, BasicAer.get_backend('qasm_simulator'),
+                     shots=shots, memory=True, seed_simulator=42
+                     ).result().get_memory()
+    job = unittest.mock.Mock()
+    job.samples.return_value = np.array([int(bits, 2) for bits in memory])
+    job.job_id.return_value = circuit.name
+    return job
+
+
+def simulated_batch(job_factory=simulated_job):
+    """A ``run_batch`` replacement making one job per circuit."""
+    def run_batch(circuits, shots=None, **kwargs):
+        return [job_factory(circuit, circuit_shots)
+                for circuit, circuit_shots in zip(circuits, shots)]
+    return run_batch
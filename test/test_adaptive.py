@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import unittest
+import unittest.mock
+
+from qiskit import QuantumCircuit
+from qiskit.providers import JobError
+from qiskit.providers.jobstatus import JobStatus
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_adaptive import confidence_half_width
+
+
+def _round(counts):
+    job = unittest.mock.Mock()
+    job.job_id.return_value = 'round'
+    job.result.return_value.get_counts.return_value = counts
+    return job
+
+
+class TestAdaptive(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = AQTProvider('foo').get_backend('aqt_qasm_simulator')
+        self.circuit = QuantumCircuit(1, 1)
+        self.circuit.measure(0, 0)
+        self.parity = {'0': 1.0, '1': -1.0}
+
+    def test_half_width(self):
+        estimate, width = confidence_half_width({'0': 150, '1': 50},
+                                                self.parity)
+        self.assertAlmostEqual(0.5, estimate)
+        # 1.96 * sqrt(200 / 199 * 0.75 / 200)
+        self.assertAlmostEqual(0.12033, width, places=4)
+        _, deterministic = confidence_half_width({'0': 200}, self.parity)
+        self.assertEqual(0.0, deterministic)
+        _, width = confidence_half_width({'0': 100, '1': 100})
+        self.assertAlmostEqual(1.96 * 0.5 / 200 ** 0.5, width, places=3)
+
+    def test_stops_at_precision(self):
+        rounds = [_round({'0': 150, '1': 50}) for _ in range(10)]
+        with unittest.mock.patch.object(self.backend, 'run',
+                                        side_effect=rounds) as run:
+            job = self.backend.run_adaptive(self.circuit, 0.05,
+                                            observable=self.parity)
+            self.assertEqual(JobStatus.RUNNING, job.status())
+            result = job.result()
+        # the half width shrinks with 1 / sqrt(rounds): 0.12, 0.085, ...
+        self.assertEqual(6, run.call_count)
+        self.assertEqual(200, run.call_args[1]['shots'])
+        self.assertEqual({'0': 900, '1': 300}, result.get_counts())
+        self.assertLessEqual(job.half_width, 0.05)
+        self.assertAlmostEqual(0.5, job.estimate)
+        self.assertEqual(JobStatus.DONE, job.status())
+
+    def test_shot_budget(self):
+        rounds = [_round({'0': 100, '1': 100}), _round({'0': 25, '1': 25})]
+        with unittest.mock.patch.object(self.backend, 'run',
+                                        side_effect=rounds) as run:
+            job = self.backend.run_adaptive(self.circuit, 0.001,
+                                            max_shots=250)
+            counts = job.result().get_counts()
+        self.assertEqual([200, 50], [call[1]['shots']
+                                     for call in run.call_args_list])
+        self.assertEqual({'0': 125, '1': 125}, counts)
+
+    def test_cancel(self):
+        rounds = [_round({'0': 200})]
+        with unittest.mock.patch.object(self.backend, 'run',
+                                        side_effect=rounds):
+            job = self.backend.run_adaptive(self.circuit, 0.01)
+        job.cancel()
+        rounds[0].cancel.assert_called_once_with()
+        self.assertEqual(JobStatus.CANCELLED, job.status())
+
+    def test_cancel_while_submitting(self):
+        rounds = [_round({'0': 100, '1': 100}), _round({'0': 100, '1': 100})]
+        submitted = iter(rounds)
+
+        def run(*args, **kwargs):
+            job = next(submitted)
+            if job is rounds[1]:
+                # cancel() arrives before the round is recorded
+                adaptive.cancel()
+            return job
+
+        with unittest.mock.patch.object(self.backend, 'run',
+                                        side_effect=run):
+            adaptive = self.backend.run_adaptive(self.circuit, 0.001)
+            self.assertRaises(JobError, adaptive.result)
+        rounds[1].cancel.assert_called_once_with()
+        self.assertEqual(JobStatus.CANCELLED, adaptive.status())
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import json
+import unittest
+
+from numpy import pi
+from qiskit import QuantumCircuit
+
+from qiskit_aqt_provider.aqt_ops import (ops_digest, ops_from_list, ops_to_list,
+                                         ops_to_json)
+from qiskit_aqt_provider.circuit_to_aqt import (_experiment_to_ops,
+                                                _experiment_to_seq)
+
+
+class TestAQTOps(unittest.TestCase):
+
+    def setUp(self):
+        self.seq = [('X', 0.5, [0]), ('Y', 0.25, [1]), ('MS', 0.5, [0, 1]),
+                    ('MS', 0.125, [])]
+
+    def test_round_trip_list(self):
+        ops = ops_from_list(self.seq)
+        self.assertEqual(self.seq, ops_to_list(ops))
+
+    def test_json_matches_json_dumps(self):
+        ops = ops_from_list(self.seq)
+        self.assertEqual(json.dumps(self.seq), ops_to_json(ops))
+        self.assertEqual(json.dumps([]), ops_to_json(ops_from_list([])))
+
+    def test_invalid_operations(self):
+        self.assertRaises(ValueError, ops_from_list, [('Z', 1.0, [0])])
+        self.assertRaises(ValueError, ops_from_list, [('MS', 1.0, [0, 1, 2])])
+
+    def test_circuit_ops(self):
+        qc = QuantumCircuit(2, 2)
+        qc.rx(pi, 0)
+        qc.ry(pi / 2, 1)
+        qc.rxx(pi / 4, 0, 1)
+        qc.measure([0, 1], [0, 1])
+        self.assertEqual([('X', 0.5, [0]), ('X', 0.5, [0]), ('Y', 0.5, [1]),
+                          ('MS', 0.25, [0, 1])],
+                         ops_to_list(_experiment_to_ops(qc)))
+        self.assertEqual(_experiment_to_seq(qc),
+                         ops_to_json(_experiment_to_ops(qc)))
+
+    def test_digest(self):
+        ops = ops_from_list(self.seq)
+        self.assertEqual(ops_digest(ops, 2), ops_digest(ops.copy(), 2))
+        self.assertNotEqual(ops_digest(ops, 2), ops_digest(ops, 3))
+        self.assertNotEqual(ops_digest(ops, 2), ops_digest(ops[:-1], 2))
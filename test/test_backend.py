@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import gzip
+import json
+import unittest
+import unittest.mock
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from numpy import pi
+from qiskit import QuantumCircuit
+from qiskit.circuit import Gate
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.circuit_to_aqt import circuit_to_aqt
+
+
+def _fake_response(body):
+    response = unittest.mock.Mock()
+    encoded = json.dumps(body).encode('utf-8')
+    response.json.return_value = body
+    response.iter_content.side_effect = lambda chunk_size: iter(
+        [encoded[i:i + chunk_size] for i in range(0, len(encoded), chunk_size)])
+    return response
+
+
+class TestBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.provider = AQTProvider('foo')
+        self.backend = self.provider.get_backend('aqt_qasm_simulator')
+        self.circuit = QuantumCircuit(2, 2)
+        self.circuit.rx(pi, 0)
+        self.circuit.measure([0, 1], [1, 0])
+
+    def _put(self, samples=(1, 1, 0)):
+        responses = [_fake_response({'id': 'abc123', 'status': 'queued'}),
+                     _fake_response({'id': 'abc123', 'status': 'queued'}),
+                     _fake_response({'id': 'abc123', 'status': 'finished',
+                                     'samples': list(samples)})]
+        return unittest.mock.patch('requests.Session.put', side_effect=responses)
+
+    def test_compressed_submission(self):
+        with self._put() as put:
+            self.backend.run(self.circuit, shots=3, compress=True)
+        kwargs = put.call_args_list[0][1]
+        self.assertEqual('gzip', kwargs['headers']['Content-Encoding'])
+        self.assertEqual('foo',
+                         kwargs['headers']['Ocp-Apim-Subscription-Key'])
+        payload = parse_qs(gzip.decompress(kwargs['data']).decode('utf-8'))
+        self.assertEqual(['3'], payload['repetitions'])
+        self.assertEqual(['[["X", 0.5, [0]], ["X", 0.5, [0]]]'],
+                         payload['data'])
+
+    def test_uncompressed_submission(self):
+        with self._put() as put:
+            self.backend.run(self.circuit, shots=3)
+        kwargs = put.call_args_list[0][1]
+        self.assertNotIn('Content-Encoding', kwargs['headers'])
+        self.assertEqual(3, kwargs['data']['repetitions'])
+
+    def test_streamed_result(self):
+        with self._put() as put:
+            job = self.backend.run(self.circuit, shots=3)
+            result = job.result(wait=0)
+        for call in put.call_args_list[1:]:
+            self.assertTrue(call[1]['stream'])
+        self.assertIsInstance(result.get_samples(), np.ndarray)
+        # qubit 0 is measured into clbit 1
+        self.assertEqual({'10': 2, '00': 1}, result.get_counts())
+
+    def test_spans_and_timings(self):
+        spans = []
+        self.provider.instrumentation.add_callback(spans.append)
+        with self._put():
+            job = self.backend.run(self.circuit, shots=3)
+            job.result(wait=0)
+        # the first response answers the submission
+        self.assertEqual(['circuit_to_aqt', 'submit', 'poll', 'poll',
+                          'wait_for_result', 'format_counts'],
+                         [span.name for span in spans])
+        self.assertEqual('abc123', spans[1].attributes['job_id'])
+        self.assertEqual(['queued', 'finished'],
+                         [span.attributes['status'] for span in spans[2:4]])
+        self.assertEqual({'circuit_to_aqt', 'submit', 'poll',
+                          'wait_for_result', 'format_counts'},
+                         set(job.timings))
+        self.assertAlmostEqual(sum(span.duration for span in spans[2:4]),
+                               job.timings['poll'])
+
+    def test_failing_callback_keeps_job(self):
+        def broken(span):
+            raise RuntimeError('broken callback')
+
+        self.provider.instrumentation.add_callback(broken)
+        with self._put():
+            with self.assertLogs('qiskit_aqt_provider.aqt_instrumentation',
+                                 level='ERROR'):
+                job = self.backend.run(self.circuit, shots=3)
+        self.assertEqual('abc123', job.job_id())
+
+    def test_metrics_count_each_job_once(self):
+        with self._put():
+            job = self.backend.run(self.circuit, shots=3)
+            job.result(wait=0)
+        with unittest.mock.patch('requests.Session.put', return_value=_fake_response(
+                {'id': 'abc123', 'status': 'finished', 'samples': [0]})):
+            job.result(wait=0)
+        job.cancel()
+        metrics = self.provider.metrics
+        name = self.backend.name()
+        self.assertEqual(1, metrics.jobs_submitted.value(backend=name))
+        self.assertEqual(1, metrics.jobs_finished.value(backend=name))
+        self.assertEqual(0, metrics.jobs_cancelled.value(backend=name))
+        self.assertEqual(0, metrics.jobs_in_flight.value(backend=name))
+
+    def test_batch_runs_identical_circuits_once(self):
+        swapped = QuantumCircuit(2, 2)
+        swapped.rx(pi, 0)
+        swapped.measure([0, 1], [0, 1])
+        other = QuantumCircuit(2, 2)
+        other.ry(pi, 1)
+        other.measure([0, 1], [0, 1])
+        responses = [_fake_response({'id': 'same'}),
+                     _fake_response({'id': 'other'}),
+                     _fake_response({'id': 'same', 'status': 'finished',
+                                     'samples': [1] * 100 + [2] * 50})]
+        with unittest.mock.patch('requests.Session.put',
+                                 side_effect=responses) as put:
+            jobs = self.backend.run_batch([self.circuit, other, swapped],
+                                          shots=[100, 20, 50])
+            first = jobs[0].result(wait=0).get_counts()
+            third = jobs[2].result(wait=0).get_counts()
+        self.assertEqual(['same', 'other', 'same'],
+                         [job.job_id() for job in jobs])
+        self.assertEqual([150, 20], [call[1]['data']['repetitions']
+                                     for call in put.call_args_list[:2]])
+        # one poll serves both circuits of the shared job
+        self.assertEqual(3, put.call_count)
+        self.assertEqual({'10': 100}, first)
+        self.assertEqual({'10': 50}, third)
+        metrics = self.provider.metrics
+        self.assertEqual(2, metrics.jobs_submitted.value(
+            backend=self.backend.name()))
+        self.assertEqual(1, metrics.jobs_finished.value(
+            backend=self.backend.name()))
+
+    def test_batch_respects_max_shots(self):
+        responses = [_fake_response({'id': str(index)}) for index in range(2)]
+        with unittest.mock.patch('requests.Session.put',
+                                 side_effect=responses) as put:
+            jobs = self.backend.run_batch([self.circuit] * 3, shots=100)
+        self.assertEqual([200, 100], [call[1]['data']['repetitions']
+                                      for call in put.call_args_list])
+        self.assertEqual(['0', '0', '1'], [job.job_id() for job in jobs])
+        self.assertEqual(circuit_to_aqt(self.circuit, 'foo', shots=200)[0],
+                         put.call_args_list[0][1]['data'])
+        self.assertRaises(ValueError, self.backend.run_batch,
+                          [self.circuit], shots=201)
+
+    def test_batch_packs_circuits_side_by_side(self):
+        narrow = QuantumCircuit(1, 1)
+        narrow.rx(pi / 2, 0)
+        narrow.measure(0, 0)
+        global_ms = QuantumCircuit(2, 2)
+        global_ms.append(Gate('ms', 2, [pi / 2]), [0, 1])
+        global_ms.measure([0, 1], [0, 1])
+        responses = [_fake_response({'id': 'packed'}),
+                     _fake_response({'id': 'alone'}),
+                     _fake_response({'id': 'packed', 'status': 'finished',
+                                     'samples': [0b011, 0b101, 0, 0, 0, 0b001]})]
+        with unittest.mock.patch('requests.Session.put',
+                                 side_effect=responses) as put:
+            jobs = self.backend.run_batch(
+                [narrow, global_ms, self.circuit, narrow],
+                shots=[3, 3, 2, 3], pack=True)
+            counts = [job.result(wait=0).get_counts() for job in
+                      (jobs[0], jobs[2], jobs[3])]
+        self.assertEqual(['packed', 'alone', 'packed', 'packed'],
+                         [job.job_id() for job in jobs])
+        packed = put.call_args_list[0][1]['data']
+        # the two identical narrow circuits run once, with 6 shots
+        self.assertEqual(3, packed['no_qubits'])
+        self.assertEqual(6, packed['repetitions'])
+        self.assertEqual([['X', 0.5, [0]], ['X', 0.5, [1]], ['X', 0.5, [1]]],
+                         json.loads(packed['data']))
+        self.assertEqual(2, put.call_args_list[1][1]['data']['no_qubits'])
+        # ion 0 carries both narrow circuits, ions 1 and 2 the wide one
+        self.assertEqual({'1': 2, '0': 1}, counts[0])
+        self.assertEqual({'10': 1, '01': 1}, counts[1])
+        self.assertEqual({'0': 2, '1': 1}, counts[2])
+
+    def test_run_native(self):
+        with self._put() as put:
+            job = self.backend.run_native([['X', 0.5, [0]], ['X', 0.5, [0]]],
+                                          shots=3, measure_map=[1, 0])
+            result = job.result(wait=0)
+        self.assertEqual('[["X", 0.5, [0]], ["X", 0.5, [0]]]',
+                         put.call_args_list[0][1]['data']['data'])
+        self.assertEqual(2, put.call_args_list[0][1]['data']['no_qubits'])
+        self.assertEqual({'10': 2, '00': 1}, result.get_counts('native'))
+        self.assertIn('circuit_to_aqt', job.timings)
+
+    def test_run_native_validation(self):
+        run = self.backend.run_native
+        self.assertRaises(ValueError, run, [['Z', 0.5, [0]]])
+        self.assertRaises(ValueError, run, [['X', 0.5, [0, 1]]])
+        self.assertRaises(ValueError, run, [['MS', 0.5, [1, 1]]])
+        self.assertRaises(ValueError, run, [['X', float('nan'), [0]]])
+        self.assertRaises(ValueError, run, [['X', 0.5, [3]]], num_qubits=2)
+        self.assertRaises(ValueError, run, [['X', 0.5, [11]]])
+        self.assertRaises(ValueError, run, [['X', 0.5, [0]]], shots=201)
+        self.assertRaises(ValueError, run, [['X', 0.5, [0]]],
+                          measure_map={0: 0, 1: 0})
+
+    def test_run_native_locally(self):
+        backend = self.provider.get_backend('aqt_mps_simulator')
+        ops = json.loads(circuit_to_aqt(self.circuit, 'foo')[0]['data'])
+        job = backend.run_native(ops, shots=20, measure_map={0: 1})
+        self.assertEqual({'10': 20}, job.result().get_counts())
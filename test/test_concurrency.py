@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import itertools
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from numpy import pi
+
+from qiskit import QuantumCircuit
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_job import run_and_collect
+
+LATENCY = 0.02
+
+
+class _GatewayHandler(BaseHTTPRequestHandler):
+    """Mock gateway: jobs finish right away, every shot measures all ones."""
+
+    protocol_version = 'HTTP/1.1'
+    # one write per response, avoiding delayed ACK stalls on keep-alive
+    wbufsize = -1
+    jobs = {}
+    ids = itertools.count()
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        length = int(self.headers['Content-Length'])
+        fields = {key: values[0] for key, values in
+                  parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+        time.sleep(LATENCY)
+        if 'id' in fields:
+            shots = self.jobs[fields['id']]
+            body = {'id': fields['id'], 'status': 'finished',
+                    'samples': [1] * shots}
+        else:
+            job_id = str(next(self.ids))
+            self.jobs[job_id] = int(fields['repetitions'])
+            body = {'id': job_id}
+        encoded = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class TestConcurrency(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _GatewayHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.provider = AQTProvider('foo')
+        self.backend = self.provider.get_backend('aqt_qasm_simulator')
+        self.backend.url = 'http://127.0.0.1:%d/' % self.server.server_port
+        self.circuit = QuantumCircuit(1, 1)
+        self.circuit.rx(pi, 0)
+        self.circuit.measure(0, 0)
+
+    def _throughput(self, workers, jobs=32):
+        # distinct circuits, identical ones would share one remote job
+        circuits = []
+        for index in range(jobs):
+            circuit = QuantumCircuit(1, 1)
+            circuit.rx(pi, 0)
+            circuit.ry(index / jobs, 0)
+            circuit.measure(0, 0)
+            circuits.append((circuit, 5))
+        start = time.perf_counter()
+        collected = run_and_collect(self.backend, circuits,
+                                    max_workers=workers, wait=0)
+        elapsed = time.perf_counter() - start
+        self.assertEqual([[1] * 5] * jobs,
+                         [samples.tolist() for _, samples in collected])
+        return jobs / elapsed
+
+    def test_throughput_scales_with_threads(self):
+        single = self._throughput(1)
+        pooled = self._throughput(8)
+        self.assertGreater(pooled, 3 * single)
+        self.assertEqual(64, self.provider.metrics.jobs_submitted.value(
+            backend='aqt_qasm_simulator'))
+        self.assertEqual(0, self.provider.metrics.jobs_in_flight.value(
+            backend='aqt_qasm_simulator'))
+
+    def test_options_change_while_running(self):
+        stop = threading.Event()
+
+        def toggle():
+            shots = itertools.cycle((5, 7))
+            while not stop.wait(0.001):
+                self.backend.set_options(shots=next(shots), compress=False)
+
+        self.backend.set_options(shots=5)
+        toggler = threading.Thread(target=toggle)
+        toggler.start()
+        try:
+            with ThreadPoolExecutor(8) as pool:
+                jobs = list(pool.map(lambda _: self.backend.run(self.circuit),
+                                     range(32)))
+                shots = list(pool.map(lambda job: len(job.samples(wait=0)),
+                                      jobs))
+        finally:
+            stop.set()
+            toggler.join()
+        self.assertTrue(set(shots) <= {5, 7})
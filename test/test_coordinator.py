@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from urllib.parse import parse_qs
+
+from numpy import pi
+
+from qiskit import QuantumCircuit
+from qiskit.providers import JobError
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_coordinator import (Coordinator,
+                                                 CoordinatedTransport)
+from qiskit_aqt_provider.aqt_transport import (ReplayedResponse, Transport,
+                                               read_result)
+
+
+class _Gateway(Transport):
+    """Finishes every job on its second poll, all shots measuring 1."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def put(self, url, data=None, headers=None, stream=False):
+        if isinstance(data, bytes):
+            data = {key: values[0] for key, values in
+                    parse_qs(gzip.decompress(data).decode()).items()}
+            data['repetitions'] = int(data['repetitions'])
+        with self.lock:
+            self.requests.append(data)
+            if 'id' in data:
+                polls = self.jobs[data['id']]
+                polls['count'] += 1
+                body = {'id': data['id'], 'status': 'queued'}
+                if polls['count'] > 1:
+                    body = {'id': data['id'], 'status': 'finished',
+                            'samples': [1] * polls['shots']}
+            else:
+                job_id = 'remote%d' % len(self.jobs)
+                self.jobs[job_id] = {'count': 0, 'shots': data['repetitions']}
+                body = {'id': job_id}
+        return ReplayedResponse(200, {}, json.dumps(body).encode(), url)
+
+
+class TestCoordinator(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'aqt.db')
+        self.gateway = _Gateway()
+        self.coordinator = Coordinator(
+            self.path, self.gateway, max_in_flight=1, interval=0.01,
+            access_tokens=['foo', 'token-a', 'token-b'])
+        self.circuit = QuantumCircuit(1, 1)
+        self.circuit.rx(pi, 0)
+        self.circuit.measure(0, 0)
+
+    def tearDown(self):
+        self.coordinator.stop()
+        shutil.rmtree(self.directory)
+
+    def _backend(self, token='foo'):
+        provider = AQTProvider(token,
+                               transport=CoordinatedTransport(self.path))
+        return provider.get_backend('aqt_qasm_simulator')
+
+    def test_daemon_limits_jobs_in_flight(self):
+        jobs = [self._backend(token).run(self.circuit, shots=5)
+                for token in ('token-a', 'token-b')]
+        self.assertEqual({'queued': 2}, self.coordinator.counts())
+        self.assertEqual({'queued': 1, 'submitted': 1},
+                         self.coordinator.run_once())
+        self.assertEqual({'queued': 1, 'submitted': 1},
+                         self.coordinator.run_once())
+        self.assertEqual({'finished': 1, 'submitted': 1},
+                         self.coordinator.run_once())
+        self.assertEqual({'1': 5},
+                         jobs[0].result(timeout=5, wait=0).get_counts())
+        self.coordinator.run_once()
+        self.assertEqual({'finished': 2}, self.coordinator.run_once())
+        self.assertEqual({'1': 5},
+                         jobs[1].result(timeout=5, wait=0).get_counts())
+        # one submission and two polls per job, each with its own token
+        self.assertEqual(6, len(self.gateway.requests))
+        self.assertEqual(['token-a'] * 3 + ['token-b'] * 3,
+                         [request['access_token']
+                          for request in self.gateway.requests])
+
+    def test_concurrent_workers(self):
+        self.coordinator.start()
+        results = []
+
+        def worker():
+            job = self._backend().run(self.circuit, shots=3)
+            results.append(job.result(timeout=30, wait=0.01).get_counts())
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        self.assertEqual([{'1': 3}] * 4, results)
+        self.assertEqual(4, len(self.gateway.jobs))
+
+    def test_failed_submission(self):
+        self.gateway.put = lambda *args, **kwargs: ReplayedResponse(
+            500, {}, b'', 'url')
+        job = self._backend().run(self.circuit)
+        self.assertEqual({'error': 1}, self.coordinator.run_once())
+        self.assertRaises(JobError, job.result, timeout=5, wait=0)
+
+    def test_tokens_stay_out_of_the_database(self):
+        backend = self._backend('token-a')
+        backend.run(self.circuit, shots=2)
+        backend.run(self.circuit, shots=2, compress=True)
+        self._backend('unknown-token').run(self.circuit, shots=2)
+        with open(self.path, 'rb') as database:
+            self.assertNotIn(b'token-a', database.read())
+        self.coordinator.max_in_flight = 3
+        self.assertEqual({'submitted': 2, 'error': 1},
+                         self.coordinator.run_once())
+        self.assertEqual(['token-a'] * 2,
+                         [request['access_token']
+                          for request in self.gateway.requests])
+        connection = sqlite3.connect(self.path)
+        headers = [json.loads(row[0]) for row in connection.execute(
+            'SELECT headers FROM jobs')]
+        connection.close()
+        self.assertFalse(any('Ocp-Apim-Subscription-Key' in header
+                             for header in headers))
+
+    def test_unknown_job(self):
+        response = CoordinatedTransport(self.path).put(
+            'url', data={'id': 'missing', 'access_token': 'foo'})
+        self.assertEqual(404, response.status_code)
+        self.assertEqual('error', read_result(response)['status'])
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import unittest
+
+import numpy as np
+from numpy import pi
+from qiskit import QuantumCircuit
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_cutting import find_cuts
+from qiskit_aqt_provider.aqt_mps import MPSEngine
+from qiskit_aqt_provider.aqt_ops import ops_from_list
+from qiskit_aqt_provider.circuit_to_aqt import _experiment_to_ops
+
+
+def _chain(num_qubits, seed):
+    rng = np.random.default_rng(seed)
+    circuit = QuantumCircuit(num_qubits, num_qubits)
+    for qubit in range(num_qubits):
+        circuit.rx(rng.uniform(0, pi), qubit)
+        circuit.ry(rng.uniform(0, pi), qubit)
+    for qubit in range(num_qubits - 1):
+        circuit.rxx(rng.uniform(0, pi), qubit, qubit + 1)
+    for qubit in range(num_qubits):
+        circuit.rx(rng.uniform(0, pi), qubit)
+        circuit.ry(rng.uniform(0, pi), qubit)
+    return circuit
+
+
+def _exact(circuit, clbits):
+    engine = MPSEngine(circuit.num_qubits)
+    engine.apply_ops(_experiment_to_ops(circuit))
+    probabilities = np.abs(engine.statevector()) ** 2
+    exact = {}
+    for index, probability in enumerate(probabilities.tolist()):
+        outcome = sum(((index >> qubit) & 1) << clbit
+                      for qubit, clbit in enumerate(clbits))
+        exact[outcome] = probability
+    return exact
+
+
+class TestFindCuts(unittest.TestCase):
+
+    def test_chain(self):
+        ops = ops_from_list([['MS', 0.5, [0, 1]], ['MS', 0.5, [1, 2]],
+                             ['MS', 0.5, [2, 3]]])
+        self.assertEqual([(1, 1), (2, 2)], find_cuts(ops, 4, 2))
+        self.assertEqual([], find_cuts(ops, 4, 4))
+
+    def test_limits(self):
+        ops = ops_from_list([['MS', 0.5, [0, 1]], ['MS', 0.5, [1, 2]],
+                             ['MS', 0.5, [2, 3]]])
+        self.assertRaises(ValueError, find_cuts, ops, 4, 2, max_cuts=1)
+        ops = ops_from_list([['MS', 0.5, []]])
+        self.assertRaises(ValueError, find_cuts, ops, 4, 2)
+
+
+class TestCutJob(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = AQTProvider('foo').get_backend('aqt_mps_simulator')
+        self.backend.set_options(seed=7)
+
+    def test_reconstruction(self):
+        circuit = _chain(4, seed=1)
+        clbits = [3, 1, 0, 2]
+        circuit.measure(range(4), clbits)
+        job = self.backend.run_cut(circuit, shots=10000, max_width=2)
+        self.assertEqual([2, 2, 2], [fragment.width
+                                     for fragment in job.fragments])
+        # 3 bases, 4 states times 3 bases and 4 states
+        self.assertEqual(19, len(job.jobs))
+        result = job.result(wait=0)
+        exact = _exact(circuit, clbits)
+        probabilities = result.probabilities()
+        self.assertAlmostEqual(1.0, sum(probabilities.values()))
+        for outcome, probability in exact.items():
+            self.assertAlmostEqual(probability,
+                                   probabilities.get(outcome, 0.0), delta=0.03)
+        parity = sum(probability * (-1) ** bin(outcome & 0b101).count('1')
+                     for outcome, probability in exact.items())
+        self.assertAlmostEqual(parity, result.expectation([0, 2]), delta=0.05)
+
+    def test_unmeasured_qubits_and_no_cuts(self):
+        circuit = _chain(3, seed=2)
+        circuit.measure([0, 2], [0, 1])
+        job = self.backend.run_cut(circuit, shots=10000)
+        self.assertEqual([], job.cuts)
+        self.assertEqual(1, len(job.jobs))
+        exact = {}
+        for outcome, probability in _exact(circuit, [0, 2, 1]).items():
+            outcome &= 0b11
+            exact[outcome] = exact.get(outcome, 0.0) + probability
+        probabilities = job.result(wait=0).probabilities()
+        for outcome, probability in exact.items():
+            self.assertAlmostEqual(probability, probabilities[outcome],
+                                   delta=0.03)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import unittest
+import unittest.mock
+
+import numpy as np
+
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import SparsePauliOp
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_estimator import (AQTEstimator, group_commuting,
+                                               parity)
+
+from .helpers import simulated_batch
+
+
+class TestEstimator(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = AQTProvider('foo').get_backend('aqt_qasm_simulator')
+        self.bell = QuantumCircuit(2, name='bell')
+        self.bell.h(0)
+        self.bell.cx(0, 1)
+
+    def test_parity(self):
+        values = np.random.randint(0, 2 ** 62, size=100)
+        expected = [bin(value).count('1') % 2 for value in values]
+        self.assertEqual(expected, parity(values).tolist())
+
+    def test_group_commuting(self):
+        groups = group_commuting(['ZZ', 'IZ', 'XX', 'XI', 'YY', 'ZI'])
+        self.assertEqual([('XX', ['XX', 'XI']), ('YY', ['YY']),
+                          ('ZZ', ['ZZ', 'IZ', 'ZI'])], groups)
+        self.assertEqual([('XZ', ['IZ', 'XI'])],
+                         group_commuting(['XI', 'IZ']))
+
+    def test_bell_state(self):
+        observable = SparsePauliOp.from_list(
+            [('ZZ', 1.0), ('XX', 0.5), ('YY', 0.25), ('IZ', 2.0), ('II', 3.0)])
+        with unittest.mock.patch.object(self.backend, 'run_batch',
+                                        side_effect=simulated_batch()) as run:
+            result = AQTEstimator(self.backend, shots=300).run(
+                [self.bell, self.bell], [observable, 'XX'])
+        # three groups for both pairs, each split into two jobs
+        self.assertEqual(6, len(run.call_args[0][0]))
+        self.assertEqual([200, 100] * 3, run.call_args[1]['shots'])
+        # <ZZ> = <XX> = 1, <YY> = -1, <IZ> = 0
+        self.assertAlmostEqual(1.0 + 0.5 - 0.25 + 3.0, result.values[0],
+                               delta=5 * result.std_errors[0])
+        self.assertEqual(1.0, result.values[1])
+        self.assertEqual(0.0, result.std_errors[1])
+        self.assertEqual(2, len(result.metadata[1]['job_ids']))
+
+    def test_mismatched_inputs(self):
+        estimator = AQTEstimator(self.backend)
+        self.assertRaises(ValueError, estimator.run, [self.bell], [])
+        self.assertRaises(ValueError, estimator.run, [self.bell], ['ZZZ'])
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import unittest
+from contextlib import contextmanager
+
+from qiskit_aqt_provider.aqt_instrumentation import (Instrumentation,
+                                                     get_instrumentation)
+
+
+class _FakeTracer():
+    def __init__(self):
+        self.spans = []
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        self.spans.append((name, attributes))
+        yield
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_callbacks_and_timings(self):
+        instrumentation = Instrumentation()
+        spans = []
+        instrumentation.add_callback(spans.append)
+        timings = {}
+        with instrumentation.span('submit', timings, backend='foo'):
+            pass
+        with instrumentation.span('submit', timings, backend='foo'):
+            pass
+        self.assertEqual(['submit', 'submit'], [span.name for span in spans])
+        self.assertEqual({'backend': 'foo'}, spans[0].attributes)
+        self.assertAlmostEqual(spans[0].duration + spans[1].duration,
+                               timings['submit'])
+
+    def test_error_is_reported(self):
+        instrumentation = Instrumentation()
+        spans = []
+        instrumentation.add_callback(spans.append)
+        with self.assertRaises(ValueError):
+            with instrumentation.span('poll'):
+                raise ValueError('boom')
+        self.assertIsInstance(spans[0].error, ValueError)
+
+    def test_remove_callback(self):
+        instrumentation = Instrumentation()
+        spans = []
+        instrumentation.add_callback(spans.append)
+        instrumentation.remove_callback(spans.append)
+        with instrumentation.span('poll'):
+            pass
+        self.assertEqual([], spans)
+
+    def test_tracer(self):
+        tracer = _FakeTracer()
+        instrumentation = Instrumentation(tracer=tracer)
+        with instrumentation.span('poll', job_id='abc', status=None):
+            pass
+        self.assertEqual([('poll', {'job_id': 'abc'})], tracer.spans)
+
+    def test_provider_without_instrumentation(self):
+        self.assertIsInstance(get_instrumentation(None), Instrumentation)
+
+    def test_failing_callback_is_logged(self):
+        instrumentation = Instrumentation()
+        spans = []
+
+        def broken(span):
+            raise RuntimeError('broken callback')
+
+        instrumentation.add_callback(broken)
+        instrumentation.add_callback(spans.append)
+        with self.assertLogs('qiskit_aqt_provider.aqt_instrumentation',
+                             level='ERROR'):
+            with instrumentation.span('submit'):
+                pass
+        self.assertEqual(1, len(spans))
+        with self.assertLogs('qiskit_aqt_provider.aqt_instrumentation',
+                             level='ERROR'):
+            with self.assertRaises(ValueError):
+                with instrumentation.span('poll'):
+                    raise ValueError('original error')
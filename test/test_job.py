@@ -13,23 +13,22 @@
 # that they have been altered from the originals.
 # pylint: disable=protected-access
 
+import sys
+import threading
+import time
 import unittest
+import unittest.mock
 
 import numpy as np
 
 from qiskit import QuantumCircuit, transpile
-from qiskit_aqt_provider.aqt_job import AQTJob
+from qiskit.providers import JobError
+from qiskit.providers.jobstatus import JobStatus
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_job import AQTJob, _clbit_map, cancel_jobs
 from qiskit_aqt_provider.aqt_backend import AQTDevice
 
 
-class _FakeJob():
-    def __init__(self, circuit):
-        self.qobj = circuit
-
-    def _build_memory_mapping(self):
-        return AQTJob._build_memory_mapping(self)
-
-
 class TestJobs(unittest.TestCase):
 
     def test_job_counts_measurement_mapping(self):
@@ -41,11 +40,12 @@ class TestJobs(unittest.TestCase):
         qc.x(2)
         qc.measure(range(5), perm)
 
-        job = _FakeJob(qc)
-        mapping = job._build_memory_mapping()
+        clbits = _clbit_map(qc)
 
-        self.assertEqual(mapping[0], perm[0])
-        self.assertEqual(mapping[2], perm[2])
+        self.assertEqual(clbits[0], perm[0])
+        self.assertEqual(clbits[2], perm[2])
+        self.assertEqual(dict(enumerate(perm)),
+                         AQTJob(AQTDevice(None), 'abc123', None, qc).memory_mapping)
 
     def test_job_result_counts(self):
         qc = QuantumCircuit(2, 2)
@@ -82,3 +82,114 @@ class TestJobs(unittest.TestCase):
 
         self.assertEqual({'1100': 198, '1000': 1, '0100': 1},
                          result.get_counts())
+        self.assertIn('format_counts', job.timings)
+
+    def test_cancel_stops_polling(self):
+        qc = QuantumCircuit(1, 1)
+        qc.measure(0, 0)
+        backend = AQTDevice(AQTProvider('foo'))
+        job = AQTJob(backend, 'abc123', None, qc)
+        fake_response = unittest.mock.Mock()
+        fake_response.iter_content.return_value = [b'{"status": "queued"}']
+        errors = []
+
+        def wait():
+            try:
+                job.result(wait=60)
+            except JobError as ex:
+                errors.append(ex)
+
+        with unittest.mock.patch('requests.Session.put',
+                                 return_value=fake_response) as put:
+            thread = threading.Thread(target=wait)
+            thread.start()
+            while not put.called and thread.is_alive():
+                time.sleep(0.01)
+            start = time.time()
+            self.assertTrue(job.cancel())
+            thread.join(10)
+            self.assertLess(time.time() - start, 10)
+
+        self.assertEqual(1, len(errors))
+        self.assertEqual(1, put.call_count)
+        self.assertEqual(JobStatus.CANCELLED, job.status())
+        self.assertRaises(JobError, job.result)
+
+    def test_cancel_wakes_only_its_job(self):
+        qc = QuantumCircuit(1, 1)
+        qc.measure(0, 0)
+        backend = AQTDevice(AQTProvider('foo'))
+        first = AQTJob(backend, 'first', None, qc)
+        second = AQTJob(backend, 'second', None, qc)
+        # the event is only created once a job sleeps between polls
+        self.assertIsNone(first._wakeup)
+        second._sleep(0)
+        first.cancel()
+        self.assertIsNone(first._wakeup)
+        self.assertFalse(second._wakeup.is_set())
+        second.cancel()
+        self.assertTrue(second._wakeup.is_set())
+
+    def test_bulk_cancel(self):
+        qc = QuantumCircuit(1, 1)
+        qc.measure(0, 0)
+        backend = AQTDevice(None)
+        jobs = [AQTJob(backend, str(index), None, qc) for index in range(3)]
+        self.assertTrue(jobs[0].cancel())
+        self.assertEqual(2, cancel_jobs(jobs))
+        self.assertEqual(0, cancel_jobs(jobs))
+        for job in jobs:
+            self.assertTrue(job.cancelled())
+
+    def test_cancel_after_last_poll(self):
+        qc = QuantumCircuit(1, 1)
+        qc.measure(0, 0)
+        backend = AQTDevice(None)
+        job = AQTJob(backend, 'abc123', None, qc)
+
+        def finished_then_cancelled(*args):
+            job.cancel()
+            return {'status': 'finished', 'samples': [0, 1]}
+
+        with unittest.mock.patch.object(job, '_wait_for_result',
+                                        side_effect=finished_then_cancelled):
+            self.assertRaises(JobError, job.result)
+
+    def test_samples_in_clbit_order(self):
+        qc = QuantumCircuit(3, 3)
+        qc.measure([0, 1, 2], [2, 0, 1])
+        job = AQTJob(AQTDevice(None), 'abc123', None, qc)
+        with unittest.mock.patch.object(
+                job, '_wait_for_result',
+                return_value={'status': 'finished', 'samples': [1, 2, 4, 3]}):
+            samples = job.samples()
+        self.assertEqual([4, 1, 2, 5], samples.tolist())
+
+    def test_job_does_not_keep_circuit(self):
+        qc = QuantumCircuit(11, 11)
+        for _ in range(500):
+            qc.rx(0.1, range(11))
+        qc.measure(range(11), range(11))
+        job = AQTJob(AQTDevice(None), 'abc123', None, qc)
+        self.assertEqual({}, vars(job))
+        size = sum(sys.getsizeof(value) for value in (
+            job, job.metadata, job.timings, job._clbits, job._name))
+        self.assertLess(size, 600)
+
+    def test_result_is_memoized(self):
+        qc = QuantumCircuit(2, 2, name='bell')
+        qc.measure([0, 1], [1, 0])
+        job = AQTJob(AQTDevice(None), 'abc123', None, qc)
+        with unittest.mock.patch.object(
+                job, '_wait_for_result',
+                return_value={'status': 'finished',
+                              'samples': [1, 1, 0, 3]}) as wait:
+            result = job.result()
+            self.assertIs(result, job.result())
+            job.samples()
+        self.assertEqual(1, wait.call_count)
+        self.assertEqual({0: 1, 2: 2, 3: 1}, result.get_int_counts())
+        self.assertEqual({'00': 1, '10': 2, '11': 1}, result.get_counts('bell'))
+        self.assertEqual({'0x0': 1, '0x2': 2, '0x3': 1},
+                         result.data()['counts'])
+        self.assertEqual(4, result.results[0].shots)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import unittest
+import urllib.request
+
+from qiskit_aqt_provider.aqt_instrumentation import Instrumentation
+from qiskit_aqt_provider.aqt_metrics import MetricsRegistry
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = MetricsRegistry()
+        self.instrumentation = Instrumentation()
+        self.instrumentation.add_callback(self.metrics)
+
+    def _submit(self, job_id):
+        with self.instrumentation.span('submit', backend='sim') as span:
+            span['job_id'] = job_id
+
+    def _poll(self, job_id, status, final=False):
+        with self.instrumentation.span('poll', backend='sim',
+                                       job_id=job_id) as span:
+            span['status'] = status
+            if status in ('finished', 'error'):
+                span['final'] = final
+
+    def test_job_lifecycle(self):
+        self._submit('a')
+        self._submit('b')
+        self._poll('a', 'queued')
+        self._poll('a', 'finished', final=True)
+        # a second result() call sees the final status again
+        self._poll('a', 'finished')
+        self._poll('b', 'error', final=True)
+        self.assertEqual(2, self.metrics.jobs_submitted.value(backend='sim'))
+        self.assertEqual(0, self.metrics.jobs_in_flight.value(backend='sim'))
+        self.assertEqual(1, self.metrics.jobs_finished.value(backend='sim'))
+        self.assertEqual(1, self.metrics.jobs_failed.value(backend='sim'))
+        self.assertEqual(4, self.metrics.polls.value(backend='sim'))
+        self.assertEqual(4, self.metrics.phase_duration.count(
+            phase='poll', backend='sim'))
+
+    def test_failed_submit(self):
+        with self.assertRaises(IOError):
+            with self.instrumentation.span('submit', backend='sim'):
+                raise IOError
+        self.assertEqual(0, self.metrics.jobs_submitted.value(backend='sim'))
+        self.assertEqual(1, self.metrics.jobs_failed.value(backend='sim'))
+
+    def test_cancel(self):
+        self._submit('a')
+        self._submit('b')
+        with self.instrumentation.span('cancel', backend='sim',
+                                       job_ids=['a', 'b'], unfinished=2):
+            pass
+        self.assertEqual(0, self.metrics.jobs_in_flight.value(backend='sim'))
+        self.assertEqual(2, self.metrics.jobs_cancelled.value(backend='sim'))
+
+    def test_render(self):
+        self._submit('a')
+        text = self.metrics.render()
+        self.assertIn('aqt_jobs_submitted_total{backend="sim"} 1.0', text)
+        self.assertIn('aqt_phase_duration_seconds_bucket{backend="sim",'
+                      'phase="submit",le="+Inf"} 1.0', text)
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(1, snapshot[('aqt_jobs_in_flight',
+                                      (('backend', 'sim'),))])
+
+    def test_http_server(self):
+        self._submit('a')
+        server = self.metrics.start_http_server()
+        try:
+            url = 'http://%s:%d/metrics' % server.server_address
+            with urllib.request.urlopen(url) as response:
+                body = response.read().decode('utf-8')
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(self.metrics.render(), body)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import time
+import unittest
+import unittest.mock
+
+import numpy as np
+
+from qiskit import QuantumCircuit
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_job import AQTJob
+from qiskit_aqt_provider.aqt_mitigation import (ReadoutCalibration,
+                                                ReadoutMitigator,
+                                                clear_calibrations,
+                                                project_to_simplex)
+
+from .helpers import simulated_batch
+
+# probability to read 1 after preparing 0, and 0 after preparing 1
+P10 = np.array([0.02, 0.05, 0.1, 0.0, 0.03, 0.01, 0.04, 0.02, 0.06, 0.0, 0.01])
+P01 = np.array([0.05, 0.02, 0.0, 0.1, 0.01, 0.03, 0.02, 0.04, 0.0, 0.06, 0.01])
+
+
+def _calibration_job(circuit, shots):
+    """Exact calibration samples of the P10 / P01 noise model."""
+    prepared = 1 if circuit.name == 'cal_1' else 0
+    flip = (P01 if prepared else P10)
+    bits = np.zeros((shots, len(flip)), dtype=np.int64)
+    for qubit, probability in enumerate(flip):
+        flipped = int(round(probability * shots))
+        bits[:flipped, qubit] = 1
+    if prepared:
+        bits = 1 - bits
+    job = unittest.mock.Mock()
+    job.samples.return_value = (bits << np.arange(len(flip))).sum(axis=1)
+    return job
+
+
+class TestMitigation(unittest.TestCase):
+
+    def setUp(self):
+        clear_calibrations()
+        self.backend = AQTProvider('foo').get_backend('aqt_qasm_simulator')
+
+    def tearDown(self):
+        clear_calibrations()
+
+    def _run(self):
+        return unittest.mock.patch.object(
+            self.backend, 'run_batch',
+            side_effect=simulated_batch(_calibration_job))
+
+    def test_calibration_matrices(self):
+        with self._run() as run:
+            calibration = ReadoutMitigator(self.backend, shots=400).calibration
+        self.assertEqual(4, len(run.call_args[0][0]))
+        np.testing.assert_allclose(P10, calibration.matrices[:, 1, 0])
+        np.testing.assert_allclose(P01, calibration.matrices[:, 0, 1])
+        np.testing.assert_allclose(1, calibration.matrices.sum(axis=1))
+
+    def test_cached_per_backend_with_expiry(self):
+        with self._run() as run:
+            ReadoutMitigator(self.backend).calibration
+            ReadoutMitigator(self.backend).calibration
+            self.assertEqual(1, run.call_count)
+            stale = ReadoutMitigator(self.backend, max_age=0)
+            time.sleep(0.01)
+            stale.calibration
+            self.assertEqual(2, run.call_count)
+
+    def test_inverse_recovers_distribution(self):
+        with self._run():
+            mitigator = ReadoutMitigator(self.backend, shots=400,
+                                         method='inverse')
+            # a Bell pair on qubits 2 and 0, read into clbits 0 and 1
+            ideal = np.array([0.5, 0, 0, 0.5])
+            noisy = ideal
+            for bit, qubit in enumerate([2, 0]):
+                noisy = np.einsum('ij,ajb->aib',
+                                  mitigator.calibration.matrices[qubit],
+                                  noisy.reshape(2 ** (1 - bit), 2, 2 ** bit)
+                                  ).reshape(-1)
+            counts = {format(k, '02b'): 1000 * v for k, v in enumerate(noisy)}
+            corrected = mitigator.apply(counts, qubits=[2, 0])
+        self.assertEqual({'00', '11'}, set(corrected))
+        self.assertAlmostEqual(0.5, corrected['00'])
+        self.assertAlmostEqual(0.5, corrected['11'])
+
+    def test_least_squares_is_a_distribution(self):
+        vector = np.array([0.7, -0.1, 0.45, -0.05])
+        projected = project_to_simplex(vector)
+        self.assertTrue((projected >= 0).all())
+        self.assertAlmostEqual(1.0, projected.sum())
+        np.testing.assert_allclose([0.625, 0, 0.375, 0], projected)
+
+    def test_full_width(self):
+        calibration = ReadoutCalibration.from_samples(
+            *[_calibration_job(QuantumCircuit(11, name=name), 200).samples()
+              for name in ('cal_0', 'cal_1')], num_qubits=11)
+        probabilities = np.random.dirichlet(np.ones(2 ** 11))
+        start = time.perf_counter()
+        corrected = calibration.apply(probabilities, list(range(11)))
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertAlmostEqual(1.0, corrected.sum())
+
+    def test_apply_job_uses_memory_mapping(self):
+        qc = QuantumCircuit(2, 2)
+        qc.measure([0, 1], [1, 0])
+        job = AQTJob(self.backend, 'abc123', None, qc)
+        result = unittest.mock.Mock()
+        result.get_counts.return_value = {'01': 100}
+        with self._run(), unittest.mock.patch.object(job, 'result',
+                                                     return_value=result):
+            mitigator = ReadoutMitigator(self.backend)
+            with unittest.mock.patch.object(mitigator.calibration, 'apply',
+                                            wraps=mitigator.calibration.apply
+                                            ) as apply:
+                mitigator.apply_job(job)
+        self.assertEqual([1, 0], apply.call_args[0][1])
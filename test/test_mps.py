@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import unittest
+
+import numpy as np
+from numpy import pi
+
+from qiskit import QuantumCircuit
+from qiskit.circuit.library import MSGate
+from qiskit.providers import JobError
+from qiskit.quantum_info import Statevector
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_job import AQTJob
+from qiskit_aqt_provider.aqt_mps import MPSEngine
+from qiskit_aqt_provider.circuit_to_aqt import _experiment_to_ops
+
+
+def _engine_for(circuit, **kwargs):
+    engine = MPSEngine(circuit.num_qubits, **kwargs)
+    measured = circuit.copy()
+    measured.measure_all()
+    engine.apply_ops(_experiment_to_ops(measured))
+    return engine
+
+
+class TestMPS(unittest.TestCase):
+
+    def test_matches_statevector(self):
+        rng = np.random.RandomState(3)
+        circuit = QuantumCircuit(5)
+        for _ in range(12):
+            first, second = rng.choice(5, 2, replace=False)
+            circuit.rx(rng.uniform(0, pi), int(first))
+            circuit.ry(rng.uniform(0, pi), int(second))
+            circuit.rxx(rng.uniform(0, pi), int(first), int(second))
+        engine = _engine_for(circuit)
+        np.testing.assert_allclose(Statevector.from_instruction(circuit).data,
+                                   engine.statevector(), atol=1e-10)
+        self.assertLess(engine.truncation_error, 1e-10)
+
+    def test_global_ms(self):
+        circuit = QuantumCircuit(3)
+        circuit.ry(pi / 3, 1)
+        circuit.append(MSGate(3, pi / 2), [0, 1, 2])
+        np.testing.assert_allclose(Statevector.from_instruction(circuit).data,
+                                   _engine_for(circuit).statevector(),
+                                   atol=1e-10)
+
+    def test_truncation(self):
+        circuit = QuantumCircuit(4)
+        circuit.rxx(pi / 2, 0, 1)
+        circuit.rxx(pi / 2, 1, 2)
+        engine = _engine_for(circuit, max_bond=1)
+        self.assertEqual([1, 1, 1], engine.bond_dimensions)
+        self.assertAlmostEqual(1.0, engine.truncation_error)
+        self.assertAlmostEqual(1.0, np.linalg.norm(engine.statevector()))
+
+    def test_sampling(self):
+        circuit = QuantumCircuit(3)
+        circuit.rxx(pi / 2, 0, 2)
+        circuit.rx(pi, 1)
+        samples = _engine_for(circuit).sample(4000, seed=1)
+        outcomes, counts = np.unique(samples, return_counts=True)
+        self.assertEqual([0b010, 0b111], outcomes.tolist())
+        self.assertAlmostEqual(0.5, counts[0] / 4000, delta=0.03)
+
+    def test_wide_backend(self):
+        backend = AQTProvider('foo').get_backend('aqt_mps_simulator')
+        backend.set_options(seed=5, max_bond=8)
+        circuit = QuantumCircuit(40, 40)
+        for layer in range(2):
+            for qubit in range(layer, 39, 2):
+                circuit.rxx(pi / 2, qubit, qubit + 1)
+        circuit.rx(pi, 39)
+        circuit.measure(range(40), range(40))
+        result = backend.run(circuit, shots=50).result()
+        self.assertEqual(50, sum(result.get_counts().values()))
+        self.assertLessEqual(max(result.bond_dimensions), 8)
+        self.assertGreaterEqual(result.truncation_error, 0.0)
+        samples = result.get_samples()
+        # the ladder flips pairs of ions, keeping the parity of rx(pi) on 39
+        parity = np.array([bin(sample).count('1') % 2
+                           for sample in samples.tolist()])
+        self.assertTrue((parity == 1).all())
+
+    def test_unknown_job(self):
+        backend = AQTProvider('foo').get_backend('aqt_mps_simulator')
+        circuit = QuantumCircuit(1, 1)
+        circuit.measure(0, 0)
+        job = AQTJob(backend, 'mps-unknown', qobj=circuit)
+        self.assertRaises(JobError, job.result, wait=0)
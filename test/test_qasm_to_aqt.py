@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import io
+import json
+import unittest
+import unittest.mock
+
+import numpy as np
+
+from qiskit import QuantumCircuit
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_job import _clbit_map
+from qiskit_aqt_provider.aqt_mps import MPSEngine
+from qiskit_aqt_provider.aqt_ops import ops_to_list
+from qiskit_aqt_provider.circuit_to_aqt import _experiment_to_ops
+from qiskit_aqt_provider.qasm_to_aqt import parse_qasm, UnsupportedQasm
+
+from .test_backend import _fake_response
+
+BASIS_PROGRAM = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg a[2];
+qreg b[2];
+creg c[3];  // three bits, one unused
+creg d[1];
+rx(pi) a[0];
+ry(-pi/4) b;
+rxx(0.5*pi) a[1],
+    b[0];
+barrier a, b;
+rx(1.2e-1) b[1]; measure a[0] -> c[2];
+measure a[1] -> d[0];
+measure b[1] -> c[0];
+"""
+
+
+class TestQasmToAqt(unittest.TestCase):
+
+    def test_matches_qiskit(self):
+        parsed = parse_qasm(io.StringIO(BASIS_PROGRAM))
+        circuit = QuantumCircuit.from_qasm_str(BASIS_PROGRAM)
+        # qiskit orders independent gates differently, compare the states
+        states = []
+        for ops in (_experiment_to_ops(circuit), parsed.ops):
+            engine = MPSEngine(4)
+            engine.apply_ops(ops)
+            states.append(engine.statevector())
+        np.testing.assert_allclose(states[0], states[1], atol=1e-12)
+        self.assertEqual([('X', 0.5, [0]), ('X', 0.5, [0]),
+                          ('Y', -0.25, [2]), ('Y', -0.25, [3])],
+                         ops_to_list(parsed.ops)[:4])
+        self.assertEqual((4, 4), (parsed.num_qubits, parsed.num_clbits))
+        clbits = _clbit_map(circuit)
+        self.assertEqual({qubit: clbit
+                          for qubit, clbit in enumerate(clbits.tolist())
+                          if clbit >= 0}, parsed.measure_map)
+
+    def test_unsupported(self):
+        self.assertRaises(UnsupportedQasm, parse_qasm,
+                          'qreg q[1]; creg c[1]; h q[0]; measure q -> c;')
+        self.assertRaises(UnsupportedQasm, parse_qasm,
+                          'qreg q[1]; rx(sin(1)) q[0];')
+        self.assertRaises(ValueError, parse_qasm, 'qreg q[1]; rx(1) r[0];')
+        self.assertRaises(ValueError, parse_qasm, 'qreg q[1]; rx(1) q[0];')
+        self.assertRaises(ValueError, parse_qasm, 'qreg q[1]; rx(1) q[0]')
+
+    def test_run_qasm(self):
+        backend = AQTProvider('foo').get_backend('aqt_qasm_simulator')
+        program = ('qreg q[2]; creg c[2]; %s q[0]; measure q[0] -> c[1];')
+        responses = [_fake_response({'id': 'abc123'}),
+                     _fake_response({'id': 'abc123', 'status': 'finished',
+                                     'samples': [1, 0]})] * 2
+        with unittest.mock.patch('requests.Session.put',
+                                 side_effect=responses) as put, \
+                unittest.mock.patch('qiskit.QuantumCircuit.from_qasm_str',
+                                    wraps=QuantumCircuit.from_qasm_str
+                                    ) as from_qasm:
+            direct = backend.run_qasm(program % 'rx(pi)', shots=2)
+            self.assertEqual({'10': 1, '00': 1},
+                             direct.result(wait=0).get_counts())
+            self.assertFalse(from_qasm.called)
+            fallback = backend.run_qasm(
+                'include "qelib1.inc";' + program % 'x', shots=2)
+            self.assertEqual({'10': 1, '00': 1},
+                             fallback.result(wait=0).get_counts())
+            self.assertTrue(from_qasm.called)
+        for call in (put.call_args_list[0], put.call_args_list[2]):
+            self.assertEqual(2, call[1]['data']['no_qubits'])
+            self.assertEqual('X', json.loads(call[1]['data']['data'])[0][0])
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import unittest
+
+import numpy as np
+
+from qiskit.result import Result
+from qiskit.result import marginal_counts as qiskit_marginal_counts
+
+from qiskit_aqt_provider.aqt_result import (AQTResult, int_counts,
+                                            marginal_counts, marginals)
+
+
+class TestResult(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(7)
+        self.samples = rng.randint(0, 2 ** 6, size=1000)
+        self.result = AQTResult('aqt_qasm_simulator', '0.0.1', 'q1', 'abc123',
+                                [('circuit', 6, self.samples)])
+
+    def test_marginal_counts(self):
+        self.assertEqual({0: 1, 1: 2, 2: 1},
+                         marginal_counts(np.array([0b101, 0b001, 0b100, 0b011]),
+                                         [2, 1]))
+        # matches qiskit for sorted bits
+        expected = qiskit_marginal_counts(self.result.get_counts(), [1, 3, 4])
+        self.assertEqual(dict(expected),
+                         dict(self.result.get_marginal_counts([1, 3, 4])))
+
+    def test_many_marginals(self):
+        subsets = [[0], [5, 0], [1, 2, 3], []]
+        self.assertEqual([marginal_counts(self.samples, subset)
+                          for subset in subsets],
+                         self.result.get_marginals(subsets))
+        self.assertEqual({0: 1000}, marginals(self.samples, [[]])[0])
+
+    def test_int_counts(self):
+        self.assertEqual(int_counts(self.samples),
+                         self.result.get_int_counts('circuit'))
+        self.assertEqual(1000, sum(self.result.get_counts().values()))
+        self.assertEqual({}, int_counts(np.array([], dtype=np.int64)))
+
+    def test_qiskit_marginal_counts_of_result(self):
+        samples = np.array([0b01, 0b11, 0b10, 0b11])
+        result = AQTResult('aqt_qasm_simulator', '0.0.1', 'q1', 'abc123',
+                           [('circuit', 2, samples)])
+        baseline = Result.from_dict({
+            'backend_name': 'aqt_qasm_simulator', 'backend_version': '0.0.1',
+            'qobj_id': 'q1', 'job_id': 'abc123', 'success': True,
+            'results': [{'shots': 4, 'success': True,
+                         'data': {'counts': result.results[0].data.counts},
+                         'header': {'memory_slots': 2, 'name': 'circuit'}}]})
+        marginal = qiskit_marginal_counts(result, [0])
+        self.assertEqual({'0': 1, '1': 3}, marginal.get_counts())
+        self.assertEqual(qiskit_marginal_counts(baseline, [0]).get_counts(),
+                         marginal.get_counts())
+        self.assertEqual({1: 3, 0: 1}, marginal.get_int_counts())
+        # the original result is left alone
+        self.assertIs(samples, result.get_samples())
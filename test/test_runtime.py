@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import unittest
+import unittest.mock
+
+import numpy as np
+from numpy import pi
+from qiskit import QuantumCircuit
+
+from qiskit_aqt_provider import AQTProvider, aqt_runtime
+from qiskit_aqt_provider.aqt_ops import ops_from_list
+from qiskit_aqt_provider.aqt_runtime import (RuntimeModel, poll_interval,
+                                             runtime_features)
+from qiskit_aqt_provider.aqt_scheduler import JobScheduler
+
+
+class TestRuntimeModel(unittest.TestCase):
+
+    def test_features(self):
+        ops = ops_from_list([['X', 0.5, [0]], ['Y', 0.5, [1]],
+                             ['MS', 0.5, [0, 1]], ['MS', 0.5, []]])
+        self.assertEqual([1, 10, 20, 20, 30],
+                         runtime_features(ops, 3, 10).tolist())
+
+    def test_calibration(self):
+        true = np.array([1.0, 0.005, 1e-4, 5e-4, 0.0])
+        rng = np.random.default_rng(3)
+        model = RuntimeModel()
+        for _ in range(50):
+            shots = rng.integers(1, 1000)
+            features = np.array([1, shots, shots * rng.integers(0, 50),
+                                 shots * rng.integers(0, 20), 0])
+            model.observe(features, true @ features)
+        self.assertTrue(np.all(model.coefficients >= 0))
+        features = np.array([1, 200, 200 * 30, 200 * 10, 0])
+        self.assertAlmostEqual(true @ features,
+                               model.estimate_features(features),
+                               delta=0.05 * (true @ features))
+
+    def test_prior_without_observations(self):
+        model = RuntimeModel(coefficients=(1, 0, 0, 0, 0))
+        ops = ops_from_list([['X', 0.5, [0]]])
+        self.assertEqual(1.0, model.estimate(ops, 1, 100))
+
+    def test_poll_interval(self):
+        self.assertEqual(5.0, poll_interval(None, 0))
+        self.assertEqual(2.0, poll_interval(3.0, 1.0))
+        self.assertAlmostEqual(0.3, poll_interval(3.0, 4.0))
+        self.assertEqual(5.0, poll_interval(100.0, 0))
+        self.assertEqual(0.1, poll_interval(0.01, 1.0))
+
+
+class TestBackendRuntime(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = AQTProvider('foo').get_backend('aqt_mps_simulator')
+        self.circuit = QuantumCircuit(2, 2)
+        self.circuit.rx(pi, 0)
+        self.circuit.rxx(pi / 2, 0, 1)
+        self.circuit.measure([0, 1], [0, 1])
+
+    def test_learns_from_finished_jobs(self):
+        model = self.backend.runtime_model
+        before = self.backend.estimate_runtime(self.circuit, shots=10)
+        job = self.backend.run_batch([self.circuit], shots=10)[0]
+        self.assertAlmostEqual(before, job.estimated_runtime)
+        job.result(wait=None)
+        # local jobs finish at once, far faster than the prior
+        self.assertLess(self.backend.estimate_runtime(self.circuit, shots=10),
+                        before)
+        self.assertIsNone(model.expected(job.job_id()))
+
+    def test_run_estimates_only_for_a_scheduler(self):
+        with unittest.mock.patch.object(
+                aqt_runtime, 'runtime_features',
+                wraps=aqt_runtime.runtime_features) as features:
+            job = self.backend.run(self.circuit, shots=10)
+            self.assertFalse(features.called)
+            self.assertIsNone(job.estimated_runtime)
+            provider = AQTProvider('foo', scheduler=JobScheduler())
+            backend = provider.get_backend('aqt_mps_simulator')
+            # taken first, the model learns from the job once it finished
+            expected = backend.estimate_runtime(self.circuit, 10)
+            features.reset_mock()
+            job = backend.run(self.circuit, shots=10)
+            self.assertEqual(1, features.call_count)
+        self.assertAlmostEqual(expected, job.estimated_runtime)
+
+    def test_batches_stay_within_max_runtime(self):
+        self.backend.runtime_model.coefficients = np.array([0, 1, 0, 0, 0.])
+        jobs = self.backend.run_batch([self.circuit] * 4, shots=10,
+                                      max_runtime=25)
+        self.assertEqual(2, len({job.job_id() for job in jobs}))
+        circuit = QuantumCircuit(1, 1)
+        circuit.rx(pi / 2, 0)
+        circuit.measure(0, 0)
+        jobs = self.backend.run_batch([self.circuit, circuit], shots=10,
+                                      pack=True, max_runtime=15)
+        self.assertEqual(1, len({job.job_id() for job in jobs}))
+        # rx(pi) is sent as two X(0.5), 30 single-qubit gate shots packed
+        self.backend.runtime_model.coefficients = np.array([0, 0, 1, 0, 0.])
+        jobs = self.backend.run_batch([self.circuit, circuit], shots=10,
+                                      pack=True, max_runtime=25)
+        self.assertEqual(2, len({job.job_id() for job in jobs}))
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import unittest
+import unittest.mock
+
+import numpy as np
+from numpy import pi
+
+from qiskit import QuantumCircuit
+from qiskit.circuit import Parameter
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_sampler import AQTSampler, quasi_distribution
+
+from .helpers import simulated_batch
+
+
+class TestSampler(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = AQTProvider('foo').get_backend('aqt_qasm_simulator')
+        self.theta = Parameter('theta')
+        self.circuit = QuantumCircuit(2, 2)
+        self.circuit.ry(self.theta, 1)
+        self.circuit.measure([0, 1], [0, 1])
+
+    def test_quasi_distribution(self):
+        self.assertEqual({0: 0.25, 3: 0.75},
+                         quasi_distribution(np.array([3, 0, 3, 3])))
+        self.assertEqual({}, quasi_distribution(np.array([])))
+
+    def test_batched_units(self):
+        fixed = QuantumCircuit(1, 1)
+        fixed.rx(pi, 0)
+        fixed.measure(0, 0)
+        with unittest.mock.patch.object(self.backend, 'run_batch',
+                                        side_effect=simulated_batch()) as run:
+            result = AQTSampler(self.backend, shots=50).run([
+                (self.circuit, [[0.0], [pi]], 300),
+                fixed,
+                (self.circuit, {self.theta: pi}),
+            ])
+        self.assertEqual([200, 100, 200, 100, 50, 50],
+                         run.call_args[1]['shots'])
+        self.assertEqual([[{0: 1.0}, {2: 1.0}], [{1: 1.0}], [{2: 1.0}]],
+                         result.quasi_dists)
+        self.assertEqual(300, result.metadata[0][1]['shots'])
+        self.assertEqual(2, len(result.metadata[0][1]['job_ids']))
+
+    def test_repeated_bindings_share_a_job(self):
+        backend = AQTProvider('foo').get_backend('aqt_mps_simulator')
+        result = AQTSampler(backend, shots=50).run([
+            (self.circuit, [[pi], [0.0], [pi]])])
+        self.assertEqual([{2: 1.0}, {0: 1.0}, {2: 1.0}], result.quasi_dists[0])
+        job_ids = [metadata['job_ids'] for metadata in result.metadata[0]]
+        self.assertEqual(job_ids[0], job_ids[2])
+        self.assertNotEqual(job_ids[0], job_ids[1])
+        self.assertEqual(50, result.metadata[0][2]['shots'])
+
+    def test_parameter_mismatch(self):
+        sampler = AQTSampler(self.backend)
+        self.assertRaises(ValueError, sampler.run, [self.circuit])
+        self.assertRaises(ValueError, sampler.run,
+                          [(self.circuit, [[0.1, 0.2]])])
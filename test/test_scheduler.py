@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import threading
+import time
+import unittest
+import unittest.mock
+
+from numpy import pi
+from qiskit import QuantumCircuit
+from qiskit.exceptions import QiskitError
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_sampler import AQTSampler
+from qiskit_aqt_provider.aqt_scheduler import JobScheduler
+
+
+def _wait_until(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError('Condition not reached')
+        time.sleep(0.001)
+
+
+class TestJobScheduler(unittest.TestCase):
+
+    def _acquire_in_thread(self, scheduler, order, priority, user=None):
+        def acquire():
+            order.append((priority, user,
+                          scheduler.acquire(priority, user, timeout=10)))
+        waiting = sum(stats['waiting']
+                      for stats in scheduler.stats().values())
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        _wait_until(lambda: sum(stats['waiting'] for stats in
+                                scheduler.stats().values()) > waiting)
+        return thread
+
+    def test_higher_priority_goes_first(self):
+        scheduler = JobScheduler(max_in_flight=1)
+        ticket = scheduler.acquire()
+        self.assertEqual('batch', ticket.priority)
+        order = []
+        threads = [self._acquire_in_thread(scheduler, order, 'batch'),
+                   self._acquire_in_thread(scheduler, order, 'interactive')]
+        ticket.release()
+        _wait_until(lambda: len(order) == 1)
+        self.assertEqual('interactive', order[0][0])
+        order[0][2].release()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(['interactive', 'batch'],
+                         [priority for priority, _, _ in order])
+
+    def test_class_quota(self):
+        scheduler = JobScheduler(max_in_flight=2,
+                                 classes=[('interactive', None), ('batch', 1)])
+        scheduler.acquire('batch')
+        self.assertRaises(QiskitError, scheduler.acquire, 'batch',
+                          timeout=0.01)
+        scheduler.acquire('interactive', timeout=0.01)
+        stats = scheduler.stats()
+        self.assertEqual(1, stats['batch']['in_flight'])
+        self.assertEqual(0, stats['batch']['waiting'])
+        self.assertEqual(1, stats['batch']['quota'])
+
+    def test_fair_share_between_users(self):
+        scheduler = JobScheduler(max_in_flight=2)
+        scheduler.acquire(user='alice')
+        ticket = scheduler.acquire(user='alice')
+        order = []
+        threads = [self._acquire_in_thread(scheduler, order, 'batch', 'alice'),
+                   self._acquire_in_thread(scheduler, order, 'batch', 'bob')]
+        ticket.release()
+        _wait_until(lambda: len(order) == 1)
+        self.assertEqual('bob', order[0][1])
+        order[0][2].release()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual({'alice': 2}, scheduler.stats()['batch']['users'])
+
+    def test_fair_share_by_cost(self):
+        scheduler = JobScheduler(max_in_flight=4)
+        scheduler.acquire(user='alice', cost=10.0)
+        scheduler.acquire(user='bob', cost=1.0)
+        ticket = scheduler.acquire(user='bob', cost=1.0)
+        scheduler.acquire(user='carol', cost=1.0)
+        order = []
+        threads = [self._acquire_in_thread(scheduler, order, 'batch', 'alice'),
+                   self._acquire_in_thread(scheduler, order, 'batch', 'bob')]
+        ticket.release()
+        _wait_until(lambda: len(order) == 1)
+        self.assertEqual('bob', order[0][1])
+        self.assertEqual({'alice': 10.0, 'bob': 2.0, 'carol': 1.0},
+                         scheduler.stats()['batch']['cost'])
+        order[0][2].release()
+        for thread in threads:
+            thread.join(10)
+
+    def test_release_is_idempotent(self):
+        scheduler = JobScheduler(max_in_flight=1)
+        ticket = scheduler.acquire()
+        ticket.release()
+        ticket.release()
+        self.assertEqual(0, scheduler.stats()['batch']['in_flight'])
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, JobScheduler, classes=[])
+        self.assertRaises(ValueError, JobScheduler, default_priority='urgent')
+        self.assertRaises(ValueError, JobScheduler().acquire, 'urgent')
+
+
+class TestScheduledBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = JobScheduler(max_in_flight=2)
+        provider = AQTProvider('foo', scheduler=self.scheduler)
+        # only the tests poll, so that slots are released when they say
+        provider.watcher = unittest.mock.Mock()
+        self.backend = provider.get_backend('aqt_mps_simulator')
+        self.circuit = QuantumCircuit(2, 2)
+        self.circuit.rx(pi, 0)
+        self.circuit.measure([0, 1], [0, 1])
+
+    def _in_flight(self, priority='batch'):
+        return self.scheduler.stats()[priority]['in_flight']
+
+    def test_jobs_hold_a_slot_until_they_end(self):
+        job = self.backend.run(self.circuit, shots=10, priority='interactive',
+                               user='alice')
+        self.assertEqual({'alice': 1},
+                         self.scheduler.stats()['interactive']['users'])
+        self.assertIn('schedule', job.timings)
+        self.assertEqual({'01': 10}, job.get_counts(wait=0))
+        self.assertEqual(0, self._in_flight('interactive'))
+        job = self.backend.run(self.circuit, shots=10)
+        self.assertEqual(1, self._in_flight())
+        job.cancel()
+        self.assertEqual(0, self._in_flight())
+
+    def test_batch_jobs_share_a_slot(self):
+        jobs = self.backend.run_batch([self.circuit] * 3, shots=10)
+        self.assertEqual(1, self._in_flight())
+        for job in jobs:
+            job.result(wait=0)
+        self.assertEqual(0, self._in_flight())
+
+    def test_failed_submission_releases_slot(self):
+        self.backend.url = 'local://unreachable'
+        self.backend.transport = None
+        self.assertRaises(Exception, self.backend.run, self.circuit)
+        self.assertEqual(0, self._in_flight())
+
+
+class TestMoreJobsThanSlots(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = JobScheduler(max_in_flight=2)
+        provider = AQTProvider('foo', scheduler=self.scheduler)
+        provider.watcher.interval = 0.01
+        self.backend = provider.get_backend('aqt_mps_simulator')
+        self.circuits = []
+        for index in range(5):
+            circuit = QuantumCircuit(1, 1)
+            circuit.rx(index * pi, 0)
+            circuit.measure(0, 0)
+            self.circuits.append(circuit)
+
+    def _without_deadlock(self, function):
+        results = []
+        thread = threading.Thread(target=lambda: results.append(function()),
+                                  daemon=True)
+        thread.start()
+        thread.join(30)
+        self.assertFalse(thread.is_alive(), 'Submissions are deadlocked')
+        _wait_until(lambda: self.scheduler.stats()['batch']['in_flight'] == 0)
+        return results[0]
+
+    def test_run_before_collecting(self):
+        counts = self._without_deadlock(lambda: [
+            job.get_counts(wait=0) for job in
+            [self.backend.run(circuit, shots=5) for circuit in self.circuits]])
+        self.assertEqual([{'0': 5}, {'1': 5}] * 2 + [{'0': 5}], counts)
+
+    def test_batches(self):
+        counts = self._without_deadlock(lambda: [
+            job.get_counts(wait=0) for job in
+            self.backend.run_batch(self.circuits, shots=5)])
+        self.assertEqual([{'0': 5}, {'1': 5}] * 2 + [{'0': 5}], counts)
+        result = self._without_deadlock(
+            lambda: AQTSampler(self.backend, shots=5).run(self.circuits))
+        self.assertEqual([[{0: 1.0}], [{1: 1.0}]] * 2 + [[{0: 1.0}]],
+                         result.quasi_dists)
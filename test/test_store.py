@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from numpy import pi
+from qiskit import QuantumCircuit
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_job import run_and_collect
+from qiskit_aqt_provider.aqt_store import (METADATA_FILE, SampleReader,
+                                           SampleWriter)
+
+
+class TestSampleStore(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'sweep')
+
+    def test_shards_and_metadata(self):
+        writer = SampleWriter(self.path, shard_size=5)
+        writer.write_samples([1, 2, 3], name='a', parameters={'theta': 0.5})
+        # nothing is visible before the first shard is written
+        self.assertFalse(os.path.exists(os.path.join(self.path,
+                                                     METADATA_FILE)))
+        writer.write_samples([4, 5, 6], name='b', job_id='j2',
+                             memory_mapping={1: 0}, num_clbits=1)
+        writer.write_samples([7], name='c')
+        writer.close()
+        reader = SampleReader(self.path)
+        self.assertEqual(3, len(reader))
+        self.assertEqual([0, 0, 1], reader.column('shard'))
+        self.assertEqual([[1, 2, 3], [4, 5, 6], [7]],
+                         [samples.tolist() for _, samples in reader])
+        self.assertIsInstance(reader.samples(1).base, np.memmap)
+        self.assertEqual({1: 0}, reader.experiments[1]['memory_mapping'])
+        self.assertEqual([0], reader.find(theta=0.5))
+        self.assertEqual([1], reader.find(name='b', job_id='j2'))
+        self.assertEqual([0.5, None, None], reader.column('theta'))
+        self.assertEqual({7: 1}, reader.int_counts(2))
+
+    def test_appends_to_existing_store(self):
+        with SampleWriter(self.path) as writer:
+            writer.write_samples([1], name='a')
+        with SampleWriter(self.path) as writer:
+            writer.write_samples([2], name='b')
+        reader = SampleReader(self.path)
+        self.assertEqual([0, 1], reader.column('shard'))
+        self.assertEqual([[1], [2]],
+                         [samples.tolist() for _, samples in reader])
+
+    def test_run_and_collect_writes_jobs(self):
+        backend = AQTProvider('foo').get_backend('aqt_mps_simulator')
+        runs = []
+        for theta in (0, 1):
+            circuit = QuantumCircuit(2, 2, name='flip%d' % theta)
+            circuit.rx(theta * pi, 1)
+            circuit.measure([0, 1], [1, 0])
+            runs.append((circuit, 10, {'theta': theta}))
+        with SampleWriter(self.path) as writer:
+            collected = run_and_collect(backend, runs, wait=0, writer=writer)
+        reader = SampleReader(self.path)
+        # experiments are stored in the order the jobs finish
+        self.assertEqual(['flip0', 'flip1'], sorted(reader.column('name')))
+        self.assertEqual(sorted(job.job_id() for job, _ in collected),
+                         sorted(reader.column('job_id')))
+        self.assertEqual({0: 1, 1: 0}, reader.experiments[0]['memory_mapping'])
+        self.assertEqual({0: 10}, reader.int_counts(reader.find(theta=0)[0]))
+        self.assertEqual({1: 10}, reader.int_counts(reader.find(theta=1)[0]))
+        self.assertEqual(['aqt_mps_simulator'] * 2, reader.column('backend'))
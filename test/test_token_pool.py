@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import threading
+import unittest
+import unittest.mock
+
+from numpy import pi
+from qiskit import QuantumCircuit
+from qiskit.exceptions import QiskitError
+
+from qiskit_aqt_provider import AQTPoolProvider
+from qiskit_aqt_provider.aqt_token_pool import TokenPool
+
+from .test_backend import _fake_response
+
+
+class TestTokenPool(unittest.TestCase):
+
+    def test_round_robin(self):
+        pool = TokenPool(['a', 'b', 'c'], strategy='round_robin')
+        self.assertEqual(['a', 'b', 'c', 'a'],
+                         [pool.acquire() for _ in range(4)])
+
+    def test_least_loaded_with_limits(self):
+        pool = TokenPool(['a', 'b'], max_in_flight={'a': 1, 'b': 3})
+        self.assertEqual(['a', 'b', 'b', 'b'],
+                         [pool.acquire() for _ in range(4)])
+        self.assertRaises(QiskitError, pool.acquire, timeout=0.01)
+        pool.release('b')
+        self.assertEqual('b', pool.acquire(timeout=0.01))
+
+    def test_waits_for_a_free_slot(self):
+        pool = TokenPool(['a'], max_in_flight=1)
+        pool.acquire()
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(
+            pool.acquire(timeout=10)))
+        thread.start()
+        pool.release('a')
+        thread.join(10)
+        self.assertEqual(['a'], acquired)
+
+    def test_unhealthy_token_cools_down(self):
+        pool = TokenPool(['a', 'b'], strategy='round_robin', max_failures=2,
+                         cooldown=60)
+        for _ in range(2):
+            pool.release(pool.acquire(), failed=True)
+            pool.release(pool.acquire())
+        self.assertFalse(pool.stats()['a']['healthy'])
+        self.assertEqual(['b', 'b'], [pool.acquire() for _ in range(2)])
+        # a token in cooldown is still used if nothing else is left
+        pool = TokenPool(['a'], max_failures=1)
+        pool.release(pool.acquire(), failed=True)
+        self.assertEqual('a', pool.acquire())
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, TokenPool, [])
+        self.assertRaises(ValueError, TokenPool, ['a'], strategy='random')
+
+
+class TestPoolProvider(unittest.TestCase):
+
+    def test_jobs_poll_with_their_token(self):
+        provider = AQTPoolProvider(['t1', 't2'], strategy='round_robin')
+        # only the test polls
+        provider.watcher = unittest.mock.Mock()
+        backend = provider.get_backend('aqt_qasm_simulator')
+        circuit = QuantumCircuit(1, 1)
+        circuit.rx(pi, 0)
+        circuit.measure(0, 0)
+        responses = [_fake_response({'id': 'j1'}),
+                     _fake_response({'id': 'j2'}),
+                     _fake_response({'id': 'j2', 'status': 'finished',
+                                     'samples': [1]})]
+        with unittest.mock.patch('requests.Session.put',
+                                 side_effect=responses) as put:
+            backend.run(circuit, shots=1)
+            job = backend.run(circuit, shots=1)
+            self.assertEqual(1, provider.pool.stats()['t2']['in_flight'])
+            job.result(wait=0)
+        submits = [call[1] for call in put.call_args_list]
+        self.assertEqual(['t1', 't2', 't2'],
+                         [kwargs['headers']['Ocp-Apim-Subscription-Key']
+                          for kwargs in submits])
+        self.assertEqual(['t1', 't2', 't2'],
+                         [kwargs['data']['access_token'] for kwargs in submits])
+        self.assertEqual(0, provider.pool.stats()['t2']['in_flight'])
+        self.assertEqual(1, provider.pool.stats()['t1']['in_flight'])
+
+    def test_failed_submission_releases_token(self):
+        provider = AQTPoolProvider(['t1'], max_failures=1)
+        backend = provider.get_backend('aqt_qasm_simulator')
+        circuit = QuantumCircuit(1, 1)
+        circuit.measure(0, 0)
+        with unittest.mock.patch('requests.Session.put',
+                                 return_value=_fake_response({})):
+            self.assertRaises(Exception, backend.run, circuit)
+        stats = provider.pool.stats()['t1']
+        self.assertEqual(0, stats['in_flight'])
+        self.assertFalse(stats['healthy'])
+
+    def test_failed_poll_releases_token(self):
+        provider = AQTPoolProvider(['t1'], max_in_flight=1, max_failures=1,
+                                   acquire_timeout=10)
+        provider.watcher = unittest.mock.Mock()
+        backend = provider.get_backend('aqt_qasm_simulator')
+        circuit = QuantumCircuit(1, 1)
+        circuit.measure(0, 0)
+        malformed = unittest.mock.Mock()
+        malformed.iter_content.return_value = [b'<html>']
+        with unittest.mock.patch('requests.Session.put',
+                                 side_effect=[_fake_response({'id': 'j1'}),
+                                              malformed]):
+            job = backend.run(circuit, shots=1)
+            self.assertRaises(Exception, job.result, wait=0)
+        stats = provider.pool.stats()['t1']
+        self.assertEqual(0, stats['in_flight'])
+        self.assertFalse(stats['healthy'])
+        self.assertEqual(1, provider.metrics.jobs_failed.value(
+            backend='aqt_qasm_simulator'))
+
+    def test_more_jobs_than_tokens_allow(self):
+        provider = AQTPoolProvider(['a', 'b'], max_in_flight=1,
+                                   acquire_timeout=10)
+        provider.watcher.interval = 0.01
+        backend = provider.get_backend('aqt_mps_simulator')
+        circuits = []
+        for index in range(3):
+            circuit = QuantumCircuit(1, 1)
+            circuit.rx(index * pi, 0)
+            circuit.measure(0, 0)
+            circuits.append(circuit)
+        # every job is submitted before any result is asked for
+        jobs = [backend.run(circuit, shots=5) for circuit in circuits]
+        jobs += backend.run_batch(circuits, shots=5)
+        self.assertEqual([{'0': 5}, {'1': 5}, {'0': 5}] * 2,
+                         [job.get_counts(wait=0) for job in jobs])
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import gzip
+import json
+import os
+import tempfile
+import time
+import unittest
+import warnings
+from urllib.parse import parse_qs
+
+import numpy as np
+from numpy import pi
+import requests
+
+from qiskit import QuantumCircuit
+
+from qiskit_aqt_provider import AQTProvider
+from qiskit_aqt_provider.aqt_transport import (encode_payload, SamplesParser,
+                                               read_result, RecordingTransport,
+                                               ReplayedResponse,
+                                               ReplayTransport, Transport)
+
+
+class _FakeResponse():
+    def __init__(self, body):
+        self.body = body
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+class TestTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.response = {'id': 'abc123', 'no_qubits': 2,
+                         'received': [['X', 0.5, [0]]], 'repetitions': 5,
+                         'samples': [3, 0, 12, 1, 3], 'status': 'finished'}
+
+    def test_uncompressed_payload(self):
+        aqt_json = {'data': '[]', 'repetitions': 100}
+        self.assertEqual((aqt_json, {}), encode_payload(aqt_json))
+
+    def test_compressed_payload(self):
+        aqt_json = {'data': '[["X", 0.5, [0]]]', 'access_token': 'foo',
+                    'repetitions': 100, 'no_qubits': 1}
+        data, headers = encode_payload(aqt_json, compress=True)
+        self.assertEqual('gzip', headers['Content-Encoding'])
+        decoded = parse_qs(gzip.decompress(data).decode('utf-8'))
+        self.assertEqual({key: [str(value)] for key, value in aqt_json.items()},
+                         decoded)
+
+    def test_parse_all_chunk_sizes(self):
+        body = json.dumps(self.response).encode('utf-8')
+        for chunk_size in range(1, len(body) + 1):
+            result = read_result(_FakeResponse(body), chunk_size)
+            self.assertIsInstance(result['samples'], np.ndarray)
+            self.assertEqual(self.response['samples'],
+                             result['samples'].tolist())
+            self.assertEqual('finished', result['status'])
+            self.assertEqual(self.response['received'], result['received'])
+
+    def test_parse_without_samples(self):
+        body = b'{"id": "abc123", "status": "queued"}'
+        self.assertEqual({'id': 'abc123', 'status': 'queued'},
+                         read_result(_FakeResponse(body), 3))
+
+    def test_parse_empty_samples(self):
+        body = b'{"samples" : [ ], "status": "finished"}'
+        result = read_result(_FakeResponse(body), 4)
+        self.assertEqual(0, len(result['samples']))
+
+    def test_key_in_string_value(self):
+        body = b'{"field": "samples", "samples": [1, 2]}'
+        for chunk_size in range(1, len(body) + 1):
+            result = read_result(_FakeResponse(body), chunk_size)
+            self.assertEqual([1, 2], result['samples'].tolist())
+            self.assertEqual('samples', result['field'])
+
+    def test_truncated_samples(self):
+        parser = SamplesParser()
+        parser.feed(b'{"samples": [1, 2, ')
+        self.assertRaises(ValueError, parser.close)
+
+    def test_malformed_samples(self):
+        parser = SamplesParser()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            self.assertRaises(ValueError, parser.feed,
+                              b'{"samples": [1, x, 3], "status": "finished"}')
+
+
+class _GatewayTransport(Transport):
+    """Answers with fixed bodies after a fixed delay."""
+
+    def __init__(self, bodies, delay=0.0):
+        self.bodies = list(bodies)
+        self.delay = delay
+
+    def put(self, url, data=None, headers=None, stream=False):
+        time.sleep(self.delay)
+        return ReplayedResponse(200, {'Content-Type': 'application/json'},
+                                json.dumps(self.bodies.pop(0)).encode(), url)
+
+
+class TestRecordReplay(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.circuit = QuantumCircuit(2, 2)
+        self.circuit.rx(pi, 0)
+        self.circuit.measure([0, 1], [0, 1])
+        gateway = _GatewayTransport([
+            {'id': 'abc123', 'status': 'queued'},
+            {'id': 'abc123', 'status': 'queued'},
+            {'id': 'abc123', 'status': 'finished', 'samples': [1, 1, 3]},
+        ], delay=0.05)
+        with RecordingTransport(self.path, gateway) as transport:
+            self.counts = self._run(transport)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def _run(self, transport):
+        backend = AQTProvider('secret', transport=transport).get_backend(
+            'aqt_qasm_simulator')
+        job = backend.run(self.circuit, shots=3)
+        return job.result(wait=0).get_counts()
+
+    def test_cassette_has_no_tokens(self):
+        with open(self.path) as cassette:
+            content = cassette.read()
+        self.assertNotIn('secret', content)
+        self.assertEqual(3, len(json.loads(content)['interactions']))
+
+    def test_replay(self):
+        transport = ReplayTransport(self.path, speed=None)
+        self.assertEqual(self.counts, self._run(transport))
+        self.assertEqual({'01': 2, '11': 1}, self.counts)
+        self.assertEqual(0, transport.remaining())
+        self.assertRaises(LookupError, transport.put, 'http://none')
+
+    def test_replay_speed(self):
+        start = time.perf_counter()
+        self._run(ReplayTransport(self.path, speed=1.0))
+        original = time.perf_counter() - start
+        start = time.perf_counter()
+        self._run(ReplayTransport(self.path, speed=10.0))
+        accelerated = time.perf_counter() - start
+        self.assertGreaterEqual(original, 0.15)
+        self.assertLess(accelerated, original / 2)
+
+    def test_error_status(self):
+        response = ReplayedResponse(503, {}, b'', 'http://gateway')
+        self.assertRaises(requests.HTTPError, response.raise_for_status)